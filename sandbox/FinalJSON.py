@@ -1,346 +1,332 @@
 import re
-import requests
-from bs4 import BeautifulSoup
+from html_parsers import parse_html
 from urllib.parse import urljoin, urlparse
-import time
-import trafilatura
+from extraction import ExtractionPipeline, extract_article
 import sys
-import json
+from jsonl_writer import JsonlWriter
+from fetch_engine import ConcurrentFetcher
 import os
+from transport import HttpTransport
+from http_cache import HttpCache
+from politeness import HostScheduler
+from seen_index import SeenIndex
+from extract_cache import ExtractionCache
+from near_duplicates import NearDuplicateIndex
+from url_canon import dedupe_news_items
+from records import Article, NewsItem, RecordBatch
+from metrics import default_metrics
+from portal_registry import PORTALS_DIR, load_registry
+from feeds import discover_feed_urls, fresh_items, parse_feed, sitemaps_from_robots
 
 class NewsPortalScraper:
-    def __init__(self):
-        self.session = requests.Session()
-        self.session.headers.update({
-            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
-        })
+    def __init__(self, max_workers=8, per_host_limit=4, extract_workers=None, cache_dir='.http_cache',
+                 seen_index_path='seen_urls.sqlite', host_rate=2.0, metrics=None, portals_dir=PORTALS_DIR,
+                 near_duplicate_path='near_duplicates.sqlite', collapse_duplicates=False,
+                 extract_cache_dir='.extract_cache'):
+        # Per-stage and per-host latency histograms and counters for the whole run
+        self.metrics = metrics if metrics is not None else default_metrics
+        # One pooled transport for the homepage and every article body, backed by an on-disk cache.
+        # Politeness is a per-host budget: host_rate requests/second, robots.txt Crawl-delay, Retry-After
+        cache = HttpCache(cache_dir) if cache_dir else None
+        scheduler = HostScheduler(rate=host_rate, burst=per_host_limit)
+        self.transport = HttpTransport(pool_per_host=per_host_limit, cache=cache, scheduler=scheduler,
+                                       metrics=self.metrics)
+        self.session = self.transport.session
+        # Article pages are fetched concurrently, bounded globally and per host
+        self.fetcher = ConcurrentFetcher(max_workers=max_workers, per_host_limit=per_host_limit)
+        # Extraction results keyed by a hash of the page HTML, so unchanged pages are not parsed again
+        self.extract_cache = ExtractionCache(extract_cache_dir) if extract_cache_dir else None
+        # trafilatura extraction is CPU-bound, so it runs in a process pool fed by the fetcher
+        self.pipeline = ExtractionPipeline(self.fetcher, self.fetch_article, workers=extract_workers,
+                                           metrics=self.metrics, cache=self.extract_cache)
+        # Article URLs already extracted in earlier runs
+        self.seen = SeenIndex(seen_index_path) if seen_index_path else None
+        # SimHash fingerprints of article bodies, to spot the same wire story on several portals.
+        # Near-duplicates are flagged with 'duplicate_of', or left out with collapse_duplicates
+        self.near_duplicates = NearDuplicateIndex(near_duplicate_path) if near_duplicate_path else None
+        self.collapse_duplicates = collapse_duplicates
         
-        # Common selectors for different news portals
-        self.portal_configs = {
-            'bbc.com': {
-                'headline_selectors': [
-                    'h2[data-testid="card-headline"]',
-                    'h3[data-testid="card-headline"]',
-                    'h2',
-                    'h3.gs-c-promo-heading__title'
-                ],
-                'link_selectors': [
-                    'a[data-testid="internal-link"]',
-                    'h2[data-testid="card-headline"] a',
-                    'h3[data-testid="card-headline"] a'
-                ],
-                'article_content_selectors': [
-                    '[data-component="text-block"] p',
-                    'div[data-component="text-block"]',
-                    '.story-body p',
-                    'article p'
-                ]
-            },
-            'prothomalo.com': {
-                'headline_selectors': [
-                    'h1.headline',
-                    'h2.headline',
-                    'h3.story_title',
-                    '.title a',
-                    'h2',
-                    'h3'
-                ],
-                'link_selectors': [
-                    '.title a',
-                    '.story_title a',
-                    'h2 a',
-                    'h3 a'
-                ],
-                'article_content_selectors': [
-                    '.story_content p',
-                    '.news_content p',
-                    'article p',
-                    '.content p'
-                ]
-            },
-            'thedailystar.net': {
-                'headline_selectors': [
-                    'h2.title',
-                    'h3.title',
-                    '.article-title',
-                    '.news-title',
-                    '.story-title',
-                    'h2',
-                    'h3'
-                ],
-                'link_selectors': [
-                    '.title a',
-                    '.article-title a',
-                    '.news-title a',
-                    'h2 a',
-                    'h3 a',
-                    'a[href*="/news/"]',
-                    'a[href*="/article/"]'
-                ],
-                'article_content_selectors': [
-                    '.article-content p',
-                    '.news-content p',
-                    '.story-content p',
-                    '.content-body p',
-                    'article p',
-                    '.content p'
-                ]
-            },
-            'cnn.com': {
-                'headline_selectors': [
-                    'h3.cd__headline',
-                    '.cd__headline',
-                    'h2.headline',
-                    'h3.headline',
-                    '.card-media__headline',
-                    '.article-title',
-                    'h2',
-                    'h3'
-                ],
-                'link_selectors': [
-                    '.cd__headline a',
-                    'h3.cd__headline a',
-                    '.card-media__headline a',
-                    'a[data-link-type="article"]',
-                    'h2 a',
-                    'h3 a',
-                    'a[href*="/2024/"]',
-                    'a[href*="/2025/"]'
-                ],
-                'article_content_selectors': [
-                    '.article__content p',
-                    '.zn-body__paragraph',
-                    'div[data-module="ArticleBody"] p',
-                    '.pg-rail-tall__body p',
-                    'article p',
-                    '.content p'
-                ]
-            },
-            'news24bd.tv': {
-                'headline_selectors': [
-                    '.news-title',
-                    '.article-title',
-                    '.post-title',
-                    'h2.title',
-                    'h3.title',
-                    '.headline',
-                    'h2',
-                    'h3'
-                ],
-                'link_selectors': [
-                    '.news-title a',
-                    '.article-title a',
-                    '.post-title a',
-                    'h2.title a',
-                    'h3.title a',
-                    '.headline a',
-                    'h2 a',
-                    'h3 a',
-                    'a[href*="/news/"]'
-                ],
-                'article_content_selectors': [
-                    '.news-content p',
-                    '.article-content p',
-                    '.post-content p',
-                    '.story-content p',
-                    '.content-body p',
-                    'article p',
-                    '.content p'
-                ]
-            },
-            'default': {
-                'headline_selectors': [
-                    'h1', 'h2', 'h3',
-                    '.headline', '.title',
-                    '[class*="headline"]', '[class*="title"]'
-                ],
-                'link_selectors': [
-                    'h1 a', 'h2 a', 'h3 a',
-                    '.headline a', '.title a',
-                    'article a'
-                ],
-                'article_content_selectors': [
-                    'article p', '.content p', '.article-content p',
-                    '.post-content p', '.entry-content p',
-                    '.story-content p', '.news-content p'
-                ]
-            }
-        }
+        # Portal configs (selectors, cache and feed settings) from portals/*.json, shared and hot-reloaded
+        self.portals = load_registry(portals_dir)
+        # Feeds found for portals without 'feed_urls', keyed by host
+        self._discovered_feeds = {}
     
+    def close(self):
+        """Shut down the extraction workers and close the on-disk caches and indexes"""
+        self.pipeline.close()
+        for store in (self.transport.cache, self.extract_cache, self.seen, self.near_duplicates):
+            if store is not None:
+                store.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    @property
+    def portal_configs(self):
+        """{portal name: config} as currently loaded, 'default' included"""
+        return self.portals.configs
+
     def get_portal_config(self, url):
         """Get configuration based on the portal URL"""
-        domain = urlparse(url).netloc.lower()
-        
-        for portal_key in self.portal_configs:
-            if portal_key in domain:
-                return self.portal_configs[portal_key]
-        
-        return self.portal_configs['default']
+        return self.portals.lookup(url)
     
     def fetch_page(self, url):
         """Fetch webpage content"""
-        try:
-            response = self.session.get(url, timeout=15)
-            response.raise_for_status()
-            return BeautifulSoup(response.content, 'html.parser')
-        except requests.exceptions.RequestException as e:
-            print(f"Error fetching {url}: {e}")
+        config = self.get_portal_config(url)
+        host = urlparse(url).netloc.lower()
+        with self.metrics.time('stage_seconds', stage='fetch_page', host=host):
+            response = self.transport.fetch(url, max_age=config.get('cache_max_age'), expect='html')
+        if response is None:
             return None
+        # Remember feeds the page advertises so the next run can skip the HTML
+        for feed_url in discover_feed_urls(response.content, url):
+            if feed_url not in self._discovered_feeds.setdefault(host, []):
+                self._discovered_feeds[host].append(feed_url)
+        with self.metrics.time('stage_seconds', stage='parse', host=host):
+            # Decoded with the charset the transport resolved, so the parser does no detection of its own
+            return parse_html(response.text, config.get('parser'))
+
+    def feed_urls(self, portal_url, config):
+        """Configured feeds of a portal, or the ones discovered from robots.txt and its homepage"""
+        if config.get('feed_urls'):
+            return config['feed_urls']
+        host = urlparse(portal_url).netloc.lower()
+        if host not in self._discovered_feeds:
+            # The robots.txt the scheduler already read; without one, feeds can still be found on the homepage
+            robots_text = self.transport.robots_txt(portal_url)
+            self._discovered_feeds[host] = sitemaps_from_robots(robots_text) if robots_text else []
+        return self._discovered_feeds[host]
+
+    def extract_from_feeds(self, portal_url, config, max_sitemaps=5):
+        """
+        News items from the portal's RSS/Atom feeds and news sitemaps, or None
+        if no feed could be read. Entries older than feed_max_age_hours are
+        dropped here, before any article is fetched.
+        """
+        news_items = []
+        read_any = False
+        pending = list(self.feed_urls(portal_url, config))
+        followed = 0
+        while pending:
+            feed_url = pending.pop(0)
+            content = self.transport.fetch_bytes(feed_url, max_age=config.get('cache_max_age'), expect=('feed', 'text'))
+            if not content:
+                continue
+            items, nested = parse_feed(content, feed_url)
+            read_any = read_any or bool(items or nested)
+            news_items.extend(items)
+            # A sitemap index points to the actual sitemaps; follow a few of them
+            for sitemap_url in nested[:max_sitemaps - followed]:
+                pending.append(sitemap_url)
+                followed += 1
+        if not read_any:
+            return None
+        fresh = fresh_items(news_items, config.get('feed_max_age_hours'))
+        if len(fresh) < len(news_items):
+            print(f"Skipped {len(news_items) - len(fresh)} feed entries older than {config.get('feed_max_age_hours')} hours")
+        return [NewsItem(headline=item['headline'], url=item['url']) for item in fresh]
     
     def extract_headlines_and_links(self, soup, config, base_url):
         """Extract headlines and their corresponding links"""
         news_items = []
         
-        # Try different selectors to find headlines with links
-        for link_selector in config['link_selectors']:
-            links = soup.select(link_selector)
-            if links:
-                for link in links:  # Limit to first 20 items
-                    headline_text = link.get_text(strip=True)
-                    if headline_text and len(headline_text) > 10:  # Filter out short/empty text
-                        href = link.get('href')
-                        if href:
-                            full_url = urljoin(base_url, href)
-                            news_items.append({
-                                'headline': headline_text,
-                                'url': full_url
-                            })
-                break  
+        # One pass over the document finds the first matching link selector
+        # and the first matching headline selector
+        matched = self.compiled_selectors(config).match(soup)
         
-        # If no links found, try to find headlines without links
+        # Headlines with links, from the first link selector that matched
+        for link in matched['link_selectors']:
+            headline_text = link.get_text(strip=True)
+            if headline_text and len(headline_text) > 10:  # Filter out short/empty text
+                href = link.get('href')
+                if href:
+                    full_url = urljoin(base_url, href)
+                    news_items.append(NewsItem(headline=headline_text, url=full_url))
+        
+        # If no links found, fall back to headlines without links
         if not news_items:
-            for headline_selector in config['headline_selectors']:
-                headlines = soup.select(headline_selector)
-                if headlines:
-                    for headline in headlines:
-                        headline_text = headline.get_text(strip=True)
-                        if headline_text and len(headline_text) > 10:
-                            news_items.append({
-                                'headline': headline_text,
-                                'url': None
-                            })
-                    break
+            for headline in matched['headline_selectors']:
+                headline_text = headline.get_text(strip=True)
+                if headline_text and len(headline_text) > 10:
+                    news_items.append(NewsItem(headline=headline_text, url=None))
         
         return news_items
 
+    def compiled_selectors(self, config):
+        """Link and headline selector cascades of a portal config, compiled when it was loaded"""
+        return self.portals.compiled_selectors(config)
+
+    def fetch_article(self, url):
+        """Fetch stage: article HTML decoded with its resolved charset, or None"""
+        with self.metrics.time('stage_seconds', stage='fetch_article', host=self.fetcher.host_of(url)):
+            # Links to PDFs, videos and other non-HTML pages are dropped after the headers
+            return self.transport.fetch_text(url, max_age=self.get_portal_config(url).get('cache_max_age'),
+                                             expect='html')
+
     def extract_headline_and_body(self, url):
-        download = trafilatura.fetch_url(url)
+        download = self.fetch_article(url)
 
         if download:
-            result = trafilatura.extract(download)
-            if result:
-                parts = result.split('\n', 1)
-                headline = parts[0].strip()
-                body = parts[1].strip() if len(parts) > 1 else ""
+            host = self.fetcher.host_of(url)
+            with self.metrics.time('stage_seconds', stage='extract', host=host):
+                if self.extract_cache:
+                    headline, body = self.extract_cache.extract(download, extract_article)
+                else:
+                    headline, body = extract_article(download)
+            if headline is not None:
                 return headline, body
             else:
+                self.metrics.inc('extract_failures_total', host=host)
                 print("Could not extract the article content.") 
         else:
             print("Failed to fetch the URL content.")
         return None, None
    
-    def scrape_news_portal(self, portal_url):
-        """Main method to scrape news from a portal"""
+    def near_duplicate_of(self, url, body):
+        """URL of an earlier article with (almost) the same body, or None; new bodies are indexed"""
+        if self.near_duplicates is None or not body:
+            return None
+        duplicate = self.near_duplicates.check(url, body)
+        if duplicate is None:
+            return None
+        print(f"   Near-duplicate of {duplicate[0]} ({duplicate[1]} bits apart)")
+        self.metrics.inc('near_duplicates_total', host=self.fetcher.host_of(url))
+        return duplicate[0]
+
+    def scrape_news_portal(self, portal_url, output_path='news_content.jsonl', json_path='news_content.json',
+                           only_new=True):
+        """
+        Main method to scrape news from a portal.
+        Articles are streamed to output_path (JSON Lines) as they finish; if
+        json_path is set, the stream is turned into a JSON array at the end.
+        With only_new, links already in the seen index are not fetched again
+        and new articles are appended to output_path.
+        """
         print(f"Scraping news from: {portal_url}")
         print("=" * 60)
         
-        # Get the main page
-        soup = self.fetch_page(portal_url)
-        if not soup:
-            return []
-        
         # Get portal-specific configuration
         config = self.get_portal_config(portal_url)
         
-        # Extract headlines and links
-        news_items = self.extract_headlines_and_links(soup, config, portal_url)
+        # Feeds and news sitemaps are small and already list canonical links
+        news_items = self.extract_from_feeds(portal_url, config)
+        if news_items:
+            print(f"Using the portal's feeds ({len(news_items)} recent entries)")
+        else:
+            # Fall back to the main page and the selector cascades, also when
+            # the feeds were read but every entry in them was stale
+            if news_items is not None:
+                print("No fresh feed entries, using the homepage")
+            soup = self.fetch_page(portal_url)
+            if not soup:
+                return RecordBatch(NewsItem)
+            news_items = self.extract_headlines_and_links(soup, config, portal_url)
         
         if not news_items:
             print("No news items found. The website structure might have changed.")
-            return []
+            return RecordBatch(NewsItem)
         
-        print(f"Found {len(news_items)} news items\n")
+        # Merge repeated links to the same article (hero, section block, tracking params, fragments)
+        found = len(news_items)
+        news_items = dedupe_news_items(news_items)
+        print(f"Found {found} news items, {len(news_items)} unique\n")
         
         # Scrape Headlines and URLs
-        scraped_news = []
-        full_articles = []
-        for i, item in enumerate(news_items):
-            print(f"{i+1}. HEADLINE: {item['headline']}")
-            news_data = {
-                'headline': item['headline'],
-                'url': item['url'],
-            }  
-            scraped_news.append(news_data)
-            if item['url']:
-                print(f"   URL: {item['url']}")
-                news_content = self.extract_headline_and_body(item['url'])
-                if news_content:
-                        print(f"   HEADLINE: {news_content[0]}")
-                        print(f"   BODY: {news_content[1]}")
-                        full_articles.append({
-                        "headline": news_content[0],
-                        "url": item['url'],
-                        "body": news_content[1]
-            })
-        if full_articles:
-            with open("news_content.json", "w", encoding="utf-8") as f:
-                json.dump(full_articles, f, ensure_ascii=False, indent=4)
-                print("Full news content saved to news_content.json")
-
-
-                    
-            #         with open("news_content.json", "a", encoding="utf-8") as f:
-            #             json.dump(
-            #                 f""
-            #                 news_content, f, ensure_ascii=False, indent=4)
-            #         print("Scraped data saved to news_content.json")
-            
-                       
-            #         print("Saving to:", os.path.abspath("news_content.json"))
-
-
-            #         print(f"   HEADLINE: {news_content[0]}")
-            #         print(f"   BODY: {news_content[1]}")
-            print("-" * 50)
-        time.sleep(2)  # Respectful scraping delay
+        scraped_news = RecordBatch(NewsItem)
+        # Incremental runs add to the existing output instead of replacing it
+        writer = JsonlWriter(output_path, append=bool(only_new and self.seen), metrics=self.metrics)
+        try:
+            # Article pages are fetched in parallel and extracted on all cores; results come back in homepage order
+            article_urls = [item['url'] for item in news_items if item['url']]
+            if only_new and self.seen:
+                article_urls = self.seen.unseen(article_urls)
+                print(f"{len(article_urls)} of them not scraped before\n")
+            new_urls = set(article_urls)
+            article_contents = self.pipeline.map(article_urls)
+            pipeline_error = None
+            for i, item in enumerate(news_items):
+                print(f"{i+1}. HEADLINE: {item['headline']}")
+                scraped_news.append(NewsItem(headline=item['headline'], url=item['url']))
+                if item['url']:
+                    print(f"   URL: {item['url']}")
+                    if item['url'] not in new_urls:
+                        print("   Already scraped, skipping")
+                    elif pipeline_error:
+                        print(f"   Not fetched: {pipeline_error}")
+                    else:
+                        try:
+                            news_content = next(article_contents)
+                        except Exception as e:
+                            # The fetch stage died; the remaining articles are reported, not fetched
+                            pipeline_error = f"the article pipeline failed ({str(e)})"
+                            print(f"   Not fetched: {pipeline_error}")
+                        else:
+                            if news_content is None:
+                                # Not recorded as seen: the index only holds articles that were extracted
+                                print("   Same article as an earlier link (rel=canonical), skipping")
+                            else:
+                                print(f"   HEADLINE: {news_content[0]}")
+                                print(f"   BODY: {news_content[1]}")
+                                duplicate_of = self.near_duplicate_of(item['url'], news_content[1])
+                                record = Article(headline=news_content[0], url=item['url'], body=news_content[1],
+                                                 duplicate_of=duplicate_of)
+                                # Each finished article goes to disk right away, so a crash keeps what was scraped
+                                if not (duplicate_of and self.collapse_duplicates):
+                                    writer.write(record)
+                                if self.seen and news_content[0] is not None:
+                                    self.seen.record(item['url'], news_content[1])
+                                    if news_content[2] != item['url']:
+                                        self.seen.record(news_content[2], news_content[1])
+                print("-" * 50)
+        finally:
+            # Whatever was scraped before an error is flushed and kept
+            writer.close()
+        if json_path:
+            writer.finalize(json_path)
+            print(f"Full news content saved to {output_path} and {json_path}")
+        else:
+            print(f"Full news content saved to {output_path}")
         return scraped_news
 
 
 
 def main():
-    scraper = NewsPortalScraper()
-  
-    portal_url = input("Enter news portal URL: ").strip()
-    if not portal_url.startswith(('http://', 'https://')):
-        portal_url = 'https://' + portal_url
+    # Closing the scraper shuts down the extraction process pool and the caches
+    with NewsPortalScraper() as scraper:
+        portal_url = input("Enter news portal URL: ").strip()
+        if not portal_url.startswith(('http://', 'https://')):
+            portal_url = 'https://' + portal_url
         
-    try:
-        news_data = scraper.scrape_news_portal(portal_url)
+        try:
+            news_data = scraper.scrape_news_portal(portal_url)
 
-        # if news_data:
-        #     with open("scraped_news.json", "w", encoding="utf-8") as f:
-        #         json.dump(news_data, f, ensure_ascii=False, indent=4)
-        #     print("Scraped data saved to scraped_news.json")
+            # if news_data:
+            #     with open("scraped_news.json", "w", encoding="utf-8") as f:
+            #         json.dump(news_data, f, ensure_ascii=False, indent=4)
+            #     print("Scraped data saved to scraped_news.json")
             
-        #     print("Saving to:", os.path.abspath("scraped_news.json"))
+            #     print("Saving to:", os.path.abspath("scraped_news.json"))
 
-        # else:
-        #     print("No news articles found.")
+            # else:
+            #     print("No news articles found.")
     
-        # if news_data:
-        #     for item in news_data:
-        #         print(f"HEADLINE: {item['headline']}")
-        #         if item['url']:
-        #             print(f"URL: {item['url']}")
-        #             # news_content = extract_headline_and_body(item['url'])
-        #             # if news_content:
-        #             #     print(f"HEADLINE: {news_content[0]}")
-        #             #     print(f"BODY: {news_content[1]}")
-        #         print("-" * 50)
-        # else:
-        #     print("No news articles found.")
-    except Exception as e:
-        print(f"An error occurred: {e}")
+            # if news_data:
+            #     for item in news_data:
+            #         print(f"HEADLINE: {item['headline']}")
+            #         if item['url']:
+            #             print(f"URL: {item['url']}")
+            #             # news_content = extract_headline_and_body(item['url'])
+            #             # if news_content:
+            #             #     print(f"HEADLINE: {news_content[0]}")
+            #             #     print(f"BODY: {news_content[1]}")
+            #         print("-" * 50)
+            # else:
+            #     print("No news articles found.")
+        except Exception as e:
+            print(f"An error occurred: {e}")
     
 if __name__ == "__main__":
     main()
\ No newline at end of file
@@ -1,14 +1,16 @@
 import re
-import requests
-from bs4 import BeautifulSoup
+from transport import default_transport
+from html_parsers import parse_html
+from portal_registry import load_registry
 
 url = "https://www.bbc.com/"
-response = requests.get(url)
-soup = BeautifulSoup(response.content, 'html.parser')
+response = default_transport.get(url)
+# HTML backend from the portal's config (portals/bbc.com.json)
+soup = parse_html(response.text, load_registry().lookup(url).get('parser'))
 #print(soup.prettify())
 
 #Extracting the Headlines
-headlines = soup.find_all('h2')
+headlines = soup.select('h2')
 
 # Print information about the headlines and their children
 print(f"Number of a elements found: {len(headlines)}")
@@ -1,190 +1,39 @@
 import re
-import requests
 from bs4 import BeautifulSoup
-from urllib.parse import urljoin, urlparse
-import time
-import trafilatura
+from urllib.parse import urljoin
+from extraction import extract_article
 from youtube_transcript_api import YouTubeTranscriptApi
 import json
+from jsonl_writer import JsonlWriter
+from transport import HttpTransport
+from politeness import HostScheduler
+from portal_registry import load_registry
 
 class NewsPortalScraper:
     def __init__(self):
-        self.session = requests.Session()
-        self.session.headers.update({
-            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
-        })
+        # One pooled transport for the homepage and every article body, paced per host
+        self.transport = HttpTransport(scheduler=HostScheduler())
+        self.session = self.transport.session
         
-        # Common selectors for different news portals
-        self.portal_configs = {
-            'bbc.com': {
-                'headline_selectors': [
-                    'h2[data-testid="card-headline"]',
-                    'h3[data-testid="card-headline"]',
-                    'h2',
-                    'h3.gs-c-promo-heading__title'
-                ],
-                'link_selectors': [
-                    'a[data-testid="internal-link"]',
-                    'h2[data-testid="card-headline"] a',
-                    'h3[data-testid="card-headline"] a'
-                ],
-                'article_content_selectors': [
-                    '[data-component="text-block"] p',
-                    'div[data-component="text-block"]',
-                    '.story-body p',
-                    'article p'
-                ]
-            },
-            'prothomalo.com': {
-                'headline_selectors': [
-                    'h1.headline',
-                    'h2.headline',
-                    'h3.story_title',
-                    '.title a',
-                    'h2',
-                    'h3'
-                ],
-                'link_selectors': [
-                    '.title a',
-                    '.story_title a',
-                    'h2 a',
-                    'h3 a'
-                ],
-                'article_content_selectors': [
-                    '.story_content p',
-                    '.news_content p',
-                    'article p',
-                    '.content p'
-                ]
-            },
-            'thedailystar.net': {
-                'headline_selectors': [
-                    'h2.title',
-                    'h3.title',
-                    '.article-title',
-                    '.news-title',
-                    '.story-title',
-                    'h2',
-                    'h3'
-                ],
-                'link_selectors': [
-                    '.title a',
-                    '.article-title a',
-                    '.news-title a',
-                    'h2 a',
-                    'h3 a',
-                    'a[href*="/news/"]',
-                    'a[href*="/article/"]'
-                ],
-                'article_content_selectors': [
-                    '.article-content p',
-                    '.news-content p',
-                    '.story-content p',
-                    '.content-body p',
-                    'article p',
-                    '.content p'
-                ]
-            },
-            'cnn.com': {
-                'headline_selectors': [
-                    'h3.cd__headline',
-                    '.cd__headline',
-                    'h2.headline',
-                    'h3.headline',
-                    '.card-media__headline',
-                    '.article-title',
-                    'h2',
-                    'h3'
-                ],
-                'link_selectors': [
-                    '.cd__headline a',
-                    'h3.cd__headline a',
-                    '.card-media__headline a',
-                    'a[data-link-type="article"]',
-                    'h2 a',
-                    'h3 a',
-                    'a[href*="/2024/"]',
-                    'a[href*="/2025/"]'
-                ],
-                'article_content_selectors': [
-                    '.article__content p',
-                    '.zn-body__paragraph',
-                    'div[data-module="ArticleBody"] p',
-                    '.pg-rail-tall__body p',
-                    'article p',
-                    '.content p'
-                ]
-            },
-            'news24bd.tv': {
-                'headline_selectors': [
-                    '.news-title',
-                    '.article-title',
-                    '.post-title',
-                    'h2.title',
-                    'h3.title',
-                    '.headline',
-                    'h2',
-                    'h3'
-                ],
-                'link_selectors': [
-                    '.news-title a',
-                    '.article-title a',
-                    '.post-title a',
-                    'h2.title a',
-                    'h3.title a',
-                    '.headline a',
-                    'h2 a',
-                    'h3 a',
-                    'a[href*="/news/"]'
-                ],
-                'article_content_selectors': [
-                    '.news-content p',
-                    '.article-content p',
-                    '.post-content p',
-                    '.story-content p',
-                    '.content-body p',
-                    'article p',
-                    '.content p'
-                ]
-            },
-            'default': {
-                'headline_selectors': [
-                    'h1', 'h2', 'h3',
-                    '.headline', '.title',
-                    '[class*="headline"]', '[class*="title"]'
-                ],
-                'link_selectors': [
-                    'h1 a', 'h2 a', 'h3 a',
-                    '.headline a', '.title a',
-                    'article a'
-                ],
-                'article_content_selectors': [
-                    'article p', '.content p', '.article-content p',
-                    '.post-content p', '.entry-content p',
-                    '.story-content p', '.news-content p'
-                ]
-            }
-        }
+        # Portal configs (selectors) from portals/*.json, shared and hot-reloaded
+        self.portals = load_registry()
+    
+    @property
+    def portal_configs(self):
+        """{portal name: config} as currently loaded, 'default' included"""
+        return self.portals.configs
     
     def get_portal_config(self, url):
         """Get configuration based on the portal URL"""
-        domain = urlparse(url).netloc.lower()
-        
-        for portal_key in self.portal_configs:
-            if portal_key in domain:
-                return self.portal_configs[portal_key]
-        
-        return self.portal_configs['default']
+        return self.portals.lookup(url)
     
     def fetch_page(self, url):
         """Fetch webpage content"""
-        try:
-            response = self.session.get(url, timeout=15)
-            response.raise_for_status()
-            return BeautifulSoup(response.content, 'html.parser')
-        except requests.exceptions.RequestException as e:
-            print(f"Error fetching {url}: {e}")
+        response = self.transport.fetch(url)
+        if response is None:
             return None
+        # Decoded with the charset the transport resolved, so the parser does no detection of its own
+        return BeautifulSoup(response.text, 'html.parser')
     
     def extract_headlines_and_links(self, soup, config, base_url):
         """Extract headlines and their corresponding links"""
@@ -222,15 +71,16 @@ class NewsPortalScraper:
         
         return news_items
 
+    def fetch_article(self, url):
+        """Fetch stage: article HTML decoded with its resolved charset, or None"""
+        return self.transport.fetch_text(url, expect='html')
+
     def extract_headline_and_body(self, url):
-        download = trafilatura.fetch_url(url)
+        download = self.fetch_article(url)
 
         if download:
-            result = trafilatura.extract(download)
-            if result:
-                parts = result.split('\n', 1)
-                headline = parts[0].strip()
-                body = parts[1].strip() if len(parts) > 1 else ""
+            headline, body = extract_article(download)
+            if headline is not None:
                 return headline, body
             else:
                 print("Could not extract the article content.") 
@@ -238,8 +88,15 @@ class NewsPortalScraper:
             print("Failed to fetch the URL content.")
         return None, None
    
-    def scrape_news_portal(self, portal_url):
-        """Main method to scrape news from a portal"""
+    def scrape_news_portal(self, portal_url, output_path='news_articles.jsonl', json_path='news_articles.json',
+                           writer=None):
+        """
+        Main method to scrape news from a portal.
+        Articles are streamed to output_path (JSON Lines) as they finish; if
+        json_path is set, the stream is turned into a JSON array at the end.
+        Passing a writer sends the articles there instead; the caller then
+        owns closing it.
+        """
         print(f"Scraping news from: {portal_url}")
         print("=" * 60)
         
@@ -262,31 +119,38 @@ class NewsPortalScraper:
         
         # Scrape Headlines and URLs
         scraped_news = []
-        full_article = []
-        for i, item in enumerate(news_items):
-            print(f"{i+1}. HEADLINE: {item['headline']}")
-            news_data = {
-                'headline': item['headline'],
-                'url': item['url'],
-                }  
-            scraped_news.append(news_data)
-            if item['url']:
-                print(f"   URL: {item['url']}")
-                news_content = self.extract_headline_and_body(item['url'])
-                if news_content:
-                    print(f"   HEADLINE: {news_content[0]}")
-                    print(f"   BODY: {news_content[1]}")
-                    full_article.append({
-                        'headline': news_content[0],
-                        'url': item['url'],
-                        'body': news_content[1]
-                    })
-                    if full_article:
-                        with open('news_articles.json', 'w', encoding='utf-8') as f:
-                            json.dump(full_article, f, ensure_ascii=False, indent=4)
-                            print("News articles saved to 'news_articles.json'")
-                print("-" * 50)
-        time.sleep(2)  # Respectful scraping delay
+        own_writer = writer is None
+        if own_writer:
+            writer = JsonlWriter(output_path)
+        try:
+            for i, item in enumerate(news_items):
+                print(f"{i+1}. HEADLINE: {item['headline']}")
+                news_data = {
+                    'headline': item['headline'],
+                    'url': item['url'],
+                    }  
+                scraped_news.append(news_data)
+                if item['url']:
+                    print(f"   URL: {item['url']}")
+                    news_content = self.extract_headline_and_body(item['url'])
+                    if news_content:
+                        print(f"   HEADLINE: {news_content[0]}")
+                        print(f"   BODY: {news_content[1]}")
+                        writer.write({
+                            'headline': news_content[0],
+                            'url': item['url'],
+                            'body': news_content[1]
+                        })
+                    print("-" * 50)
+        finally:
+            # Whatever was scraped before an error is flushed and kept
+            if own_writer:
+                writer.close()
+        if own_writer and json_path:
+            writer.finalize(json_path)
+            print(f"{writer.count} news articles saved to '{output_path}' and '{json_path}'")
+        elif own_writer:
+            print(f"{writer.count} news articles saved to '{output_path}'")
         return scraped_news
     
     def extract_video_id(self, url):
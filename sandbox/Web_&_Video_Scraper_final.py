@@ -1,292 +1,319 @@
 import re
-import requests
-from bs4 import BeautifulSoup
-from urllib.parse import urljoin, urlparse
+import sys
+import atexit
 import time
-import trafilatura
-from youtube_transcript_api import YouTubeTranscriptApi
+import argparse
+from html_parsers import parse_html
+from urllib.parse import urljoin, urlparse
+from extraction import ExtractionPipeline, extract_article
+from transcripts import TranscriptClient
+from transcript_cache import TranscriptCache
 import json
+from jsonl_writer import JsonlWriter
+from fetch_engine import ConcurrentFetcher
+from transport import HttpTransport
+from http_cache import HttpCache
+from politeness import HostScheduler
+from seen_index import SeenIndex
+from extract_cache import ExtractionCache
+from near_duplicates import NearDuplicateIndex
+from url_canon import dedupe_news_items
+from records import Article, NewsItem, RecordBatch, TranscriptParagraph, to_plain
+from metrics import default_metrics
+from portal_registry import PORTALS_DIR, load_registry
+from feeds import discover_feed_urls, fresh_items, parse_feed, sitemaps_from_robots
+from watch import AdaptivePoller
 
 class NewsPortalScraper:
-    def __init__(self):
-        self.session = requests.Session()
-        self.session.headers.update({
-            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
-        })
+    def __init__(self, max_workers=8, per_host_limit=4, extract_workers=None, cache_dir='.http_cache',
+                 seen_index_path='seen_urls.sqlite', host_rate=2.0, metrics=None, portals_dir=PORTALS_DIR,
+                 near_duplicate_path='near_duplicates.sqlite', collapse_duplicates=False,
+                 extract_cache_dir='.extract_cache', transcript_workers=4,
+                 transcript_cache_dir='.transcript_cache'):
+        # Per-stage and per-host latency histograms and counters for the whole run
+        self.metrics = metrics if metrics is not None else default_metrics
+        # One pooled transport for the homepage and every article body, backed by an on-disk cache.
+        # Politeness is a per-host budget: host_rate requests/second, robots.txt Crawl-delay, Retry-After
+        cache = HttpCache(cache_dir) if cache_dir else None
+        scheduler = HostScheduler(rate=host_rate, burst=per_host_limit)
+        self.transport = HttpTransport(pool_per_host=per_host_limit, cache=cache, scheduler=scheduler,
+                                       metrics=self.metrics)
+        self.session = self.transport.session
+        # Article pages are fetched concurrently, bounded globally and per host
+        self.fetcher = ConcurrentFetcher(max_workers=max_workers, per_host_limit=per_host_limit)
+        # Extraction results keyed by a hash of the page HTML, so unchanged pages are not parsed again
+        self.extract_cache = ExtractionCache(extract_cache_dir) if extract_cache_dir else None
+        # trafilatura extraction is CPU-bound, so it runs in a process pool fed by the fetcher
+        self.pipeline = ExtractionPipeline(self.fetcher, self.fetch_article, workers=extract_workers,
+                                           metrics=self.metrics, cache=self.extract_cache)
+        # Article URLs already extracted in earlier runs
+        self.seen = SeenIndex(seen_index_path) if seen_index_path else None
+        # SimHash fingerprints of article bodies, to spot the same wire story on several portals.
+        # Near-duplicates are flagged with 'duplicate_of', or left out with collapse_duplicates
+        self.near_duplicates = NearDuplicateIndex(near_duplicate_path) if near_duplicate_path else None
+        self.collapse_duplicates = collapse_duplicates
+        # YouTube transcripts go through one pooled session of their own, several videos at a time,
+        # and are kept on disk so a video already seen is not downloaded again
+        transcript_cache = TranscriptCache(transcript_cache_dir) if transcript_cache_dir else None
+        self.transcripts = TranscriptClient(max_workers=transcript_workers, metrics=self.metrics,
+                                            headers={'User-Agent': self.session.headers['User-Agent']},
+                                            cache=transcript_cache)
         
-        # Common selectors for different news portals
-        self.portal_configs = {
-            'bbc.com': {
-                'headline_selectors': [
-                    'h2[data-testid="card-headline"]',
-                    'h3[data-testid="card-headline"]',
-                    'h2',
-                    'h3.gs-c-promo-heading__title'
-                ],
-                'link_selectors': [
-                    'a[data-testid="internal-link"]',
-                    'h2[data-testid="card-headline"] a',
-                    'h3[data-testid="card-headline"] a'
-                ],
-                'article_content_selectors': [
-                    '[data-component="text-block"] p',
-                    'div[data-component="text-block"]',
-                    '.story-body p',
-                    'article p'
-                ]
-            },
-            'prothomalo.com': {
-                'headline_selectors': [
-                    'h1.headline',
-                    'h2.headline',
-                    'h3.story_title',
-                    '.title a',
-                    'h2',
-                    'h3'
-                ],
-                'link_selectors': [
-                    '.title a',
-                    '.story_title a',
-                    'h2 a',
-                    'h3 a'
-                ],
-                'article_content_selectors': [
-                    '.story_content p',
-                    '.news_content p',
-                    'article p',
-                    '.content p'
-                ]
-            },
-            'thedailystar.net': {
-                'headline_selectors': [
-                    'h2.title',
-                    'h3.title',
-                    '.article-title',
-                    '.news-title',
-                    '.story-title',
-                    'h2',
-                    'h3'
-                ],
-                'link_selectors': [
-                    '.title a',
-                    '.article-title a',
-                    '.news-title a',
-                    'h2 a',
-                    'h3 a',
-                    'a[href*="/news/"]',
-                    'a[href*="/article/"]'
-                ],
-                'article_content_selectors': [
-                    '.article-content p',
-                    '.news-content p',
-                    '.story-content p',
-                    '.content-body p',
-                    'article p',
-                    '.content p'
-                ]
-            },
-            'cnn.com': {
-                'headline_selectors': [
-                    'h3.cd__headline',
-                    '.cd__headline',
-                    'h2.headline',
-                    'h3.headline',
-                    '.card-media__headline',
-                    '.article-title',
-                    'h2',
-                    'h3'
-                ],
-                'link_selectors': [
-                    '.cd__headline a',
-                    'h3.cd__headline a',
-                    '.card-media__headline a',
-                    'a[data-link-type="article"]',
-                    'h2 a',
-                    'h3 a',
-                    'a[href*="/2024/"]',
-                    'a[href*="/2025/"]'
-                ],
-                'article_content_selectors': [
-                    '.article__content p',
-                    '.zn-body__paragraph',
-                    'div[data-module="ArticleBody"] p',
-                    '.pg-rail-tall__body p',
-                    'article p',
-                    '.content p'
-                ]
-            },
-            'news24bd.tv': {
-                'headline_selectors': [
-                    '.news-title',
-                    '.article-title',
-                    '.post-title',
-                    'h2.title',
-                    'h3.title',
-                    '.headline',
-                    'h2',
-                    'h3'
-                ],
-                'link_selectors': [
-                    '.news-title a',
-                    '.article-title a',
-                    '.post-title a',
-                    'h2.title a',
-                    'h3.title a',
-                    '.headline a',
-                    'h2 a',
-                    'h3 a',
-                    'a[href*="/news/"]'
-                ],
-                'article_content_selectors': [
-                    '.news-content p',
-                    '.article-content p',
-                    '.post-content p',
-                    '.story-content p',
-                    '.content-body p',
-                    'article p',
-                    '.content p'
-                ]
-            },
-            'default': {
-                'headline_selectors': [
-                    'h1', 'h2', 'h3',
-                    '.headline', '.title',
-                    '[class*="headline"]', '[class*="title"]'
-                ],
-                'link_selectors': [
-                    'h1 a', 'h2 a', 'h3 a',
-                    '.headline a', '.title a',
-                    'article a'
-                ],
-                'article_content_selectors': [
-                    'article p', '.content p', '.article-content p',
-                    '.post-content p', '.entry-content p',
-                    '.story-content p', '.news-content p'
-                ]
-            }
-        }
+        # Portal configs (selectors, cache and feed settings) from portals/*.json, shared and hot-reloaded
+        self.portals = load_registry(portals_dir)
+        # Feeds found for portals without 'feed_urls', keyed by host
+        self._discovered_feeds = {}
     
+    def close(self):
+        """Shut down the extraction workers and close the on-disk caches and indexes"""
+        self.pipeline.close()
+        for store in (self.transport.cache, self.extract_cache, self.seen, self.near_duplicates,
+                      self.transcripts.cache):
+            if store is not None:
+                store.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    @property
+    def portal_configs(self):
+        """{portal name: config} as currently loaded, 'default' included"""
+        return self.portals.configs
+
     def get_portal_config(self, url):
         """Get configuration based on the portal URL"""
-        domain = urlparse(url).netloc.lower()
-        
-        for portal_key in self.portal_configs:
-            if portal_key in domain:
-                return self.portal_configs[portal_key]
-        
-        return self.portal_configs['default']
+        return self.portals.lookup(url)
     
-    def fetch_page(self, url):
-        """Fetch webpage content"""
-        try:
-            response = self.session.get(url, timeout=15)
-            response.raise_for_status()
-            return BeautifulSoup(response.content, 'html.parser')
-        except requests.exceptions.RequestException as e:
-            print(f"Error fetching {url}: {e}")
+    def fetch_page(self, url, max_age=None):
+        """Fetch webpage content; max_age overrides the portal's cache_max_age (0 always revalidates)"""
+        config = self.get_portal_config(url)
+        host = urlparse(url).netloc.lower()
+        if max_age is None:
+            max_age = config.get('cache_max_age')
+        with self.metrics.time('stage_seconds', stage='fetch_page', host=host):
+            response = self.transport.fetch(url, max_age=max_age, expect='html')
+        if response is None:
+            return None
+        # Remember feeds the page advertises so the next run can skip the HTML
+        for feed_url in discover_feed_urls(response.content, url):
+            if feed_url not in self._discovered_feeds.setdefault(host, []):
+                self._discovered_feeds[host].append(feed_url)
+        with self.metrics.time('stage_seconds', stage='parse', host=host):
+            # Decoded with the charset the transport resolved, so the parser does no detection of its own
+            return parse_html(response.text, config.get('parser'))
+
+    def feed_urls(self, portal_url, config):
+        """Configured feeds of a portal, or the ones discovered from robots.txt and its homepage"""
+        if config.get('feed_urls'):
+            return config['feed_urls']
+        host = urlparse(portal_url).netloc.lower()
+        if host not in self._discovered_feeds:
+            # The robots.txt the scheduler already read; without one, feeds can still be found on the homepage
+            robots_text = self.transport.robots_txt(portal_url)
+            self._discovered_feeds[host] = sitemaps_from_robots(robots_text) if robots_text else []
+        return self._discovered_feeds[host]
+
+    def extract_from_feeds(self, portal_url, config, max_sitemaps=5, max_age=None):
+        """
+        News items from the portal's RSS/Atom feeds and news sitemaps, or None
+        if no feed could be read. Entries older than feed_max_age_hours are
+        dropped here, before any article is fetched. max_age overrides the
+        portal's cache_max_age for the feeds.
+        """
+        if max_age is None:
+            max_age = config.get('cache_max_age')
+        news_items = []
+        read_any = False
+        pending = list(self.feed_urls(portal_url, config))
+        followed = 0
+        while pending:
+            feed_url = pending.pop(0)
+            content = self.transport.fetch_bytes(feed_url, max_age=max_age, expect=('feed', 'text'))
+            if not content:
+                continue
+            items, nested = parse_feed(content, feed_url)
+            read_any = read_any or bool(items or nested)
+            news_items.extend(items)
+            # A sitemap index points to the actual sitemaps; follow a few of them
+            for sitemap_url in nested[:max_sitemaps - followed]:
+                pending.append(sitemap_url)
+                followed += 1
+        if not read_any:
             return None
+        fresh = fresh_items(news_items, config.get('feed_max_age_hours'))
+        if len(fresh) < len(news_items):
+            print(f"Skipped {len(news_items) - len(fresh)} feed entries older than {config.get('feed_max_age_hours')} hours")
+        return [NewsItem(headline=item['headline'], url=item['url']) for item in fresh]
     
     def extract_headlines_and_links(self, soup, config, base_url):
         """Extract headlines and their corresponding links"""
         news_items = []
         
-        # Try different selectors to find headlines with links
-        for link_selector in config['link_selectors']:
-            links = soup.select(link_selector)
-            if links:
-                for link in links:  # Limit to first 20 items
-                    headline_text = link.get_text(strip=True)
-                    if headline_text and len(headline_text) > 10:  # Filter out short/empty text
-                        href = link.get('href')
-                        if href:
-                            full_url = urljoin(base_url, href)
-                            news_items.append({
-                                'headline': headline_text,
-                                'url': full_url
-                            })
-                break  
+        # One pass over the document finds the first matching link selector
+        # and the first matching headline selector
+        matched = self.compiled_selectors(config).match(soup)
         
-        # If no links found, try to find headlines without links
+        # Headlines with links, from the first link selector that matched
+        for link in matched['link_selectors']:
+            headline_text = link.get_text(strip=True)
+            if headline_text and len(headline_text) > 10:  # Filter out short/empty text
+                href = link.get('href')
+                if href:
+                    full_url = urljoin(base_url, href)
+                    news_items.append(NewsItem(headline=headline_text, url=full_url))
+        
+        # If no links found, fall back to headlines without links
         if not news_items:
-            for headline_selector in config['headline_selectors']:
-                headlines = soup.select(headline_selector)
-                if headlines:
-                    for headline in headlines:
-                        headline_text = headline.get_text(strip=True)
-                        if headline_text and len(headline_text) > 10:
-                            news_items.append({
-                                'headline': headline_text,
-                                'url': None
-                            })
-                    break
+            for headline in matched['headline_selectors']:
+                headline_text = headline.get_text(strip=True)
+                if headline_text and len(headline_text) > 10:
+                    news_items.append(NewsItem(headline=headline_text, url=None))
         
         return news_items
 
+    def compiled_selectors(self, config):
+        """Link and headline selector cascades of a portal config, compiled when it was loaded"""
+        return self.portals.compiled_selectors(config)
+
+    def fetch_article(self, url):
+        """Fetch stage: article HTML decoded with its resolved charset, or None"""
+        with self.metrics.time('stage_seconds', stage='fetch_article', host=self.fetcher.host_of(url)):
+            # Links to PDFs, videos and other non-HTML pages are dropped after the headers
+            return self.transport.fetch_text(url, max_age=self.get_portal_config(url).get('cache_max_age'),
+                                             expect='html')
+
     def extract_headline_and_body(self, url):
-        download = trafilatura.fetch_url(url)
+        download = self.fetch_article(url)
 
         if download:
-            result = trafilatura.extract(download)
-            if result:
-                parts = result.split('\n', 1)
-                headline = parts[0].strip()
-                body = parts[1].strip() if len(parts) > 1 else ""
+            host = self.fetcher.host_of(url)
+            with self.metrics.time('stage_seconds', stage='extract', host=host):
+                if self.extract_cache:
+                    headline, body = self.extract_cache.extract(download, extract_article)
+                else:
+                    headline, body = extract_article(download)
+            if headline is not None:
                 return headline, body
             else:
+                self.metrics.inc('extract_failures_total', host=host)
                 print("Could not extract the article content.") 
         else:
             print("Failed to fetch the URL content.")
         return None, None
    
-    def scrape_news_portal(self, portal_url):
-        """Main method to scrape news from a portal"""
+    def near_duplicate_of(self, url, body):
+        """URL of an earlier article with (almost) the same body, or None; new bodies are indexed"""
+        if self.near_duplicates is None or not body:
+            return None
+        duplicate = self.near_duplicates.check(url, body)
+        if duplicate is None:
+            return None
+        print(f"   Near-duplicate of {duplicate[0]} ({duplicate[1]} bits apart)")
+        self.metrics.inc('near_duplicates_total', host=self.fetcher.host_of(url))
+        return duplicate[0]
+
+    def scrape_news_portal(self, portal_url, output_path='news_articles.jsonl', json_path='news_articles.json',
+                           only_new=True, writer=None, max_age=None):
+        """
+        Main method to scrape news from a portal.
+        Articles are streamed to output_path (JSON Lines) as they finish; if
+        json_path is set, the stream is turned into a JSON array at the end.
+        With only_new, links already in the seen index are not fetched again
+        and new articles are appended to output_path.
+        Passing a writer sends the articles there instead (batch mode); the
+        caller then owns closing it.
+        max_age overrides the portal's cache_max_age for the homepage and
+        feeds; watch mode passes 0 so every poll sees the current page.
+        """
         print(f"Scraping news from: {portal_url}")
         print("=" * 60)
         
-        # Get the main page
-        soup = self.fetch_page(portal_url)
-        if not soup:
-            return []
-        
         # Get portal-specific configuration
         config = self.get_portal_config(portal_url)
         
-        # Extract headlines and links
-        news_items = self.extract_headlines_and_links(soup, config, portal_url)
+        # Feeds and news sitemaps are small and already list canonical links
+        news_items = self.extract_from_feeds(portal_url, config, max_age=max_age)
+        if news_items:
+            print(f"Using the portal's feeds ({len(news_items)} recent entries)")
+        else:
+            # Fall back to the main page and the selector cascades, also when
+            # the feeds were read but every entry in them was stale
+            if news_items is not None:
+                print("No fresh feed entries, using the homepage")
+            soup = self.fetch_page(portal_url, max_age=max_age)
+            if not soup:
+                return RecordBatch(NewsItem)
+            news_items = self.extract_headlines_and_links(soup, config, portal_url)
         
         if not news_items:
             print("No news items found. The website structure might have changed.")
-            return []
+            return RecordBatch(NewsItem)
         
-        print(f"Found {len(news_items)} news items\n")
+        # Merge repeated links to the same article (hero, section block, tracking params, fragments)
+        found = len(news_items)
+        news_items = dedupe_news_items(news_items)
+        print(f"Found {found} news items, {len(news_items)} unique\n")
         
         # Scrape Headlines and URLs
-        scraped_news = []
-        full_article = []
-        for i, item in enumerate(news_items):
-            print(f"{i+1}. HEADLINE: {item['headline']}")
-            news_data = {
-                'headline': item['headline'],
-                'url': item['url'],
-                }  
-            scraped_news.append(news_data)
-            if item['url']:
-                print(f"   URL: {item['url']}")
-                news_content = self.extract_headline_and_body(item['url'])
-                if news_content:
-                    print(f"   HEADLINE: {news_content[0]}")
-                    print(f"   BODY: {news_content[1]}")
-                    full_article.append({
-                        'headline': news_content[0],
-                        'url': item['url'],
-                        'body': news_content[1]
-                    })
-                    if full_article:
-                        with open('news_articles.json', 'w', encoding='utf-8') as f:
-                            json.dump(full_article, f, ensure_ascii=False, indent=4)
-                            print("News articles saved to 'news_articles.json'")
-                print("-" * 50)
-        time.sleep(2)  # Respectful scraping delay
+        scraped_news = RecordBatch(NewsItem)
+        own_writer = writer is None
+        if own_writer:
+            # Incremental runs add to the existing output instead of replacing it
+            writer = JsonlWriter(output_path, append=bool(only_new and self.seen), metrics=self.metrics)
+        try:
+            # Article pages are fetched in parallel and extracted on all cores; results come back in homepage order
+            article_urls = [item['url'] for item in news_items if item['url']]
+            if only_new and self.seen:
+                article_urls = self.seen.unseen(article_urls)
+                print(f"{len(article_urls)} of them not scraped before\n")
+            new_urls = set(article_urls)
+            article_contents = self.pipeline.map(article_urls)
+            pipeline_error = None
+            for i, item in enumerate(news_items):
+                print(f"{i+1}. HEADLINE: {item['headline']}")
+                scraped_news.append(NewsItem(headline=item['headline'], url=item['url']))
+                if item['url']:
+                    print(f"   URL: {item['url']}")
+                    if item['url'] not in new_urls:
+                        print("   Already scraped, skipping")
+                    elif pipeline_error:
+                        print(f"   Not fetched: {pipeline_error}")
+                    else:
+                        try:
+                            news_content = next(article_contents)
+                        except Exception as e:
+                            # The fetch stage died; the remaining articles are reported, not fetched
+                            pipeline_error = f"the article pipeline failed ({str(e)})"
+                            print(f"   Not fetched: {pipeline_error}")
+                        else:
+                            if news_content is None:
+                                # Not recorded as seen: the index only holds articles that were extracted
+                                print("   Same article as an earlier link (rel=canonical), skipping")
+                            else:
+                                print(f"   HEADLINE: {news_content[0]}")
+                                print(f"   BODY: {news_content[1]}")
+                                duplicate_of = self.near_duplicate_of(item['url'], news_content[1])
+                                record = Article(headline=news_content[0], url=item['url'], body=news_content[1],
+                                                 duplicate_of=duplicate_of)
+                                if not (duplicate_of and self.collapse_duplicates):
+                                    writer.write(record)
+                                if self.seen and news_content[0] is not None:
+                                    self.seen.record(item['url'], news_content[1])
+                                    if news_content[2] != item['url']:
+                                        self.seen.record(news_content[2], news_content[1])
+                    print("-" * 50)
+        finally:
+            # Whatever was scraped before an error is flushed and kept
+            if own_writer:
+                writer.close()
+        if own_writer and json_path:
+            writer.finalize(json_path)
+            print(f"{writer.count} news articles saved to '{output_path}' and '{json_path}'")
+        elif own_writer:
+            print(f"{writer.count} news articles saved to '{output_path}'")
         return scraped_news
     
     def extract_video_id(self, url):
@@ -301,100 +328,89 @@ class NewsPortalScraper:
                 return match.group(1)
         return None
     
-    def get_youtube_transcript(self, video_id):
-        """Get transcript from YouTube video"""
-        try:
-            # Create API instance
-            api = YouTubeTranscriptApi()
-            
-            # List available transcripts
-            transcript_list = api.list(video_id)
-            transcripts = list(transcript_list)
-            
-            if not transcripts:
-                return "No transcripts available for this video"
-            
-            # Try to find transcript in preferred order: Bangla, English, then any
-            preferred_languages = ['bn', 'bn-BD', 'en', 'en-US', 'en-GB']
-            selected_transcript = None
-            
-            for lang_code in preferred_languages:
-                for transcript_info in transcripts:
-                    if transcript_info.language_code == lang_code:
-                        selected_transcript = transcript_info
-                        break
-                if selected_transcript:
-                    break
-            
-            # If no preferred language found, use the first available
-            if selected_transcript is None:
-                selected_transcript = transcripts[0]
-            
-            # Fetch the transcript data
-            transcript_data = selected_transcript.fetch()
-            
-            # Create structured text output for terminal
-            print(f"\n{'='*60}")
-            print(f"YOUTUBE VIDEO TRANSCRIPT")
-            print(f"{'='*60}")
-            print(f"Language: {selected_transcript.language_code}")
-            print(f"Type: {'Auto-generated' if selected_transcript.is_generated else 'Manual'}")
-            print(f"{'='*60}\n")
-            
-            # Group transcript into paragraphs (every 10 sentences or 2 minutes)
-            full_article = []
-            current_paragraph = []
-            last_timestamp = 0
-            paragraph_count = 1
-            
-            for item in transcript_data:
-                current_paragraph.append(item.text.strip())
-                
-                # Create new paragraph every 2 minutes or every 10 sentences
-                if (item.start - last_timestamp > 120) or (len(current_paragraph) >= 10):
-                    if current_paragraph:
-                        # Format timestamp
-                        minutes = int(item.start // 60)
-                        seconds = int(item.start % 60)
-                        timestamp = f"[{minutes:02d}:{seconds:02d}]"
-                        
-                        paragraph_text = ' '.join(current_paragraph)
-                        print(f"{timestamp} - Paragraph {paragraph_count}:")
-                        print(f"{paragraph_text}\n")
-                        print("-" * 60)
-                        full_article.append({
-                            'timestamp': timestamp,
-                            'paragraph': paragraph_text
-                        })
-                        
-                        current_paragraph = []
-                        last_timestamp = item.start
-                        paragraph_count += 1
-            
-            # Add remaining text as final paragraph
-            if current_paragraph:
-                final_item = transcript_data[-1]
-                minutes = int(final_item.start // 60)
-                seconds = int(final_item.start % 60)
-                timestamp = f"[{minutes:02d}:{seconds:02d}]"
-                paragraph_text = ' '.join(current_paragraph)
-                print(f"{timestamp} - Paragraph {paragraph_count}:")
-                print(f"{paragraph_text}\n")
+    def get_youtube_transcript(self, video_id, writer=None, output_path='youtube_transcript.jsonl',
+                               json_path='youtube_transcript.json'):
+        """
+        Get transcript from YouTube video (also written as one record to writer, if given).
+        Paragraphs are printed and streamed to output_path (JSON Lines) as they
+        are segmented instead of being collected first; the fetched snippets
+        are still held while they are segmented. With a writer the paragraphs
+        are kept too (in a RecordBatch), since its record holds the whole
+        transcript. If json_path is set, the stream is turned into a JSON
+        array at the end, one paragraph at a time.
+        """
+        result = self.transcripts.fetch(video_id, paragraphs=False)
+        if result['status'] != 'ok':
+            return result['error']
+
+        # Create structured text output for terminal
+        print(f"\n{'='*60}")
+        print(f"YOUTUBE VIDEO TRANSCRIPT")
+        print(f"{'='*60}")
+        print(f"Language: {result['language']}")
+        print(f"Type: {'Auto-generated' if result['is_generated'] else 'Manual'}")
+        print(f"{'='*60}\n")
+
+        # The batch record holds the whole transcript, so only then are paragraphs kept
+        paragraphs = RecordBatch(TranscriptParagraph) if writer is not None else None
+        with JsonlWriter(output_path, batch_size=100, metrics=self.metrics) as paragraph_writer:
+            for number, paragraph in enumerate(self.transcripts.segment(result.pop('snippets')), 1):
+                print(f"{paragraph.timestamp} - Paragraph {number}:")
+                print(f"{paragraph.paragraph}\n")
                 print("-" * 60)
-                full_article.append({
-                    'timestamp': timestamp,
-                    'paragraph': paragraph_text
-                })
-
-            # Save the transcript to a JSON file
-                if full_article:
-                    with open('youtube_transcript.json', 'w', encoding='utf-8') as f:
-                        json.dump(full_article, f, ensure_ascii=False, indent=4)
-                        print("Transcript saved to 'youtube_transcript.json'")
-            return "Transcript extracted successfully"
-            
-        except Exception as e:
-            return f"Could not extract transcript: {str(e)}"
+                paragraph_writer.write(paragraph)
+                if paragraphs is not None:
+                    paragraphs.append(paragraph)
+
+        # Save the transcript to a JSON file
+        if paragraph_writer.count and json_path:
+            paragraph_writer.finalize(json_path)
+            print(f"Transcript saved to '{output_path}' and '{json_path}'")
+        elif paragraph_writer.count:
+            print(f"Transcript saved to '{output_path}'")
+        if writer is not None:
+            result['paragraphs'] = paragraphs
+            writer.write(transcript_record(result))
+        return "Transcript extracted successfully"
+
+    def get_youtube_transcripts(self, video_ids, writer=None):
+        """
+        Transcripts of many videos, fetched concurrently over one session.
+        Returns one result dict per video ID, in order (see TranscriptClient);
+        the successful ones are also written to writer, if given.
+        """
+        results = self.transcripts.fetch_many(video_ids)
+        if writer is not None:
+            for result in results:
+                if result['status'] == 'ok':
+                    writer.write(transcript_record(result))
+        return results
+
+    def find_video_ids(self, soup):
+        """IDs of the YouTube videos a page links to or embeds, in page order"""
+        video_ids = []
+        for node in soup.select('a[href], iframe[src]'):
+            video_id = self.extract_video_id(node.get('href') or node.get('src') or '')
+            if video_id and video_id not in video_ids:
+                video_ids.append(video_id)
+        return video_ids
+
+    def scrape_portal_videos(self, portal_url, output_path='youtube_transcripts.jsonl'):
+        """Extract the transcripts of every YouTube video linked from a portal page"""
+        soup = self.fetch_page(portal_url)
+        if not soup:
+            return []
+        video_ids = self.find_video_ids(soup)
+        if not video_ids:
+            print("No YouTube videos linked from this page.")
+            return []
+        print(f"Extracting transcripts of {len(video_ids)} linked YouTube videos")
+        with JsonlWriter(output_path, metrics=self.metrics) as writer:
+            results = self.get_youtube_transcripts(video_ids, writer=TaggedWriter(writer, type='transcript', source=portal_url))
+        for result in results:
+            print(f"   {result['video_id']}: {result['status']}" + (f" ({result['error']})" if result['error'] else ""))
+        print(f"{writer.count} transcripts saved to '{output_path}'")
+        return results
         
     def is_single_article_url(self,url) -> bool:
         """
@@ -408,35 +424,241 @@ class NewsPortalScraper:
                 break  # Reached end of last slug before finding a digit
         return False  # No digit found → portal page
 
+    def classify_url(self, url):
+        """Route a URL like main() does: ('youtube', video_id), ('article', None) or ('portal', None)"""
+        video_id = self.extract_video_id(url)
+        if video_id:
+            return 'youtube', video_id
+        if self.is_single_article_url(url):
+            return 'article', None
+        return 'portal', None
+
+    def scrape_batch(self, urls, output_path='batch_results.jsonl', report_path='batch_report.json'):
+        """
+        Scrape a list of portal, article and YouTube URLs in this one process,
+        sharing the transport, cache and per-host scheduler. Every result goes
+        to one JSONL file, tagged with its type and source URL; a per-URL
+        status report is written to report_path.
+        """
+        report = [None] * len(urls)
+        articles = []   # (index, url) of single articles, fetched together at the end
+        videos = []     # (index, url, video id) of YouTube videos, fetched concurrently at the end
+
+        with JsonlWriter(output_path, metrics=self.metrics) as writer:
+            for index, url in enumerate(urls):
+                kind, video_id = self.classify_url(url)
+                if kind == 'article':
+                    articles.append((index, url))
+                    continue
+                if kind == 'youtube':
+                    videos.append((index, url, video_id))
+                    continue
+
+                entry = {'url': url, 'type': kind}
+                started = time.time()
+                before = writer.count
+                try:
+                    news = self.scrape_news_portal(url, writer=TaggedWriter(writer, type='article', source=url))
+                    entry['status'] = 'ok' if news else 'no_items'
+                    entry['headlines'] = len(news)
+                except Exception as e:
+                    entry['status'] = 'failed'
+                    entry['error'] = str(e)
+                entry['records'] = writer.count - before
+                entry['seconds'] = round(time.time() - started, 2)
+                report[index] = entry
+
+            # Single articles run through the fetch/extract pipeline together
+            if articles:
+                print(f"Scraping {len(articles)} single articles")
+                article_urls = [url for _, url in articles]
+                try:
+                    for (index, url), content in zip(articles, self.pipeline.map(article_urls)):
+                        entry = {'url': url, 'type': 'article', 'records': 0}
+                        if content is None:
+                            entry['status'] = 'duplicate'
+                        elif content[0] is None:
+                            entry['status'] = 'failed'
+                        else:
+                            duplicate_of = self.near_duplicate_of(content[2], content[1])
+                            if duplicate_of:
+                                entry['duplicate_of'] = duplicate_of
+                            if duplicate_of and self.collapse_duplicates:
+                                entry['status'] = 'duplicate'
+                            else:
+                                TaggedWriter(writer, type='article', source=url).write(
+                                    Article(headline=content[0], url=content[2], body=content[1], duplicate_of=duplicate_of))
+                                entry['status'] = 'ok'
+                                entry['records'] = 1
+                        report[index] = entry
+                except Exception as e:
+                    # The pipeline stopped; articles without a result yet count as failed
+                    print(f"Article pipeline failed: {str(e)}")
+                    for index, url in articles:
+                        if report[index] is None:
+                            report[index] = {'url': url, 'type': 'article', 'records': 0,
+                                             'status': 'failed', 'error': str(e)}
+
+            # YouTube transcripts are fetched several at a time over one session
+            if videos:
+                print(f"Extracting {len(videos)} YouTube transcripts")
+                results = self.transcripts.fetch_many(video_id for _, _, video_id in videos)
+                for (index, url, _), result in zip(videos, results):
+                    entry = {'url': url, 'type': 'youtube', 'records': 0, 'seconds': result['seconds']}
+                    if result['status'] == 'ok':
+                        TaggedWriter(writer, type='transcript', source=url).write(transcript_record(result))
+                        entry['status'] = 'ok'
+                        entry['records'] = 1
+                    else:
+                        entry['status'] = 'failed'
+                        entry['error'] = result['error']
+                    report[index] = entry
+
+        with open(report_path, 'w', encoding='utf-8') as f:
+            json.dump(report, f, ensure_ascii=False, indent=4)
+        ok = sum(1 for entry in report if entry['status'] == 'ok')
+        print(f"Batch finished: {ok}/{len(report)} URLs ok, {writer.count} records saved to '{output_path}', "
+              f"report saved to '{report_path}'")
+        return report
+
+    def configured_portal_urls(self):
+        """Homepage URLs of the portals in portal_configs"""
+        return [config.get('homepage') or f"https://www.{key}/"
+                for key, config in self.portal_configs.items() if key != 'default']
+
+    def watch(self, portal_urls, output_path='watch_articles.jsonl', **poller_options):
+        """
+        Daemon mode: re-poll every portal on its own adaptive schedule (see
+        AdaptivePoller) and append only newly discovered articles to
+        output_path. Runs until interrupted.
+        """
+        if not portal_urls:
+            print("No portals to watch.")
+            return
+        poller = AdaptivePoller(portal_urls, **poller_options)
+        print(f"Watching {len(portal_urls)} portals, new articles go to '{output_path}' (Ctrl+C to stop)")
+        with JsonlWriter(output_path, append=True, metrics=self.metrics) as writer:
+            try:
+                while True:
+                    portal_url, wait = poller.next_portal()
+                    if wait:
+                        time.sleep(wait)
+                    before = writer.count
+                    try:
+                        # max_age=0: a cached homepage or feed would hide what was published since the last poll
+                        self.scrape_news_portal(portal_url, only_new=True, writer=TaggedWriter(writer, source=portal_url),
+                                                max_age=0)
+                    except Exception as e:
+                        print(f"An error occurred while polling {portal_url}: {e}")
+                    writer.flush()
+                    new_count = writer.count - before
+                    interval = poller.record(portal_url, new_count)
+                    print(f"{portal_url}: {new_count} new articles, next poll in {interval:.0f}s")
+            except KeyboardInterrupt:
+                print("Watch stopped")
+
+
+def transcript_record(result):
+    """JSONL record of a successful TranscriptClient result"""
+    return {
+        'video_id': result['video_id'],
+        'language': result['language'],
+        'paragraphs': result['paragraphs']
+    }
+
+
+class TaggedWriter:
+    """Adds fixed fields (record type, batch source URL) to every record written through it"""
+
+    def __init__(self, writer, **tags):
+        self.writer = writer
+        self.tags = tags
+
+    def write(self, record):
+        self.writer.write({**self.tags, **to_plain(record)})
+
+
+def read_url_list(source):
+    """URLs from a file ('-' for stdin), one per line; blank lines and # comments are skipped"""
+    f = sys.stdin if source == '-' else open(source, encoding='utf-8')
+    try:
+        urls = []
+        for line in f:
+            line = line.strip()
+            if not line or line.startswith('#'):
+                continue
+            if not line.startswith(('http://', 'https://')):
+                line = 'https://' + line
+            urls.append(line)
+        return urls
+    finally:
+        if f is not sys.stdin:
+            f.close()
+
+
+def write_metrics(metrics, prefix):
+    """JSON summary and Prometheus text export of a run's metrics"""
+    metrics.write_json(prefix + '.json')
+    metrics.write_prometheus(prefix + '.prom')
+    print(f"Metrics saved to '{prefix}.json' and '{prefix}.prom'")
+
 
 def main():
-    scraper = NewsPortalScraper()
+    parser = argparse.ArgumentParser(description="Scrape a news portal, a single article or a YouTube transcript.")
+    parser.add_argument('--batch', metavar='FILE',
+                        help="scrape every URL listed in FILE (one per line, '-' for stdin) without prompting")
+    parser.add_argument('--watch', metavar='FILE', nargs='?', const='',
+                        help="keep polling the portals listed in FILE (default: the configured portals) "
+                             "and save only new articles")
+    parser.add_argument('--output', help="JSONL results of --batch (batch_results.jsonl) "
+                                         "or --watch (watch_articles.jsonl)")
+    parser.add_argument('--report', default='batch_report.json', help="per-URL status report of --batch")
+    parser.add_argument('--videos', action='store_true',
+                        help="with a portal URL, also extract the transcripts of the YouTube videos it links to "
+                             "(saved to youtube_transcripts.jsonl)")
+    parser.add_argument('--metrics', metavar='PREFIX',
+                        help="at exit, write per-stage/per-host metrics to PREFIX.json and PREFIX.prom (Prometheus)")
+    args = parser.parse_args()
+
+    # Closing the scraper shuts down the extraction process pool and the caches, also on Ctrl+C in --watch
+    with NewsPortalScraper() as scraper:
+        if args.metrics:
+            atexit.register(write_metrics, scraper.metrics, args.metrics)
+
+        if args.batch:
+            scraper.scrape_batch(read_url_list(args.batch), args.output or 'batch_results.jsonl', args.report)
+            return
+        if args.watch is not None:
+            portal_urls = read_url_list(args.watch) if args.watch else scraper.configured_portal_urls()
+            scraper.watch(portal_urls, args.output or 'watch_articles.jsonl')
+            return
   
-    portal_url = input("Enter news portal URL: ").strip()
-    if not portal_url.startswith(('http://', 'https://')):
-        portal_url = 'https://' + portal_url
+        portal_url = input("Enter news portal URL: ").strip()
+        if not portal_url.startswith(('http://', 'https://')):
+            portal_url = 'https://' + portal_url
 
-    video_id = scraper.extract_video_id(portal_url)
-    is_single_article = scraper.is_single_article_url(portal_url)
+        kind, video_id = scraper.classify_url(portal_url)
         
-    try:
-        if video_id:
-            print(f"Extracting transcript for YouTube video ID: {video_id}")
-            transcript_result = scraper.get_youtube_transcript(video_id)
-            if transcript_result != "Transcript extracted successfully":
-                print(f"Error: {transcript_result}")
-        elif is_single_article:
-            content = scraper.extract_headline_and_body(portal_url)
-            if content:
-                print(f"HEADLINE: {content[0]}")
-                print(f"BODY: {content[1]}")
+        try:
+            if kind == 'youtube':
+                print(f"Extracting transcript for YouTube video ID: {video_id}")
+                transcript_result = scraper.get_youtube_transcript(video_id)
+                if transcript_result != "Transcript extracted successfully":
+                    print(f"Error: {transcript_result}")
+            elif kind == 'article':
+                content = scraper.extract_headline_and_body(portal_url)
+                if content:
+                    print(f"HEADLINE: {content[0]}")
+                    print(f"BODY: {content[1]}")
+                else:
+                    print("Could not extract the article content.")
             else:
-                print("Could not extract the article content.")
-        else:
-            scraper.scrape_news_portal(portal_url)
+                scraper.scrape_news_portal(portal_url)
+                if args.videos:
+                    scraper.scrape_portal_videos(portal_url)
 
-    except Exception as e:
-        print(f"An error occurred: {e}")
+        except Exception as e:
+            print(f"An error occurred: {e}")
     
 if __name__ == "__main__":
     main()
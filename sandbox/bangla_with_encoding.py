@@ -1,6 +1,7 @@
 import trafilatura
 import sys
 import io
+from transport import default_transport
 
 # Ensure terminal stdout supports UTF-8 (important for Bangla display)
 sys.stdout = io.TextIOWrapper(sys.stdout.buffer, encoding='utf-8')
@@ -9,7 +10,7 @@ sys.stdout = io.TextIOWrapper(sys.stdout.buffer, encoding='utf-8')
 url = input("Enter url: ")  # Use a Bangla URL if testing Bangla
 
 # Fetch and extract the article
-downloaded = trafilatura.fetch_url(url)
+downloaded = default_transport.fetch_text(url)
 
 if downloaded:
     result = trafilatura.extract(downloaded)
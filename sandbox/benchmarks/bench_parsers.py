@@ -0,0 +1,108 @@
+"""
+Compare HTML parser backends on saved portal homepages.
+
+Homepages are read from the benchmark fixtures,
+benchmarks/fixtures/<portal>/homepage.html (shared with bench_suite.py):
+
+    python benchmarks/bench_parsers.py
+    python benchmarks/bench_parsers.py --record   # re-download the five configured homepages first
+"""
+import argparse
+import importlib.util
+import os
+import sys
+import time
+import tracemalloc
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+ROOT = os.path.dirname(HERE)
+sys.path.insert(0, ROOT)
+
+from html_parsers import available, parse_html  # noqa: E402
+
+PORTAL_HOMEPAGES = {
+    'bbc.com': 'https://www.bbc.com/',
+    'prothomalo.com': 'https://www.prothomalo.com/',
+    'thedailystar.net': 'https://www.thedailystar.net/',
+    'cnn.com': 'https://edition.cnn.com/',
+    'news24bd.tv': 'https://www.news24bd.tv/',
+}
+BACKENDS = ['html.parser', 'lxml', 'selectolax']
+FIXTURES = os.path.join(HERE, 'fixtures')
+
+
+def load_scraper():
+    """Import NewsPortalScraper from the main script (its file name is not importable)"""
+    path = os.path.join(ROOT, 'Web_&_Video_Scraper_final.py')
+    spec = importlib.util.spec_from_file_location('web_video_scraper', path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module.NewsPortalScraper(cache_dir=None, seen_index_path=None, near_duplicate_path=None,
+                                   extract_cache_dir=None, transcript_cache_dir=None)
+
+
+def record(pages_dir):
+    from transport import default_transport
+    for portal, url in PORTAL_HOMEPAGES.items():
+        content = default_transport.fetch_bytes(url)
+        if content:
+            os.makedirs(os.path.join(pages_dir, portal), exist_ok=True)
+            with open(os.path.join(pages_dir, portal, 'homepage.html'), 'wb') as f:
+                f.write(content)
+            print(f"Saved {url} ({len(content) / 1024:.0f} KB)")
+
+
+def bench_page(scraper, portal, content, repeat):
+    config = scraper.portal_configs.get(portal, scraper.portal_configs['default'])
+    base_url = PORTAL_HOMEPAGES.get(portal, 'https://' + portal + '/')
+    results = {}
+    for backend in BACKENDS:
+        if not available(backend):
+            continue
+        start = time.perf_counter()
+        for _ in range(repeat):
+            doc = parse_html(content, backend)
+            items = scraper.extract_headlines_and_links(doc, config, base_url)
+        elapsed = (time.perf_counter() - start) / repeat
+
+        tracemalloc.start()
+        doc = parse_html(content, backend)
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+        del doc
+        results[backend] = (elapsed, peak, len(items))
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--pages', default=FIXTURES, help='directory of <portal>/homepage.html files')
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--record', action='store_true', help='download the configured homepages first')
+    args = parser.parse_args()
+
+    if args.record:
+        record(args.pages)
+
+    pages = []
+    if os.path.isdir(args.pages):
+        pages = sorted(portal for portal in os.listdir(args.pages)
+                       if os.path.isfile(os.path.join(args.pages, portal, 'homepage.html')))
+    if not pages:
+        print(f"No saved homepages in {args.pages}; run with --record first")
+        return
+
+    scraper = load_scraper()
+    print(f"{'portal':<20}{'backend':<14}{'ms/page':>10}{'speedup':>10}{'heap MB':>10}{'items':>8}")
+    for portal in pages:
+        with open(os.path.join(args.pages, portal, 'homepage.html'), 'rb') as f:
+            content = f.read()
+        results = bench_page(scraper, portal, content, args.repeat)
+        baseline = results['html.parser'][0]
+        for backend, (elapsed, peak, count) in results.items():
+            print(f"{portal:<20}{backend:<14}{elapsed * 1000:>10.1f}{baseline / elapsed:>9.1f}x"
+                  f"{peak / 1024 / 1024:>10.1f}{count:>8}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,219 @@
+"""
+Offline benchmark of the scraping hot paths on recorded pages.
+
+Every portal in portal_configs has a homepage and an article under
+benchmarks/fixtures/<portal>/ (homepage.html, article.html); prothomalo.com
+and news24bd.tv are Bangla. Three stages are timed separately:
+
+    parse    parse_html() of the homepage and the article with the portal's backend
+    select   extract_headlines_and_links() on the homepage and
+             scrape_article_content()'s selector path on the article
+             (test_scraper.py extract_article_text: first matching
+             article_content_selector, paragraphs over 20 characters, joined)
+    extract  extract_article() (trafilatura) on the article
+
+and reported as pages/sec, MB/sec and peak Python heap. Results are compared
+with benchmarks/baseline.json; the exit status is 1 if a stage got slower
+than --tolerance allows.
+
+The baseline holds absolute timings of the machine it was recorded on
+(its "machine" entry: platform, Python, processor, CPU count), so it
+only means something on comparable hardware. After changing machines,
+or after an intended speed change, regenerate it with --save-baseline
+and commit the file.
+
+    python benchmarks/bench_suite.py                  # compare with the baseline
+    python benchmarks/bench_suite.py --save-baseline  # accept the current numbers
+    python benchmarks/bench_suite.py --record         # re-record fixtures from the live sites
+"""
+import argparse
+import json
+import os
+import platform
+import statistics
+import sys
+import time
+import tracemalloc
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+ROOT = os.path.dirname(HERE)
+sys.path.insert(0, ROOT)
+
+from bench_parsers import PORTAL_HOMEPAGES, load_scraper  # noqa: E402
+from extraction import extract_article  # noqa: E402
+from html_parsers import parse_html  # noqa: E402
+from test_scraper import NewsPortalScraper as SelectorScraper  # noqa: E402
+
+FIXTURES = os.path.join(HERE, 'fixtures')
+BASELINE = os.path.join(HERE, 'baseline.json')
+STAGES = ('parse', 'select', 'extract')
+# Key of the machine description in the baseline file; every other key is a portal
+MACHINE = 'machine'
+
+
+def record(scraper, fixtures_dir):
+    """Save each portal's live homepage and its first article as fixtures"""
+    for portal, url in PORTAL_HOMEPAGES.items():
+        homepage = scraper.transport.fetch_bytes(url)
+        if not homepage:
+            continue
+        config = scraper.portal_configs[portal]
+        items = scraper.extract_headlines_and_links(parse_html(homepage, config['parser']), config, url)
+        article_url = next((item['url'] for item in items if item['url']), None)
+        article = scraper.transport.fetch_bytes(article_url) if article_url else None
+        if not article:
+            print(f"No article found on {url}, keeping the old fixtures")
+            continue
+        os.makedirs(os.path.join(fixtures_dir, portal), exist_ok=True)
+        for name, content in (('homepage.html', homepage), ('article.html', article)):
+            with open(os.path.join(fixtures_dir, portal, name), 'wb') as f:
+                f.write(content)
+        print(f"Saved {url} and {article_url}")
+
+
+def load_fixtures(fixtures_dir):
+    """{portal: (homepage bytes, article bytes)}"""
+    fixtures = {}
+    for portal in sorted(os.listdir(fixtures_dir)):
+        paths = [os.path.join(fixtures_dir, portal, name) for name in ('homepage.html', 'article.html')]
+        if all(os.path.isfile(path) for path in paths):
+            contents = []
+            for path in paths:
+                with open(path, 'rb') as f:
+                    contents.append(f.read())
+            fixtures[portal] = tuple(contents)
+    return fixtures
+
+
+def machine():
+    """Where the numbers were measured; timings from different machines do not compare"""
+    return {
+        'platform': platform.platform(),
+        'python': platform.python_version(),
+        'processor': platform.processor() or platform.machine(),
+        'cpu_count': os.cpu_count(),
+    }
+
+
+def stage_functions(scraper, content_scraper, portal, homepage, article):
+    """{stage: (function, pages it handles, bytes it reads)}"""
+    config = scraper.portal_configs.get(portal, scraper.portal_configs['default'])
+    base_url = PORTAL_HOMEPAGES.get(portal, 'https://example.com/')
+    home_doc = parse_html(homepage, config['parser'])
+    article_doc = parse_html(article, config['parser'])
+
+    def parse():
+        parse_html(homepage, config['parser'])
+        parse_html(article, config['parser'])
+
+    def select():
+        links = scraper.extract_headlines_and_links(home_doc, config, base_url)
+        content = content_scraper.extract_article_text(article_doc, config)
+        return len(links), len(content)
+
+    def extract():
+        return extract_article(article)
+
+    size = len(homepage) + len(article)
+    return {
+        'parse': (parse, 2, size),
+        'select': (select, 2, size),
+        'extract': (extract, 1, len(article)),
+    }
+
+
+def measure(func, pages, size, repeat):
+    """Median time of `repeat` runs, then one traced run for the peak heap"""
+    func()   # warm-up: imports, selector compilation, trafilatura setup
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        times.append(time.perf_counter() - start)
+    elapsed = statistics.median(times)
+
+    tracemalloc.start()
+    func()
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return {
+        'ms': elapsed * 1000,
+        'pages_per_sec': pages / elapsed,
+        'mb_per_sec': size / elapsed / 1024 / 1024,
+        'peak_mb': peak / 1024 / 1024,
+    }
+
+
+def run(scraper, fixtures, repeat):
+    content_scraper = SelectorScraper()
+    results = {}
+    for portal, (homepage, article) in fixtures.items():
+        stages = stage_functions(scraper, content_scraper, portal, homepage, article)
+        results[portal] = {name: measure(*stages[name], repeat) for name in STAGES}
+    return results
+
+
+def report(results, baseline, tolerance):
+    """Print the results next to the baseline; returns the regressed (portal, stage) pairs"""
+    regressions = []
+    print(f"{'portal':<20}{'stage':<9}{'ms':>9}{'pages/s':>10}{'MB/s':>9}{'peak MB':>9}{'vs base':>10}")
+    for portal, stages in results.items():
+        for stage, numbers in stages.items():
+            base = baseline.get(portal, {}).get(stage)
+            change = ''
+            if base:
+                ratio = numbers['pages_per_sec'] / base['pages_per_sec']
+                change = f"{(ratio - 1) * 100:+.0f}%"
+                if ratio < 1 - tolerance:
+                    regressions.append((portal, stage))
+                    change += ' !'
+            print(f"{portal:<20}{stage:<9}{numbers['ms']:>9.2f}{numbers['pages_per_sec']:>10.1f}"
+                  f"{numbers['mb_per_sec']:>9.1f}{numbers['peak_mb']:>9.1f}{change:>10}")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--fixtures', default=FIXTURES, help='directory of <portal>/homepage.html and article.html')
+    parser.add_argument('--baseline', default=BASELINE, help='JSON file with the reference numbers')
+    parser.add_argument('--repeat', type=int, default=10)
+    parser.add_argument('--tolerance', type=float, default=0.25,
+                        help='allowed drop in pages/sec before a stage counts as a regression')
+    parser.add_argument('--save-baseline', action='store_true', help='store this run as the new baseline')
+    parser.add_argument('--record', action='store_true', help='re-record the fixtures from the live sites first')
+    args = parser.parse_args()
+
+    scraper = load_scraper()
+    if args.record:
+        record(scraper, args.fixtures)
+
+    fixtures = load_fixtures(args.fixtures) if os.path.isdir(args.fixtures) else {}
+    if not fixtures:
+        print(f"No fixtures in {args.fixtures}")
+        return 1
+
+    baseline = {}
+    if os.path.exists(args.baseline) and not args.save_baseline:
+        with open(args.baseline, encoding='utf-8') as f:
+            baseline = json.load(f)
+        recorded_on = baseline.pop(MACHINE, None)
+        if recorded_on and recorded_on != machine():
+            print(f"Baseline was recorded on another machine ({recorded_on['platform']}, "
+                  f"{recorded_on['cpu_count']} CPUs); regenerate it with --save-baseline before comparing\n")
+
+    results = run(scraper, fixtures, args.repeat)
+    regressions = report(results, baseline, args.tolerance)
+
+    if args.save_baseline:
+        with open(args.baseline, 'w', encoding='utf-8') as f:
+            json.dump(dict(results, **{MACHINE: machine()}), f, indent=2, sort_keys=True)
+            f.write('\n')
+        print(f"\nBaseline saved to {args.baseline}")
+    elif regressions:
+        print(f"\n{len(regressions)} stage(s) slower than the baseline by more than {args.tolerance:.0%}")
+        return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
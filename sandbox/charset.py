@@ -0,0 +1,126 @@
+import codecs
+import re
+import threading
+
+# Byte order marks, longest first so UTF-32 is not mistaken for UTF-16
+BOMS = (
+    (codecs.BOM_UTF32_LE, 'utf-32'),
+    (codecs.BOM_UTF32_BE, 'utf-32'),
+    (codecs.BOM_UTF8, 'utf-8-sig'),
+    (codecs.BOM_UTF16_LE, 'utf-16'),
+    (codecs.BOM_UTF16_BE, 'utf-16'),
+)
+# Labels browsers treat as something else (WHATWG encoding standard)
+ALIASES = {
+    'iso-8859-1': 'cp1252',
+    'latin-1': 'cp1252',
+    'latin1': 'cp1252',
+    'us-ascii': 'cp1252',
+    'ascii': 'cp1252',
+    'x-user-defined': 'cp1252',
+}
+
+_HEADER_CHARSET = re.compile(r'charset\s*=\s*["\']?([\w.:-]+)', re.I)
+_META_CHARSET = re.compile(rb'''<meta[^>]+charset\s*=\s*["']?\s*([\w.:-]+)''', re.I)
+_XML_ENCODING = re.compile(rb'''^\s*<\?xml[^>]+encoding\s*=\s*["']([\w.:-]+)''', re.I)
+
+
+def normalize(label):
+    """Python codec name for a charset label, or None if it is unknown"""
+    if not label:
+        return None
+    label = label.strip().lower()
+    label = ALIASES.get(label, label)
+    try:
+        return codecs.lookup(label).name
+    except LookupError:
+        return None
+
+
+def charset_from_header(content_type):
+    match = _HEADER_CHARSET.search(content_type or '')
+    return normalize(match.group(1)) if match else None
+
+
+def charset_from_bom(data):
+    for bom, encoding in BOMS:
+        if data.startswith(bom):
+            return encoding
+    return None
+
+
+def charset_from_meta(data, limit=4096):
+    """<meta charset>, <meta http-equiv="Content-Type"> or the <?xml encoding?> in the first `limit` bytes"""
+    head = data[:limit]
+    match = _XML_ENCODING.search(head) or _META_CHARSET.search(head)
+    if not match:
+        return None
+    encoding = normalize(match.group(1).decode('ascii', 'ignore'))
+    # A document read as bytes cannot really be UTF-16 if its <meta> was readable as ASCII
+    if encoding and encoding.startswith('utf-16'):
+        encoding = 'utf-8'
+    return encoding
+
+
+def looks_like_utf8(data, limit=65536):
+    """Whether the first `limit` bytes are valid UTF-8 (the common case, Bangla portals included)"""
+    try:
+        # A multi-byte character may be cut at the end of the sample
+        codecs.getincrementaldecoder('utf-8')().decode(data[:limit], final=False)
+        return True
+    except UnicodeDecodeError:
+        return False
+
+
+def detect_charset(data, limit=65536):
+    """Statistical guess (charset_normalizer, or chardet) on the first `limit` bytes; UTF-8 if unsure"""
+    sample = data[:limit]
+    try:
+        from charset_normalizer import from_bytes
+        best = from_bytes(sample).best()
+        guess = best.encoding if best else None
+    except ImportError:
+        try:
+            import chardet
+        except ImportError:
+            return 'utf-8'
+        guess = chardet.detect(sample).get('encoding')
+    return normalize(guess) or 'utf-8'
+
+
+class CharsetResolver:
+    """
+    Picks the encoding of a fetched page: HTTP header, then BOM, then the
+    <meta charset> in the first few KB, then a UTF-8 validity check and,
+    as a last resort, a statistical guess on a bounded prefix. The guess is
+    remembered per host, so later undeclared non-UTF-8 pages from that host
+    skip detection.
+    """
+
+    def __init__(self, meta_limit=4096, detect_limit=65536):
+        self.meta_limit = meta_limit
+        self.detect_limit = detect_limit
+        self._by_host = {}
+        self._lock = threading.Lock()
+
+    def resolve(self, host, content_type, data):
+        """(encoding, source) with source one of header, bom, meta, utf-8, host, detected"""
+        encoding = charset_from_header(content_type)
+        if encoding:
+            return encoding, 'header'
+        encoding = charset_from_bom(data)
+        if encoding:
+            return encoding, 'bom'
+        encoding = charset_from_meta(data, self.meta_limit)
+        if encoding:
+            return encoding, 'meta'
+        if looks_like_utf8(data, self.detect_limit):
+            return 'utf-8', 'utf-8'
+        with self._lock:
+            encoding = self._by_host.get(host)
+        if encoding:
+            return encoding, 'host'
+        encoding = detect_charset(data, self.detect_limit)
+        with self._lock:
+            self._by_host[host] = encoding
+        return encoding, 'detected'
@@ -1,8 +1,8 @@
-import requests
+from transport import default_transport
 import justext
 
 url = input("Enter any url: ")
-response = requests.get(url)
+response = default_transport.get(url)
 
 paragraphs = justext.justext(response.content, justext.get_stoplist("English"))
 
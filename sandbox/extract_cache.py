@@ -0,0 +1,135 @@
+import hashlib
+import json
+import os
+import re
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+
+import trafilatura
+
+from extraction import EXTRACT_OPTIONS
+
+# Markup that changes between fetches of an unchanged article but never reaches
+# trafilatura's output: scripts (nonces, timestamps, ad config), styles,
+# comments (render times), AdSense slots and iframes, and per-request tokens.
+# Editorial <ins> insertions are article text and stay.
+VOLATILE_PATTERNS = [
+    re.compile(r'<script\b.*?</script\s*>', re.I | re.S),
+    re.compile(r'<style\b.*?</style\s*>', re.I | re.S),
+    re.compile(r'<noscript\b.*?</noscript\s*>', re.I | re.S),
+    re.compile(r'<!--.*?-->', re.S),
+    re.compile(r'<ins\b[^>]*\bclass\s*=\s*["\'][^"\']*\badsbygoogle\b[^>]*>.*?</ins\s*>', re.I | re.S),
+    re.compile(r'<iframe\b.*?</iframe\s*>', re.I | re.S),
+    re.compile(r'<meta[^>]+name\s*=\s*["\']?(?:csrf|_token|request-id)[^>]*>', re.I),
+    re.compile(r'\s(?:nonce|data-timestamp|data-request-id)\s*=\s*("[^"]*"|\'[^\']*\'|[^\s>]+)', re.I),
+]
+
+
+def strip_volatile(html):
+    for pattern in VOLATILE_PATTERNS:
+        html = pattern.sub('', html)
+    return html
+
+
+class ExtractionCache:
+    """
+    Content-addressed cache of extraction results. The key is a hash of the
+    page HTML (with volatile markup removed, see VOLATILE_PATTERNS) plus the
+    trafilatura version and extraction options, so an unchanged page costs a
+    hash instead of a parse, and upgrading trafilatura or changing options
+    never serves old results. Failed extractions are cached too.
+    Recent results are kept in memory (`memory_items`, LRU); all of them in
+    an SQLite file, where the least recently used are evicted once the
+    stored text exceeds max_bytes.
+    """
+
+    def __init__(self, directory='.extract_cache', max_bytes=64 * 1024 * 1024, memory_items=1024,
+                 options=None, volatile=True):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.memory_items = memory_items
+        self.volatile = volatile
+        options = EXTRACT_OPTIONS if options is None else options
+        self._salt = json.dumps([trafilatura.__version__, options, volatile], sort_keys=True).encode('utf-8')
+        self._memory = OrderedDict()
+        self._lock = threading.Lock()
+        os.makedirs(directory, exist_ok=True)
+        self._db = sqlite3.connect(os.path.join(directory, 'extractions.sqlite'), check_same_thread=False)
+        self._db.execute("""
+            CREATE TABLE IF NOT EXISTS extractions (
+                key TEXT PRIMARY KEY,
+                headline TEXT,
+                body TEXT,
+                size INTEGER NOT NULL,
+                last_access REAL NOT NULL
+            )
+        """)
+        self._db.execute("CREATE INDEX IF NOT EXISTS extractions_last_access ON extractions (last_access)")
+        self._db.commit()
+        self._total = self._db.execute("SELECT COALESCE(SUM(size), 0) FROM extractions").fetchone()[0]
+
+    def key(self, html):
+        """Cache key of a page: hash of its (stripped) HTML, extractor version and options"""
+        if self.volatile:
+            html = strip_volatile(html)
+        digest = hashlib.blake2b(self._salt, digest_size=16)
+        digest.update(html.encode('utf-8'))
+        return digest.hexdigest()
+
+    def get(self, key):
+        """(headline, body) stored under key, or None on a miss"""
+        with self._lock:
+            result = self._memory.get(key)
+            if result is not None:
+                self._memory.move_to_end(key)
+                return result
+            row = self._db.execute("SELECT headline, body FROM extractions WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                return None
+            self._db.execute("UPDATE extractions SET last_access = ? WHERE key = ?", (time.time(), key))
+            self._db.commit()
+            result = (row[0], row[1])
+            self._remember_locked(key, result)
+            return result
+
+    def put(self, key, headline, body):
+        size = len((headline or '').encode('utf-8')) + len((body or '').encode('utf-8')) + 64
+        with self._lock:
+            self._remember_locked(key, (headline, body))
+            row = self._db.execute("SELECT size FROM extractions WHERE key = ?", (key,)).fetchone()
+            self._db.execute("INSERT OR REPLACE INTO extractions VALUES (?, ?, ?, ?, ?)",
+                             (key, headline, body, size, time.time()))
+            self._total += size - (row[0] if row else 0)
+            self._evict_locked()
+            self._db.commit()
+
+    def extract(self, html, extract_func):
+        """extract_func(html) -> (headline, body), served from the cache when the page is unchanged"""
+        key = self.key(html)
+        result = self.get(key)
+        if result is None:
+            result = extract_func(html)
+            self.put(key, *result)
+        return result
+
+    def _remember_locked(self, key, result):
+        self._memory[key] = result
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.memory_items:
+            self._memory.popitem(last=False)
+
+    def _evict_locked(self):
+        if self._total <= self.max_bytes:
+            return
+        rows = self._db.execute("SELECT key, size FROM extractions ORDER BY last_access").fetchall()
+        for key, size in rows:
+            if self._total <= self.max_bytes:
+                break
+            self._db.execute("DELETE FROM extractions WHERE key = ?", (key,))
+            self._memory.pop(key, None)
+            self._total -= size
+
+    def close(self):
+        self._db.close()
@@ -0,0 +1,180 @@
+import os
+import queue
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor
+
+import trafilatura
+
+from metrics import default_metrics
+from url_canon import canonicalize_url, find_canonical_link
+
+_DONE = object()
+_DUPLICATE = object()
+_FAILED = object()
+
+# Keyword arguments for trafilatura.extract; part of the extraction cache key
+EXTRACT_OPTIONS = {}
+
+
+def extract_article(download):
+    """
+    Extract stage: run trafilatura on downloaded HTML and split the result
+    into (headline, body). Module-level so it can run in a worker process.
+    """
+    result = trafilatura.extract(download, **EXTRACT_OPTIONS)
+    if not result:
+        return None, None
+    parts = result.split('\n', 1)
+    headline = parts[0].strip()
+    body = parts[1].strip() if len(parts) > 1 else ""
+    return headline, body
+
+
+def timed_extract(download):
+    """extract_article plus the seconds it took, measured in the worker process"""
+    start = time.perf_counter()
+    headline, body = extract_article(download)
+    return headline, body, time.perf_counter() - start
+
+
+class ExtractionPipeline:
+    """
+    Two-stage article pipeline. The fetch stage downloads pages on the
+    ConcurrentFetcher's threads; the CPU-bound extract stage runs in a
+    process pool sized to the cores. Bounded queues between the stages keep
+    memory flat: fetching pauses when extraction falls behind.
+    Pages whose <link rel="canonical"> points at an article already handled
+    in the same run are not extracted again.
+    Extraction time and failures are recorded per host in `metrics`.
+    With an ExtractionCache, pages whose HTML did not change since they were
+    last extracted are answered from it without going to the process pool.
+    """
+
+    def __init__(self, fetcher, fetch_func, workers=None, queue_size=None, metrics=None, cache=None):
+        self.fetcher = fetcher
+        self.cache = cache
+        self.metrics = metrics if metrics is not None else default_metrics
+        self.fetch_func = fetch_func
+        self.workers = workers or os.cpu_count() or 1
+        self.queue_size = queue_size or 2 * self.workers
+        self._pool = None
+
+    def _get_pool(self):
+        if self._pool is None:
+            self._pool = ProcessPoolExecutor(max_workers=self.workers)
+        return self._pool
+
+    def close(self):
+        if self._pool is not None:
+            self._pool.shutdown()
+            self._pool = None
+
+    def _produce(self, urls, downloads, stop):
+        """
+        Fetch stage: push (url, page) into the bounded downloads queue, in
+        order. An error is passed on as (_FAILED, exception) for map() to
+        raise; `stop` is set when map() is abandoned, and ends the stage.
+        """
+        pages = self.fetcher.map(self.fetch_func, urls)
+        try:
+            for url, download in zip(urls, pages):
+                if not self._put(downloads, (url, download), stop):
+                    return
+        except Exception as e:
+            self._put(downloads, (_FAILED, e), stop)
+        finally:
+            pages.close()
+            self._put(downloads, _DONE, stop)
+
+    @staticmethod
+    def _put(downloads, item, stop):
+        """Queue item, waiting for room; False once stop is set"""
+        while not stop.is_set():
+            try:
+                downloads.put(item, timeout=0.2)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def map(self, urls):
+        """
+        Yield (headline, body, canonical_url) for every url, in input order,
+        or None when the page is a duplicate of an earlier one.
+        An error in the fetch stage is raised here, after the articles
+        already fetched are handed back.
+        """
+        urls = list(urls)
+        downloads = queue.Queue(maxsize=self.queue_size)
+        stop = threading.Event()
+        threading.Thread(target=self._produce, args=(urls, downloads, stop), name='extraction-fetch',
+                         daemon=True).start()
+        try:
+            yield from self._consume(downloads)
+        finally:
+            # Also reached when the caller stops iterating: frees a producer blocked on a full queue
+            stop.set()
+
+    def _consume(self, downloads):
+        handled = set()     # canonical URLs already extracted in this run
+        pool = self._get_pool()
+        pending = deque()   # (url, canonical url, extract-stage future or marker, cache key), in input order
+        while True:
+            item = downloads.get()
+            if item is _DONE:
+                break
+            url, download = item
+            if url is _FAILED:
+                while pending:
+                    yield self._result(pending.popleft())
+                raise download
+            if not download:
+                pending.append((url, url, None, None))
+                continue
+            canonical = find_canonical_link(download, url) or canonicalize_url(url)
+            if canonical in handled or canonicalize_url(url) in handled:
+                pending.append((url, canonical, _DUPLICATE, None))
+                continue
+            handled.update((canonical, canonicalize_url(url)))
+            key = self.cache.key(download) if self.cache else None
+            cached = self.cache.get(key) if key else None
+            if cached is not None:
+                self.metrics.inc('extract_cache_hits_total', host=self.fetcher.host_of(url))
+                future = Future()
+                future.set_result((*cached, None))
+            else:
+                future = pool.submit(timed_extract, download)
+            pending.append((url, canonical, future, key))
+
+            # Hand back finished results in order; block once the extract stage is full
+            while pending and (len(pending) >= self.queue_size or self._ready(pending[0][2])):
+                yield self._result(pending.popleft())
+
+        while pending:
+            yield self._result(pending.popleft())
+
+    @staticmethod
+    def _ready(future):
+        return future is None or future is _DUPLICATE or future.done()
+
+    def _result(self, entry):
+        url, canonical, future, key = entry
+        host = self.fetcher.host_of(url)
+        if future is None:
+            print("Failed to fetch the URL content.")
+            return None, None, canonical
+        if future is _DUPLICATE:
+            self.metrics.inc('articles_duplicate_total', host=host)
+            return None
+        headline, body, seconds = future.result()
+        if seconds is not None:
+            # Extracted now rather than served from the cache
+            self.metrics.observe('stage_seconds', seconds, stage='extract', host=host)
+            if key:
+                self.cache.put(key, headline, body)
+        if headline is None:
+            self.metrics.inc('extract_failures_total', host=host)
+            print("Could not extract the article content.")
+        return headline, body, canonical
@@ -0,0 +1,117 @@
+import io
+import xml.etree.ElementTree as ET
+from datetime import datetime, timedelta, timezone
+from email.utils import parsedate_to_datetime
+from urllib.parse import urljoin
+
+from url_canon import link_tags
+
+FEED_TYPES = (b'application/rss+xml', b'application/atom+xml')
+
+
+def discover_feed_urls(html, base_url, limit=65536):
+    """RSS/Atom feeds advertised with <link rel="alternate"> in the page head"""
+    feeds = []
+    for attrs in link_tags(html, limit):
+        if (b'alternate' in attrs.get(b'rel', b'').lower().split()
+                and attrs.get(b'type', b'').lower() in FEED_TYPES and attrs.get(b'href')):
+            url = urljoin(base_url, attrs[b'href'].decode('utf-8', 'ignore').strip())
+            if url not in feeds:
+                feeds.append(url)
+    return feeds
+
+
+def sitemaps_from_robots(robots_text):
+    """News sitemaps listed as 'Sitemap:' lines in robots.txt"""
+    sitemaps = []
+    for line in robots_text.splitlines():
+        name, _, value = line.partition(':')
+        if name.strip().lower() == 'sitemap' and 'news' in value.lower():
+            sitemaps.append(value.strip())
+    return sitemaps
+
+
+def parse_date(value):
+    """RFC 822 (RSS) or ISO 8601 (Atom, sitemaps) date as an aware datetime, or None"""
+    if not value:
+        return None
+    value = value.strip()
+    try:
+        parsed = datetime.fromisoformat(value)
+    except ValueError:
+        try:
+            parsed = parsedate_to_datetime(value)
+        except (TypeError, ValueError):
+            return None
+    if parsed.tzinfo is None:
+        parsed = parsed.replace(tzinfo=timezone.utc)
+    return parsed
+
+
+ENTRY_TAGS = ('item', 'entry', 'url', 'sitemap')
+DATE_TAGS = ('pubDate', 'published', 'updated', 'lastmod', 'publication_date', 'date')
+
+
+def _split(tag):
+    namespace, _, name = tag.rpartition('}')
+    return namespace, name
+
+
+def parse_feed(content, base_url):
+    """
+    Parse an RSS, Atom or (news) sitemap document with a streaming parser.
+    Returns (items, nested_sitemaps): items are dicts with 'headline', 'url'
+    and 'published' (datetime or None); nested_sitemaps lists the <loc>s of
+    a sitemap index. A document that is cut off or broken part-way gives the
+    entries read before the error; one that is not XML at all gives ([], []).
+    """
+    items = []
+    nested = []
+    fields = None   # fields of the entry being read, None outside entries
+    try:
+        for event, element in ET.iterparse(io.BytesIO(content), events=('start', 'end')):
+            namespace, name = _split(element.tag)
+            if event == 'start':
+                if name in ENTRY_TAGS:
+                    fields = {}
+                continue
+            if fields is None or 'image' in namespace or 'video' in namespace:
+                continue
+            text = (element.text or '').strip()
+            if name == 'link':
+                # RSS: <link>url</link>; Atom: <link rel="alternate" href="url"/>
+                href = element.get('href')
+                if href and element.get('rel', 'alternate') == 'alternate':
+                    fields.setdefault('url', href)
+                elif text:
+                    fields.setdefault('url', text)
+            elif name == 'loc':
+                fields.setdefault('url', text)
+            elif name == 'title':
+                fields.setdefault('headline', text)
+            elif name in DATE_TAGS:
+                fields.setdefault('published', text)
+            elif name in ENTRY_TAGS:
+                if fields.get('url'):
+                    if name == 'sitemap':
+                        nested.append(urljoin(base_url, fields['url']))
+                    else:
+                        items.append({
+                            'headline': fields.get('headline') or '',
+                            'url': urljoin(base_url, fields['url']),
+                            'published': parse_date(fields.get('published'))
+                        })
+                fields = None
+                # Finished entries are dropped so memory stays flat on large sitemaps
+                element.clear()
+    except ET.ParseError:
+        pass
+    return items, nested
+
+
+def fresh_items(items, max_age_hours=None, now=None):
+    """Drop items published more than max_age_hours ago (undated items are kept)"""
+    if not max_age_hours:
+        return items
+    cutoff = (now or datetime.now(timezone.utc)) - timedelta(hours=max_age_hours)
+    return [item for item in items if item['published'] is None or item['published'] >= cutoff]
@@ -0,0 +1,61 @@
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from urllib.parse import urlparse
+
+
+class ConcurrentFetcher:
+    """
+    Runs a fetch function over many URLs on a thread pool.
+    At most `max_workers` calls run at once in total and at most
+    `per_host_limit` of them go to the same host. Results come back
+    in the same order as the input URLs.
+    """
+
+    def __init__(self, max_workers=8, per_host_limit=4):
+        self.max_workers = max(1, max_workers)
+        self.per_host_limit = max(1, per_host_limit)
+
+    @staticmethod
+    def host_of(url):
+        return urlparse(url).netloc.lower()
+
+    def map(self, func, urls):
+        """Yield func(url) for every url, in input order, as soon as each one is ready"""
+        urls = list(urls)
+        if not urls:
+            return
+
+        # One queue of pending indexes per host, so a busy host never
+        # blocks a worker slot that another host could use
+        queues = {}
+        for index, url in enumerate(urls):
+            queues.setdefault(self.host_of(url), deque()).append(index)
+
+        active = {host: 0 for host in queues}
+        running = {}    # future -> host
+        finished = {}   # index -> future
+        next_index = 0
+
+        with ThreadPoolExecutor(max_workers=self.max_workers) as pool:
+            while next_index < len(urls):
+                # Fill free slots, earliest pending URL first
+                for host in sorted((h for h in queues if queues[h]), key=lambda h: queues[h][0]):
+                    queue = queues[host]
+                    while queue and len(running) < self.max_workers and active[host] < self.per_host_limit:
+                        index = queue.popleft()
+                        future = pool.submit(func, urls[index])
+                        future.index = index
+                        running[future] = host
+                        active[host] += 1
+
+                # Hand back everything that is ready, keeping input order
+                while next_index in finished:
+                    yield finished.pop(next_index).result()
+                    next_index += 1
+                if next_index >= len(urls):
+                    break
+
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in done:
+                    active[running.pop(future)] -= 1
+                    finished[future.index] = future
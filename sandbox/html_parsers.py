@@ -0,0 +1,76 @@
+from bs4 import BeautifulSoup
+
+# Backends that return a BeautifulSoup tree (full bs4 API: select, find, find_all, ...)
+SOUP_BACKENDS = ('html.parser', 'lxml', 'html5lib')
+# Lexbor-based backend: much faster and lighter, but only the select() interface
+SELECTOLAX_BACKENDS = ('selectolax', 'lexbor')
+
+DEFAULT_BACKEND = 'html.parser'
+
+_unavailable = set()
+
+
+class SelectolaxNode:
+    """Wraps a selectolax node in the subset of the bs4 Tag API the scrapers use"""
+    __slots__ = ('node',)
+
+    def __init__(self, node):
+        self.node = node
+
+    def get_text(self, strip=False):
+        return self.node.text(strip=strip)
+
+    def get(self, attribute, default=None):
+        value = self.node.attributes.get(attribute)
+        return default if value is None else value
+
+    def select(self, selector):
+        return [SelectolaxNode(node) for node in self.node.css(selector)]
+
+
+class SelectolaxDocument(SelectolaxNode):
+    """Parsed document from the lexbor backend, queried with CSS selectors like a soup"""
+    __slots__ = ('tree',)
+
+    def __init__(self, content):
+        from selectolax.lexbor import LexborHTMLParser
+        self.tree = LexborHTMLParser(content)
+        super().__init__(self.tree.root)
+
+    def select(self, selector):
+        return [SelectolaxNode(node) for node in self.tree.css(selector)]
+
+
+def available(backend):
+    """Whether the library behind a backend is installed"""
+    try:
+        if backend in SELECTOLAX_BACKENDS:
+            import selectolax.lexbor  # noqa: F401
+        elif backend == 'lxml':
+            import lxml  # noqa: F401
+        elif backend == 'html5lib':
+            import html5lib  # noqa: F401
+        return True
+    except ImportError:
+        return False
+
+
+def parse_html(content, backend=DEFAULT_BACKEND):
+    """
+    Parse HTML with the chosen backend. Every backend supports
+    doc.select(css) -> nodes with .get_text(strip=...) and .get(attr);
+    the BeautifulSoup backends return a regular soup.
+    Falls back to html.parser if the backend's library is missing.
+    """
+    backend = backend or DEFAULT_BACKEND
+    if backend != DEFAULT_BACKEND and not available(backend):
+        if backend not in _unavailable:
+            _unavailable.add(backend)
+            print(f"HTML parser backend '{backend}' is not installed, using {DEFAULT_BACKEND}")
+        backend = DEFAULT_BACKEND
+
+    if backend in SELECTOLAX_BACKENDS:
+        return SelectolaxDocument(content)
+    if backend in SOUP_BACKENDS:
+        return BeautifulSoup(content, backend)
+    raise ValueError(f"Unknown HTML parser backend: {backend}")
@@ -0,0 +1,170 @@
+import hashlib
+import os
+import re
+import sqlite3
+import threading
+import time
+
+import requests
+
+
+class HttpCache:
+    """
+    Persistent HTTP response cache. Bodies are stored as files, metadata
+    (ETag, Last-Modified, Cache-Control, size, last access) in an SQLite index.
+    Stale entries are revalidated with If-None-Match / If-Modified-Since, and
+    the least recently used bodies are evicted once the cache exceeds max_bytes.
+    """
+
+    def __init__(self, directory='.http_cache', max_bytes=256 * 1024 * 1024):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        os.makedirs(directory, exist_ok=True)
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(os.path.join(directory, 'index.sqlite'), check_same_thread=False)
+        self._db.execute("""
+            CREATE TABLE IF NOT EXISTS entries (
+                url TEXT PRIMARY KEY,
+                filename TEXT NOT NULL,
+                etag TEXT,
+                last_modified TEXT,
+                cache_control TEXT,
+                content_type TEXT,
+                stored_at REAL NOT NULL,
+                last_access REAL NOT NULL,
+                size INTEGER NOT NULL
+            )
+        """)
+        self._db.execute("CREATE INDEX IF NOT EXISTS entries_last_access ON entries (last_access)")
+        self._db.commit()
+
+    def lookup(self, url):
+        """Metadata for a cached URL as a dict, or None"""
+        with self._lock:
+            row = self._db.execute(
+                "SELECT filename, etag, last_modified, cache_control, content_type, stored_at, size"
+                " FROM entries WHERE url = ?", (url,)).fetchone()
+        if row is None:
+            return None
+        keys = ('filename', 'etag', 'last_modified', 'cache_control', 'content_type', 'stored_at', 'size')
+        entry = dict(zip(keys, row))
+        entry['url'] = url
+        return entry
+
+    def is_fresh(self, entry, max_age=None):
+        """Whether an entry can be served without asking the server; max_age overrides Cache-Control"""
+        age = time.time() - entry['stored_at']
+        if max_age is not None:
+            return age < max_age
+        directives = parse_cache_control(entry['cache_control'])
+        seconds = directives.get('max-age')
+        if 'no-cache' in directives or seconds is None or seconds is True:
+            return False
+        return age < seconds
+
+    def conditional_headers(self, entry):
+        """Validators to send when revalidating a stale entry"""
+        headers = {}
+        if entry['etag']:
+            headers['If-None-Match'] = entry['etag']
+        if entry['last_modified']:
+            headers['If-Modified-Since'] = entry['last_modified']
+        return headers
+
+    def response(self, entry):
+        """Rebuild a requests.Response from a cached entry, or None if the body file is gone"""
+        try:
+            with open(os.path.join(self.directory, entry['filename']), 'rb') as f:
+                content = f.read()
+        except OSError:
+            self.delete(entry['url'])
+            return None
+
+        with self._lock:
+            self._db.execute("UPDATE entries SET last_access = ? WHERE url = ?", (time.time(), entry['url']))
+            self._db.commit()
+
+        response = requests.Response()
+        response._content = content
+        response.status_code = 200
+        response.url = entry['url']
+        for name, key in (('ETag', 'etag'), ('Last-Modified', 'last_modified'),
+                          ('Cache-Control', 'cache_control'), ('Content-Type', 'content_type')):
+            if entry[key]:
+                response.headers[name] = entry[key]
+        response.from_cache = True
+        return response
+
+    def store(self, url, response, max_age=None):
+        """Cache a 200 response unless the server forbids it"""
+        cache_control = response.headers.get('Cache-Control')
+        if max_age is None and 'no-store' in parse_cache_control(cache_control):
+            return
+        filename = hashlib.sha1(url.encode('utf-8')).hexdigest()
+        tmp_path = os.path.join(self.directory, f'{filename}.{threading.get_ident()}.tmp')
+        with open(tmp_path, 'wb') as f:
+            f.write(response.content)
+        os.replace(tmp_path, os.path.join(self.directory, filename))
+
+        now = time.time()
+        with self._lock:
+            self._db.execute(
+                "INSERT OR REPLACE INTO entries VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (url, filename, response.headers.get('ETag'), response.headers.get('Last-Modified'),
+                 cache_control, response.headers.get('Content-Type'), now, now, len(response.content)))
+            self._db.commit()
+            self._evict_locked()
+
+    def refresh(self, url, not_modified):
+        """Record a 304: the cached body is valid again, with any updated headers"""
+        headers = not_modified.headers
+        with self._lock:
+            self._db.execute(
+                "UPDATE entries SET stored_at = ?,"
+                " etag = COALESCE(?, etag), last_modified = COALESCE(?, last_modified),"
+                " cache_control = COALESCE(?, cache_control) WHERE url = ?",
+                (time.time(), headers.get('ETag'), headers.get('Last-Modified'),
+                 headers.get('Cache-Control'), url))
+            self._db.commit()
+
+    def delete(self, url):
+        with self._lock:
+            row = self._db.execute("SELECT filename FROM entries WHERE url = ?", (url,)).fetchone()
+            self._db.execute("DELETE FROM entries WHERE url = ?", (url,))
+            self._db.commit()
+        if row:
+            self._remove_file(row[0])
+
+    def _evict_locked(self):
+        total = self._db.execute("SELECT COALESCE(SUM(size), 0) FROM entries").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        rows = self._db.execute("SELECT url, filename, size FROM entries ORDER BY last_access").fetchall()
+        for url, filename, size in rows:
+            if total <= self.max_bytes:
+                break
+            self._db.execute("DELETE FROM entries WHERE url = ?", (url,))
+            self._remove_file(filename)
+            total -= size
+        self._db.commit()
+
+    def _remove_file(self, filename):
+        try:
+            os.remove(os.path.join(self.directory, filename))
+        except OSError:
+            pass
+
+    def close(self):
+        self._db.close()
+
+
+def parse_cache_control(value):
+    """Parse a Cache-Control header into {directive: seconds or True}"""
+    directives = {}
+    for part in (value or '').split(','):
+        match = re.match(r'\s*([\w-]+)\s*(?:=\s*"?(\d+)"?)?', part)
+        if not match:
+            continue
+        name, seconds = match.group(1).lower(), match.group(2)
+        directives[name] = int(seconds) if seconds is not None else True
+    return directives
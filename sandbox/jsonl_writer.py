@@ -0,0 +1,105 @@
+import json
+import os
+import threading
+import time
+
+from metrics import default_metrics
+from records import to_plain
+
+
+class JsonlWriter:
+    """
+    Append-only JSON Lines output: one article record per line. Records
+    are dicts or record types from records.py (nested ones included).
+    Records are buffered and flushed in batches; every batch is written with
+    a single append and fsync'd, so a crash loses at most the unflushed batch
+    and never corrupts what is already on disk.
+    Flush time, records and bytes written are recorded in `metrics`.
+    """
+
+    def __init__(self, path, batch_size=10, append=False, metrics=None):
+        self.path = path
+        self.metrics = metrics if metrics is not None else default_metrics
+        self.batch_size = max(1, batch_size)
+        self.count = 0
+        self._buffer = []
+        self._lock = threading.Lock()
+        self._file = open(path, 'a' if append else 'w', encoding='utf-8')
+
+    def write(self, record):
+        """Queue one record, flushing when a full batch is ready"""
+        line = json.dumps(record, ensure_ascii=False, default=to_plain)
+        with self._lock:
+            self._buffer.append(line)
+            self.count += 1
+            if len(self._buffer) >= self.batch_size:
+                self._flush_locked()
+
+    def flush(self):
+        with self._lock:
+            self._flush_locked()
+
+    def _flush_locked(self):
+        if not self._buffer:
+            return
+        start = time.perf_counter()
+        data = '\n'.join(self._buffer) + '\n'
+        self._file.write(data)
+        self._file.flush()
+        os.fsync(self._file.fileno())
+        self.metrics.observe('stage_seconds', time.perf_counter() - start, stage='write')
+        self.metrics.inc('records_written_total', len(self._buffer), output=self.path)
+        self.metrics.inc('bytes_written_total', len(data.encode('utf-8')), output=self.path)
+        self._buffer = []
+
+    def close(self):
+        if self._file.closed:
+            return
+        self.flush()
+        self._file.close()
+
+    def finalize(self, json_path):
+        """Close the stream and rewrite it as a pretty JSON array at json_path"""
+        self.close()
+        with self.metrics.time('stage_seconds', stage='finalize'):
+            return jsonl_to_json(self.path, json_path)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+
+def read_jsonl(path):
+    """Yield records from a JSONL file, skipping a torn last line left by a crash"""
+    with open(path, encoding='utf-8') as f:
+        for line in f:
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                yield json.loads(line)
+            except json.JSONDecodeError:
+                continue
+
+
+def jsonl_to_json(jsonl_path, json_path):
+    """
+    Convert a JSONL file into the indented JSON array format, replacing
+    json_path atomically. Records are written one at a time, in the same
+    layout as json.dump(records, indent=4), so the file is never loaded whole.
+    """
+    count = 0
+    tmp_path = json_path + '.tmp'
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        for record in read_jsonl(jsonl_path):
+            text = json.dumps(record, ensure_ascii=False, indent=4)
+            # Nested one level inside the array; split on '\n' only, JSON strings never contain a raw one
+            f.write(('[\n' if not count else ',\n') + '\n'.join('    ' + line for line in text.split('\n')))
+            count += 1
+        f.write('\n]' if count else '[]')
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, json_path)
+    return count
@@ -0,0 +1,147 @@
+import hashlib
+import re
+import sqlite3
+import threading
+import time
+import unicodedata
+
+# Words: letters/digits plus the whole Bengali block (vowel signs, virama and
+# nukta are combining marks that \w alone would split words on) and the
+# zero-width (non-)joiners used in Bangla conjuncts
+_TOKEN = re.compile(r'[\wঀ-৿‌‍]+')
+
+FINGERPRINT_BITS = 64
+# max_distance + 1 bands: two fingerprints within max_distance bits share at least one band exactly
+BANDS = 4
+BAND_BITS = FINGERPRINT_BITS // BANDS
+BAND_MASK = (1 << BAND_BITS) - 1
+
+
+def tokenize(text):
+    """Lowercased NFC words of an English or Bangla text"""
+    return _TOKEN.findall(unicodedata.normalize('NFC', text).lower())
+
+
+def shingles(tokens, size=3):
+    """Overlapping word n-grams; texts shorter than `size` words give one shingle"""
+    if len(tokens) <= size:
+        return [' '.join(tokens)] if tokens else []
+    return [' '.join(tokens[i:i + size]) for i in range(len(tokens) - size + 1)]
+
+
+def _hash64(text):
+    return int.from_bytes(hashlib.blake2b(text.encode('utf-8'), digest_size=8).digest(), 'big')
+
+
+def simhash(text, shingle_size=3):
+    """64-bit SimHash of a text's word shingles (None for an empty text)"""
+    features = shingles(tokenize(text), shingle_size)
+    if not features:
+        return None
+    hashes = [_hash64(feature) for feature in features]
+    try:
+        import numpy as np
+    except ImportError:
+        counts = [0] * FINGERPRINT_BITS
+        for value in hashes:
+            for bit in range(FINGERPRINT_BITS):
+                counts[bit] += (value >> bit) & 1
+    else:
+        bits = np.unpackbits(np.array(hashes, dtype='>u8').view(np.uint8).reshape(-1, 8), axis=1)
+        # unpackbits is most significant bit first; flip to bit 0 first
+        counts = bits.sum(axis=0)[::-1].tolist()
+    half = len(hashes) / 2
+    fingerprint = 0
+    for bit, count in enumerate(counts):
+        if count > half:
+            fingerprint |= 1 << bit
+    return fingerprint
+
+
+def hamming(a, b):
+    return bin(a ^ b).count('1')
+
+
+def _signed(value):
+    """SQLite integers are signed 64-bit"""
+    return value - (1 << 64) if value >= 1 << 63 else value
+
+
+def _bands(fingerprint):
+    return [(fingerprint >> (band * BAND_BITS)) & BAND_MASK for band in range(BANDS)]
+
+
+class NearDuplicateIndex:
+    """
+    Persistent SimHash index of article bodies. Copies of the same wire story
+    on several portals differ only in a few words, so their fingerprints are
+    within a few bits of each other. Fingerprints are split into BANDS bands
+    of 16 bits, each indexed, so a lookup reads only the rows that share a
+    band with the new article (a handful, even with millions stored) instead
+    of comparing against all of them.
+    """
+
+    def __init__(self, path='near_duplicates.sqlite', max_distance=3, min_words=30):
+        if max_distance >= BANDS:
+            raise ValueError(f"max_distance must be below {BANDS} with {BANDS} bands")
+        self.path = path
+        self.max_distance = max_distance
+        self.min_words = min_words
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._db.execute("""
+            CREATE TABLE IF NOT EXISTS fingerprints (
+                url TEXT PRIMARY KEY,
+                simhash INTEGER NOT NULL,
+                added_at REAL NOT NULL,
+                b0 INTEGER NOT NULL, b1 INTEGER NOT NULL, b2 INTEGER NOT NULL, b3 INTEGER NOT NULL
+            )
+        """)
+        for band in range(BANDS):
+            self._db.execute(f"CREATE INDEX IF NOT EXISTS fingerprints_b{band} ON fingerprints (b{band})")
+        self._db.commit()
+
+    def fingerprint(self, text):
+        """SimHash of an article body, or None when it is too short to compare reliably"""
+        if not text or len(tokenize(text)) < self.min_words:
+            return None
+        return simhash(text)
+
+    def find(self, fingerprint, exclude=None):
+        """(url, distance) of the closest stored article within max_distance bits, or None"""
+        bands = _bands(fingerprint)
+        query = ' UNION '.join(f"SELECT url, simhash FROM fingerprints WHERE b{band} = ?" for band in range(BANDS))
+        with self._lock:
+            rows = self._db.execute(query, bands).fetchall()
+        best = None
+        for url, stored in rows:
+            if url == exclude:
+                continue
+            distance = hamming(fingerprint, stored & ((1 << 64) - 1))
+            if distance <= self.max_distance and (best is None or distance < best[1]):
+                best = (url, distance)
+        return best
+
+    def add(self, url, fingerprint):
+        with self._lock:
+            self._db.execute(
+                "INSERT OR REPLACE INTO fingerprints (url, simhash, added_at, b0, b1, b2, b3) VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (url, _signed(fingerprint), time.time(), *_bands(fingerprint)))
+            self._db.commit()
+
+    def check(self, url, text):
+        """
+        Index an article body and return (url, distance) of an earlier
+        near-identical article, or None if it is new (or too short to tell).
+        Duplicates are not indexed themselves; the first copy stands for all.
+        """
+        fingerprint = self.fingerprint(text)
+        if fingerprint is None:
+            return None
+        duplicate = self.find(fingerprint, exclude=url)
+        if duplicate is None:
+            self.add(url, fingerprint)
+        return duplicate
+
+    def close(self):
+        self._db.close()
@@ -1,18 +1,22 @@
 import requests
-from bs4 import BeautifulSoup
+from transport import default_transport
+from html_parsers import parse_html
+from portal_registry import load_registry
 from urllib.parse import urljoin, urlparse
 
 def scrape_news_article(url, title_selector='h1'):
     try:
-        response = requests.get(url)
-        response.raise_for_status()  
+        response = default_transport.get(url)
     except requests.exceptions.RequestException as e:
         print(f"Error fetching the URL: {e}")
         return None
 
-    soup = BeautifulSoup(response.text, 'html.parser')
+    # Text decoded by the transport; HTML backend from the portal's config
+    soup = parse_html(response.text, load_registry().lookup(url).get('parser'))
 
-    title_element = soup.find(title_selector)
+    # Only select() is used, which every backend supports
+    title_elements = soup.select(title_selector)
+    title_element = title_elements[0] if title_elements else None
     print(title_element )
     title = title_element.get_text(strip=True) if title_element else "Title not found"
 
@@ -42,7 +46,7 @@ def scrape_news_article(url, title_selector='h1'):
                     content = "\n".join([p.get_text(strip=True) for p in content_elements])
                     print(f"Content found using selector: {selector}")
                 else:
-                    paragraphs = content_elements[0].find_all('p')
+                    paragraphs = content_elements[0].select('p')
                     if paragraphs:
                         content = "\n".join([p.get_text(strip=True) for p in paragraphs])
                         print(f"Content found using selector: {selector}")  
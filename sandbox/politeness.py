@@ -0,0 +1,118 @@
+import threading
+import time
+from email.utils import parsedate_to_datetime
+from urllib.parse import urlsplit
+from urllib.robotparser import RobotFileParser
+
+from resilience import HostUnavailable
+
+
+class HostScheduler:
+    """
+    Per-host politeness: a token bucket for every host, slowed down to the
+    host's robots.txt Crawl-delay and paused after 429/503 responses for as
+    long as Retry-After asks. Only requests to the same host wait on each
+    other; different hosts proceed in parallel.
+    robots.txt is read through `fetch_robots(url)`, which returns the text
+    of the robots.txt of url's host or None (HttpTransport.robots_txt).
+    """
+
+    def __init__(self, rate=2.0, burst=4, fetch_robots=None, user_agent='*', respect_robots=True,
+                 max_crawl_delay=30):
+        self.rate = rate
+        self.burst = burst
+        self.fetch_robots = fetch_robots
+        self.user_agent = user_agent
+        self.respect_robots = respect_robots
+        self.max_crawl_delay = max_crawl_delay
+        self._lock = threading.Lock()
+        self._buckets = {}          # host -> [tokens, last refill time, rate, burst]
+        self._blocked_until = {}    # host -> time before which nothing is sent
+        self._robots_events = {}    # host -> threading.Event set once robots.txt is known
+
+    @staticmethod
+    def host_of(url):
+        return urlsplit(url).netloc.lower()
+
+    def wait(self, url, max_wait=None):
+        """
+        Block the calling thread until a request to url's host is allowed.
+        If the host asked for a pause longer than max_wait seconds, raise
+        HostUnavailable instead of sleeping through it.
+        """
+        host = self.host_of(url)
+        if self.respect_robots:
+            self._ensure_robots(url, host)
+
+        with self._lock:
+            now = time.monotonic()
+            blocked = self._blocked_until.get(host, 0) - now
+            if max_wait is not None and blocked > max_wait:
+                raise HostUnavailable(f"{host} asked for a {blocked:.0f}s pause, skipped until it is over")
+            bucket = self._buckets.get(host)
+            if bucket is None:
+                bucket = self._buckets[host] = [self.burst, time.monotonic(), self.rate, self.burst]
+            tokens, last, rate, burst = bucket
+            tokens = min(burst, tokens + (now - last) * rate)
+            # Take a token now; a negative balance is a reservation for a later slot
+            tokens -= 1
+            bucket[0], bucket[1] = tokens, now
+            delay = -tokens / rate if tokens < 0 else 0.0
+            delay = max(delay, blocked)
+        if delay > 0:
+            time.sleep(delay)
+
+    def penalize(self, url, seconds):
+        """Hold back every request to url's host for `seconds` (Retry-After)"""
+        host = self.host_of(url)
+        with self._lock:
+            until = time.monotonic() + seconds
+            self._blocked_until[host] = max(self._blocked_until.get(host, 0), until)
+
+    def _ensure_robots(self, url, host):
+        """Fetch robots.txt once per host and apply its Crawl-delay / Request-rate"""
+        with self._lock:
+            event = self._robots_events.get(host)
+            first = event is None
+            if first:
+                event = self._robots_events[host] = threading.Event()
+        if not first:
+            event.wait()
+            return
+
+        try:
+            delay = self._crawl_delay(url)
+            if delay:
+                delay = min(delay, self.max_crawl_delay)
+                with self._lock:
+                    # One request per Crawl-delay seconds, no bursts
+                    self._buckets[host] = [1, time.monotonic(), 1.0 / delay, 1]
+        finally:
+            event.set()
+
+    def _crawl_delay(self, url):
+        robots_text = self.fetch_robots(url) if self.fetch_robots is not None else None
+        if not robots_text:
+            return None
+
+        parser = RobotFileParser()
+        parser.parse(robots_text.splitlines())
+        delay = parser.crawl_delay(self.user_agent)
+        if delay is None:
+            rate = parser.request_rate(self.user_agent)
+            if rate and rate.requests:
+                delay = rate.seconds / rate.requests
+        return float(delay) if delay else None
+
+
+def parse_retry_after(value, default=None):
+    """Seconds to wait from a Retry-After header (delta-seconds or HTTP-date)"""
+    if not value:
+        return default
+    value = value.strip()
+    if value.isdigit():
+        return int(value)
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return default
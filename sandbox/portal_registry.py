@@ -0,0 +1,187 @@
+import json
+import os
+import threading
+import time
+from urllib.parse import urlsplit
+
+from portal_selectors import CompiledSelectors
+
+PORTALS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'portals')
+CONFIG_EXTENSIONS = ('.json', '.yaml', '.yml')
+
+_yaml_missing_reported = False
+
+
+class PortalRegistry:
+    """
+    Portal configs loaded from one file per portal (portals/<name>.json, or
+    .yaml/.yml if PyYAML is installed). Each file holds the selector cascades
+    and fetch settings of a portal:
+
+        domains                     hosts it serves (default: the file name); subdomains match too
+        homepage                    URL polled by watch mode
+        headline_selectors, link_selectors, article_content_selectors
+        cache_max_age               seconds a cached copy is served without revalidation
+        parser                      HTML backend: html.parser, lxml or selectolax
+        feed_urls, feed_max_age_hours
+
+    default.<ext> is used for hosts no other file claims.
+    Hosts are looked up in a suffix index keyed by reversed domain labels
+    (www.bbc.com -> com, bbc, www), so a lookup costs one dict probe per
+    label whatever the number of portals, and notbbc.com does not match
+    bbc.com. Selector cascades are compiled once, when the files are loaded.
+    The directory is re-checked at most every `reload_interval` seconds and
+    reloaded when a file was added, removed or modified.
+    """
+
+    def __init__(self, directory=PORTALS_DIR, reload_interval=5):
+        self.directory = directory
+        self.reload_interval = reload_interval
+        self._lock = threading.Lock()
+        self._checked = 0.0
+        self._signature = None
+        # Swapped as a whole on reload so readers never see a half-built registry
+        self._state = ({}, {}, {}, None)    # configs, suffix index, compiled selectors, default
+        self.reload()
+
+    @property
+    def configs(self):
+        """{portal name: config} of every loaded portal, 'default' included"""
+        self._maybe_reload()
+        return self._state[0]
+
+    def lookup(self, url):
+        """Config of the portal serving url's host (longest matching domain suffix), or the default"""
+        self._maybe_reload()
+        _, index, _, default = self._state
+        labels = (urlsplit(url).hostname or '').rstrip('.').split('.')
+        labels.reverse()
+        node = index
+        found = default
+        for label in labels:
+            node = node.get(label)
+            if node is None:
+                break
+            found = node.get(None, found)
+        return found
+
+    def compiled_selectors(self, config):
+        """Link and headline cascades of a config, compiled at load time (on demand for other configs)"""
+        compiled = self._state[2].get(id(config))
+        if compiled is None:
+            compiled = compile_selectors(config)
+        return compiled
+
+    def _maybe_reload(self):
+        now = time.monotonic()
+        if now - self._checked < self.reload_interval:
+            return
+        with self._lock:
+            if now - self._checked < self.reload_interval:
+                return
+            self._checked = now
+            try:
+                if self._scan() != self._signature:
+                    self.reload()
+            except (OSError, ValueError) as e:
+                # Caught mid-edit (a file renamed or removed while scanning); retried on the next check
+                print(f"Keeping the loaded portal configs: {e}")
+
+    def _scan(self):
+        """(name, mtime, size) of every config file, to notice edits"""
+        try:
+            entries = [entry for entry in os.scandir(self.directory)
+                       if entry.is_file() and entry.name.endswith(CONFIG_EXTENSIONS)]
+        except FileNotFoundError:
+            return ()
+        return tuple(sorted((entry.name, entry.stat().st_mtime_ns, entry.stat().st_size) for entry in entries))
+
+    def reload(self):
+        """
+        Read every config file and rebuild the index; a broken file keeps its
+        portal out, not the rest. A missing or broken default config keeps the
+        previously loaded default, and is only an error on the first load.
+        """
+        signature = self._scan()
+        configs = {}
+        compiled = {}
+        for name, _, _ in signature:
+            path = os.path.join(self.directory, name)
+            try:
+                config = load_config_file(path)
+                if config is not None:
+                    # Unsupported selector syntax keeps the portal out instead of matching differently
+                    compiled[id(config)] = compile_selectors(config)
+            except (OSError, ValueError) as e:
+                print(f"Skipping portal config {path}: {e}")
+                continue
+            if config is not None:
+                configs[os.path.splitext(name)[0]] = config
+
+        if 'default' not in configs:
+            previous = self._state[3]
+            if previous is None:
+                raise ValueError(f"No default portal config in {self.directory}")
+            print(f"No valid default portal config in {self.directory}, keeping the previous one")
+            configs['default'] = previous
+            compiled[id(previous)] = self._state[2][id(previous)]
+
+        index = {}
+        for name, config in configs.items():
+            if name == 'default':
+                continue
+            for domain in config.get('domains') or [name]:
+                labels = domain.lower().strip('.').split('.')
+                labels.reverse()
+                node = index
+                for label in labels:
+                    node = node.setdefault(label, {})
+                node[None] = config
+        self._state = (configs, index, compiled, configs['default'])
+        self._signature = signature
+        self._checked = time.monotonic()
+
+
+def compile_selectors(config):
+    return CompiledSelectors(link_selectors=config['link_selectors'],
+                             headline_selectors=config['headline_selectors'])
+
+
+def load_config_file(path):
+    """One portal config from a JSON or YAML file (None for YAML without PyYAML installed)"""
+    global _yaml_missing_reported
+    with open(path, encoding='utf-8') as f:
+        if path.endswith('.json'):
+            config = json.load(f)
+        else:
+            try:
+                import yaml
+            except ImportError:
+                if not _yaml_missing_reported:
+                    _yaml_missing_reported = True
+                    print("PyYAML is not installed, skipping .yaml portal configs")
+                return None
+            try:
+                config = yaml.safe_load(f)
+            except yaml.YAMLError as e:
+                raise ValueError(str(e))
+    if not isinstance(config, dict):
+        raise ValueError("expected a mapping of config keys")
+    for key in ('headline_selectors', 'link_selectors', 'article_content_selectors'):
+        if not isinstance(config.get(key), list):
+            raise ValueError(f"'{key}' must be a list of selectors")
+    return config
+
+
+_registries = {}
+_registries_lock = threading.Lock()
+
+
+def load_registry(directory=PORTALS_DIR, reload_interval=5):
+    """The registry of a directory, built once per process and shared by every scraper"""
+    directory = os.path.abspath(directory)
+    with _registries_lock:
+        registry = _registries.get(directory)
+        if registry is None:
+            registry = _registries[directory] = PortalRegistry(directory, reload_interval)
+        return registry
@@ -0,0 +1,171 @@
+import re
+
+from bs4.element import Tag
+
+# One compound selector: tag, #id, .class and [attr], [attr=v], [attr*=v], [attr^=v], [attr$=v], [attr~=v].
+# Names and unquoted values must be CSS identifiers, as soupsieve requires
+_TOKEN = re.compile(r'''
+      (?P<tag>[a-zA-Z][\w-]*|\*)
+    | \.(?P<cls>-?[^\W\d][\w-]*)
+    | \#(?P<id>-?[^\W\d][\w-]*)
+    | \[\s*(?P<attr>-?[^\W\d][\w-]*)\s*
+        (?:(?P<op>[*^$~]?=)\s*(?:"(?P<dq>[^"]*)"|'(?P<sq>[^']*)'|(?P<bare>-?[^\W\d][\w-]*))\s*)?
+      \]
+''', re.X)
+
+
+class UnsupportedSelector(ValueError):
+    """Selector syntax outside the subset CompiledSelector implements"""
+
+    def __init__(self, selector):
+        super().__init__(f"Unsupported selector {selector!r}: only tag, #id, .class and [attr] compounds "
+                         f"joined by spaces (descendant) are supported")
+        self.selector = selector
+
+
+class Compound:
+    """A single compound selector such as h2.title or a[href*="/news/"]"""
+    __slots__ = ('tag', 'classes', 'element_id', 'attributes')
+
+    def __init__(self, text):
+        self.tag = None
+        self.classes = []
+        self.element_id = None
+        self.attributes = []   # (name, op, value)
+        pos = 0
+        while pos < len(text):
+            match = _TOKEN.match(text, pos)
+            if not match or (match.group('tag') and pos != 0):
+                raise UnsupportedSelector(text)
+            if match.group('tag'):
+                self.tag = None if match.group('tag') == '*' else match.group('tag').lower()
+            elif match.group('cls'):
+                self.classes.append(match.group('cls'))
+            elif match.group('id'):
+                self.element_id = match.group('id')
+            else:
+                value = next((v for v in match.group('dq', 'sq', 'bare') if v is not None), None)
+                self.attributes.append((match.group('attr').lower(), match.group('op'), value))
+            pos = match.end()
+
+    def matches(self, node):
+        if self.tag and node.name != self.tag:
+            return False
+        attrs = node.attrs
+        if self.classes:
+            node_classes = attrs.get('class') or ()
+            for cls in self.classes:
+                if cls not in node_classes:
+                    return False
+        if self.element_id and attrs.get('id') != self.element_id:
+            return False
+        for name, op, value in self.attributes:
+            actual = attrs.get(name)
+            if actual is None:
+                return False
+            if isinstance(actual, list):
+                actual = ' '.join(actual)
+            if op is None:
+                continue
+            if op == '=':
+                if actual != value:
+                    return False
+            elif op == '*=':
+                if not value or value not in actual:
+                    return False
+            elif op == '^=':
+                if not value or not actual.startswith(value):
+                    return False
+            elif op == '$=':
+                if not value or not actual.endswith(value):
+                    return False
+            elif op == '~=':
+                if value not in actual.split():
+                    return False
+        return True
+
+
+class CompiledSelector:
+    """A descendant chain of compounds, e.g. 'h2[data-testid="card-headline"] a'"""
+    __slots__ = ('text', 'ancestors', 'target')
+
+    def __init__(self, text):
+        self.text = text
+        parts = text.split()
+        if not parts or any(part in ('>', '+', '~') or ':' in part or ',' in part for part in parts):
+            raise UnsupportedSelector(text)
+        compounds = [Compound(part) for part in parts]
+        self.ancestors = compounds[:-1]
+        self.target = compounds[-1]
+
+
+class CompiledSelectors:
+    """
+    Several "first matching selector wins" cascades (e.g. link_selectors and
+    headline_selectors) compiled together. match() walks the tree once, tags
+    each element with the highest-priority selector of every cascade it
+    satisfies, and returns, per cascade, the elements of the best selector
+    that matched anything, in document order. This gives the same result as
+    calling soup.select() on each selector in turn until one returns
+    something, for the cost of a single traversal.
+    Selector syntax outside the descendant/compound subset the portal configs
+    use raises UnsupportedSelector (a ValueError) here, rather than being
+    matched differently from select().
+    """
+
+    def __init__(self, **cascades):
+        self.cascades = {name: [CompiledSelector(s) for s in selectors] for name, selectors in cascades.items()}
+
+    def match(self, doc):
+        """{cascade name: elements matched by its first matching selector}"""
+        if not isinstance(doc, Tag):
+            # Non-bs4 backends (selectolax) have no tree to walk here
+            return {name: self._select_first(doc, [c.text for c in compiled])
+                    for name, compiled in self.cascades.items()}
+        if not self.cascades:
+            return {}
+        return self._walk(doc)
+
+    @staticmethod
+    def _select_first(doc, selectors):
+        for selector in selectors:
+            found = doc.select(selector)
+            if found:
+                return found
+        return []
+
+    def _walk(self, doc):
+        names = list(self.cascades)
+        compiled = [self.cascades[name] for name in names]
+        # limit[c]: selectors of cascade c still worth testing (up to the best one matched so far)
+        limit = [len(selectors) for selectors in compiled]
+        tagged = [{} for _ in names]   # selector index -> matched elements
+        # progress[c][i]: how many ancestor compounds of selector i the current ancestor chain satisfies
+        root_progress = tuple(tuple(0 for _ in selectors) for selectors in compiled)
+
+        stack = [(child, root_progress) for child in reversed(doc.contents) if isinstance(child, Tag)]
+        while stack:
+            node, progress = stack.pop()
+            child_progress = []
+            for c, selectors in enumerate(compiled):
+                cascade_progress = progress[c]
+                updated = None
+                tagged_here = False
+                for i in range(limit[c]):
+                    selector = selectors[i]
+                    done = cascade_progress[i]
+                    if not tagged_here and done == len(selector.ancestors) and selector.target.matches(node):
+                        tagged[c].setdefault(i, []).append(node)
+                        tagged_here = True
+                    # Greedy is exact for descendant-only chains: the outermost match is never worse
+                    if done < len(selector.ancestors) and selector.ancestors[done].matches(node):
+                        if updated is None:
+                            updated = list(cascade_progress)
+                        updated[i] = done + 1
+                if tagged_here:
+                    limit[c] = min(tagged[c]) + 1
+                child_progress.append(tuple(updated) if updated is not None else cascade_progress)
+            child_progress = tuple(child_progress)
+            stack.extend((child, child_progress) for child in reversed(node.contents) if isinstance(child, Tag))
+
+        return {name: tagged[c][min(tagged[c])] if tagged[c] else [] for c, name in enumerate(names)}
@@ -0,0 +1,197 @@
+from array import array
+from dataclasses import dataclass, fields, replace
+from typing import Optional
+
+# Precedes every value of a tuple field inside a RecordBatch (never part of a headline)
+_SEPARATOR = '\x1f'
+
+
+class Record:
+    """
+    Base of the scraped record types: frozen, slotted dataclasses (no
+    per-instance __dict__) that still read like the dicts they replace,
+    so item['url'], item.get('url'), 'url' in item and keys() keep working.
+    Subclasses are declared with @record.
+    """
+    __slots__ = ()
+    _keys = ()      # field names, in order
+
+    def __getitem__(self, key):
+        if key not in self:
+            raise KeyError(key)
+        return getattr(self, key)
+
+    def __contains__(self, key):
+        return key in self._keys
+
+    def keys(self):
+        return list(self._keys)
+
+    def get(self, key, default=None):
+        return getattr(self, key) if key in self else default
+
+    def to_dict(self):
+        """Dict form for JSON output; optional fields left at their default are omitted"""
+        data = {}
+        for field in fields(self):
+            value = getattr(self, field.name)
+            if value == field.default and field.default in (None, ()):
+                continue
+            data[field.name] = list(value) if isinstance(value, tuple) else value
+        return data
+
+    @classmethod
+    def from_dict(cls, data):
+        return cls(**{field.name: tuple(data[field.name]) if isinstance(data[field.name], list) else data[field.name]
+                      for field in fields(cls) if field.name in data})
+
+
+def record(cls):
+    """
+    @dataclass(frozen=True) with __slots__ for its fields. Written out, as
+    dataclass(slots=True) does it, because that option needs Python 3.10.
+    """
+    cls = dataclass(frozen=True)(cls)
+    keys = tuple(field.name for field in fields(cls))
+    # Defaults live in the generated __init__, so the class attributes can make way for the slots
+    namespace = {name: value for name, value in cls.__dict__.items()
+                 if name not in keys and name not in ('__dict__', '__weakref__')}
+    namespace.update(__slots__=keys, _keys=keys)
+    return type(cls)(cls.__name__, cls.__bases__, namespace)
+
+
+@record
+class NewsItem(Record):
+    """A headline found on a portal page or feed"""
+    headline: str
+    url: Optional[str]
+    other_headlines: tuple = ()
+
+
+@record
+class Article(Record):
+    """An extracted article, as written to the JSONL output"""
+    headline: Optional[str]
+    url: str
+    body: Optional[str]
+    duplicate_of: Optional[str] = None
+
+
+@record
+class TranscriptParagraph(Record):
+    timestamp: str
+    paragraph: str
+
+
+def updated(item, **changes):
+    """Copy of a record or a dict with some fields changed"""
+    if isinstance(item, Record):
+        return replace(item, **{key: tuple(value) if isinstance(value, list) else value
+                                for key, value in changes.items()})
+    return dict(item, **changes)
+
+
+def to_plain(item):
+    """
+    JSON-ready form of a record (dict) or a RecordBatch (list of dicts);
+    dicts pass through. Usable as json.dumps(..., default=to_plain), so
+    serializers take either form, nested too.
+    """
+    if isinstance(item, dict):
+        return item
+    if isinstance(item, Record):
+        return item.to_dict()
+    if isinstance(item, RecordBatch):
+        return [record.to_dict() for record in item]
+    raise TypeError(f"Object of type {type(item).__name__} is not JSON serializable")
+
+
+class RecordBatch:
+    """
+    Columnar holder for many records of one type. Every field value is
+    appended, UTF-8 encoded, to one shared bytearray, and only its end
+    offset is kept (8 bytes, plus 1 for the None flag), instead of a
+    record object and a str object per field. Records are rebuilt on
+    access. Tuple fields are stored with a separator before every element,
+    so () and ('',) stay apart.
+    Accepts records of record_type or dicts with its fields. Indexing
+    returns a record; slicing returns a new RecordBatch.
+    """
+
+    def __init__(self, record_type, items=()):
+        self.record_type = record_type
+        self._fields = fields(record_type)
+        self._tuple_fields = [field.default == () for field in self._fields]
+        self._buffer = bytearray()
+        self._ends = array('q')     # end offset of every value, record after record
+        self._nulls = array('b')    # 1 where the value is None
+        self.extend(items)
+
+    def append(self, item):
+        if isinstance(item, dict):
+            item = self.record_type.from_dict(item)
+        for field, is_tuple in zip(self._fields, self._tuple_fields):
+            value = getattr(item, field.name)
+            if value is not None:
+                if is_tuple:
+                    value = ''.join(_SEPARATOR + element for element in value)
+                self._buffer += value.encode('utf-8')
+            self._ends.append(len(self._buffer))
+            self._nulls.append(value is None)
+
+    def extend(self, items):
+        for item in items:
+            self.append(item)
+
+    def __len__(self):
+        return len(self._ends) // len(self._fields)
+
+    def __bool__(self):
+        return len(self._ends) > 0
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return RecordBatch(self.record_type, (self[i] for i in range(*index.indices(len(self)))))
+        count = len(self)
+        if index < 0:
+            index += count
+        if not 0 <= index < count:
+            raise IndexError('record index out of range')
+        width = len(self._fields)
+        first = index * width
+        start = self._ends[first - 1] if first else 0
+        values = []
+        for position in range(first, first + width):
+            end = self._ends[position]
+            if self._nulls[position]:
+                values.append(None)
+            else:
+                value = self._buffer[start:end].decode('utf-8')
+                if self._tuple_fields[position - first]:
+                    value = tuple(value.split(_SEPARATOR)[1:])
+                values.append(value)
+            start = end
+        return self.record_type(*values)
+
+    def __iter__(self):
+        for index in range(len(self)):
+            yield self[index]
+
+    def column(self, name):
+        """Values of one field, in order, decoded without rebuilding the records"""
+        offset = [field.name for field in self._fields].index(name)
+        width = len(self._fields)
+        for position in range(offset, len(self._ends), width):
+            if self._nulls[position]:
+                yield None
+                continue
+            start = self._ends[position - 1] if position else 0
+            value = self._buffer[start:self._ends[position]].decode('utf-8')
+            if self._tuple_fields[offset]:
+                value = tuple(value.split(_SEPARATOR)[1:])
+            yield value
+
+    @property
+    def nbytes(self):
+        """Memory held by the buffer and the offset arrays"""
+        return len(self._buffer) + self._ends.itemsize * len(self._ends) + len(self._nulls)
@@ -0,0 +1,92 @@
+import random
+import threading
+import time
+
+import requests
+
+CLOSED = 'closed'
+OPEN = 'open'
+HALF_OPEN = 'half_open'
+
+
+class HostUnavailable(requests.exceptions.ConnectionError):
+    """Raised instead of sending a request to a host whose circuit is open"""
+
+
+class CircuitBreaker:
+    """
+    Per-host circuit breaker. After `failure_threshold` consecutive failures
+    (connection errors, timeouts, 5xx) the host's circuit opens and requests
+    to it fail immediately. After `reset_timeout` seconds one probe request is
+    let through (half-open): success closes the circuit, failure opens it
+    for another `reset_timeout`.
+    """
+
+    def __init__(self, failure_threshold=5, reset_timeout=30):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self._lock = threading.Lock()
+        self._hosts = {}    # host -> [state, consecutive failures, time opened or probe sent]
+
+    def state(self, host):
+        with self._lock:
+            entry = self._hosts.get(host)
+            return entry[0] if entry else CLOSED
+
+    def allow(self, host):
+        """Whether a request to host may be sent now"""
+        with self._lock:
+            entry = self._hosts.get(host)
+            if entry is None or entry[0] == CLOSED:
+                return True
+            # Open, or half-open with a probe that never reported back
+            if time.monotonic() - entry[2] < self.reset_timeout:
+                return False
+            entry[0], entry[2] = HALF_OPEN, time.monotonic()
+            return True
+
+    def record_success(self, host):
+        with self._lock:
+            self._hosts.pop(host, None)
+
+    def record_failure(self, host):
+        """Count a failure; returns True if this one opened the circuit"""
+        with self._lock:
+            entry = self._hosts.setdefault(host, [CLOSED, 0, 0.0])
+            entry[1] += 1
+            if entry[0] == HALF_OPEN or (entry[0] == CLOSED and entry[1] >= self.failure_threshold):
+                entry[0], entry[2] = OPEN, time.monotonic()
+                return True
+            return False
+
+
+class RetryBudget:
+    """
+    Retries allowed across all hosts: every first attempt deposits `ratio`
+    tokens and every retry spends one, so retries stay below about
+    ratio x the request rate however many hosts are failing.
+    `initial` tokens cover the start of a run.
+    """
+
+    def __init__(self, ratio=0.2, initial=10, max_tokens=50):
+        self.ratio = ratio
+        self.max_tokens = max_tokens
+        self._tokens = float(initial)
+        self._lock = threading.Lock()
+
+    def deposit(self):
+        with self._lock:
+            self._tokens = min(self.max_tokens, self._tokens + self.ratio)
+
+    def withdraw(self):
+        """Take a token for one retry; False when the budget is spent"""
+        with self._lock:
+            if self._tokens < 1:
+                return False
+            self._tokens -= 1
+            return True
+
+
+def backoff_delay(attempt, base=0.5, cap=8.0):
+    """Full-jitter exponential backoff: uniform in [0, min(cap, base * 2^attempt)]"""
+    return random.uniform(0, min(cap, base * 2 ** attempt))
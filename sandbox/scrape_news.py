@@ -1,6 +1,7 @@
 import trafilatura
 import sys
 import io
+from transport import default_transport
 
 # Ensure proper UTF-8 output for Bangla and other non-Latin scripts
 sys.stdout = io.TextIOWrapper(sys.stdout.buffer, encoding='utf-8')
@@ -11,7 +12,7 @@ def extract_headline_and_body(url: str):
     Splits the result into headline and body (based on first newline).
     Returns a tuple (headline, body), or (None, None) if failed.
     """
-    downloaded = trafilatura.fetch_url(url)
+    downloaded = default_transport.fetch_text(url)
 
     if downloaded:
         result = trafilatura.extract(downloaded)
@@ -0,0 +1,72 @@
+import hashlib
+import sqlite3
+import threading
+import time
+
+from url_canon import canonicalize_url
+
+
+def index_key(url):
+    """Key an article URL is stored under: its canonical form"""
+    return canonicalize_url(url)
+
+
+def content_hash(text):
+    return hashlib.sha1((text or '').encode('utf-8')).hexdigest()
+
+
+class SeenIndex:
+    """
+    Persistent index of article URLs that have already been extracted, with
+    the time of extraction and a hash of the extracted content. Lets repeat
+    polls of a portal fetch only the links it has not seen before.
+    """
+
+    def __init__(self, path='seen_urls.sqlite'):
+        self.path = path
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._db.execute("""
+            CREATE TABLE IF NOT EXISTS seen (
+                url TEXT PRIMARY KEY,
+                extracted_at REAL NOT NULL,
+                content_hash TEXT
+            )
+        """)
+        self._db.commit()
+
+    def __contains__(self, url):
+        with self._lock:
+            row = self._db.execute("SELECT 1 FROM seen WHERE url = ?", (index_key(url),)).fetchone()
+        return row is not None
+
+    def unseen(self, urls):
+        """The subset of urls not in the index, in input order"""
+        keys = {url: index_key(url) for url in urls}
+        known = set()
+        distinct = list(set(keys.values()))
+        with self._lock:
+            # Stay under SQLite's bound-parameter limit
+            for start in range(0, len(distinct), 500):
+                chunk = distinct[start:start + 500]
+                placeholders = ','.join('?' * len(chunk))
+                rows = self._db.execute(f"SELECT url FROM seen WHERE url IN ({placeholders})", chunk)
+                known.update(row[0] for row in rows)
+        return [url for url in urls if keys[url] not in known]
+
+    def record(self, url, content=None):
+        """Mark url as extracted now, remembering a hash of its content"""
+        with self._lock:
+            self._db.execute(
+                "INSERT OR REPLACE INTO seen (url, extracted_at, content_hash) VALUES (?, ?, ?)",
+                (index_key(url), time.time(), content_hash(content)))
+            self._db.commit()
+
+    def lookup(self, url):
+        """(extracted_at, content_hash) for a URL, or None"""
+        with self._lock:
+            return self._db.execute(
+                "SELECT extracted_at, content_hash FROM seen WHERE url = ?", (index_key(url),)).fetchone()
+
+    def close(self):
+        self._db.close()
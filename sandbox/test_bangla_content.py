@@ -1,11 +1,10 @@
 import trafilatura
-import requests
+from transport import default_transport
 
 url = input("Enter url: ")
-response = requests.get(url)
 
-# Extract main content
-downloaded = trafilatura.fetch_url(url)
+# Fetch once through the shared transport; the charset is resolved there, so trafilatura gets text
+downloaded = default_transport.fetch_text(url)
 result = trafilatura.extract(downloaded, include_comments=False, include_tables=False)
 
 print(result)
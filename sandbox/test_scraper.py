@@ -1,133 +1,73 @@
-import requests
-from bs4 import BeautifulSoup
+from html_parsers import parse_html
+from portal_registry import load_registry
 import re
 from urllib.parse import urljoin, urlparse
 import time
+from transport import HttpTransport
+from politeness import HostScheduler
 
 class NewsPortalScraper:
     def __init__(self):
-        self.session = requests.Session()
-        self.session.headers.update({
-            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
-        })
+        # One pooled transport for the homepage and every article body,
+        # paced to one request per second per host instead of a fixed sleep
+        self.transport = HttpTransport(scheduler=HostScheduler(rate=1.0, burst=1))
+        self.session = self.transport.session
         
-        # Common selectors for different news portals
-        self.portal_configs = {
-            # 'bbc.com': {
-            #     'headline_selectors': [
-            #         'h2[data-testid="card-headline"]',
-            #         'h3[data-testid="card-headline"]',https://www.bbc.com/
-            #         'h2',
-            #         'h3.gs-c-promo-heading__title'
-            #     ],
-            #     'link_selectors': [
-            #         'a[data-testid="internal-link"]',
-            #         'h2[data-testid="card-headline"] a',
-            #         'h3[data-testid="card-headline"] a'
-            #     ],
-            #     'article_content_selectors': [
-            #         '[data-component="text-block"] p',
-            #         'div[data-component="text-block"]',
-            #         '.story-body p',
-            #         'article p'
-            #     ]
-            # },
-            # 'prothomalo.com': {
-            #     'headline_selectors': [
-            #         'h1.headline',
-            #         'h2.headline',
-            #         'h3.story_title',
-            #         '.title a',
-            #         'h2',
-            #         'h3'
-            #     ],
-            #     'link_selectors': [
-            #         '.title a',
-            #         '.story_title a',
-            #         'h2 a',
-            #         'h3 a'
-            #     ],
-            #     'article_content_selectors': [
-            #         '.story_content p',
-            #         '.news_content p',
-            #         'article p',
-            #         '.content p'
-            #     ]
-            # },
-            'default': {
-                'headline_selectors': [
-                    'h1', 'h2', 'h3',
-                    '.headline', '.title',
-                    '[class*="headline"]', '[class*="title"]'
-                ],
-                'link_selectors': [
-                    'h1 a', 'h2 a', 'h3 a',
-                    '.headline a', '.title a',
-                    'article a'
-                ],
-                'article_content_selectors': [
-                    'article p', '.content p', '.article-content p',
-                    '.post-content p', '.entry-content p',
-                    '.story-content p', '.news-content p'
-                ]
-            }
-        }
+        # Portal configs (selectors, parser) from portals/*.json, shared and hot-reloaded
+        self.portals = load_registry()
+    
+    @property
+    def portal_configs(self):
+        """{portal name: config} as currently loaded, 'default' included"""
+        return self.portals.configs
     
     def get_portal_config(self, url):
         """Get configuration based on the portal URL"""
-        domain = urlparse(url).netloc.lower()
-        
-        for portal_key in self.portal_configs:
-            if portal_key in domain:
-                return self.portal_configs[portal_key]
-        
-        return self.portal_configs['default']
+        return self.portals.lookup(url)
     
     def fetch_page(self, url):
         """Fetch webpage content"""
-        try:
-            response = self.session.get(url, timeout=15)
-            response.raise_for_status()
-            return BeautifulSoup(response.content, 'html.parser')
-        except requests.exceptions.RequestException as e:
-            print(f"Error fetching {url}: {e}")
+        response = self.transport.fetch(url)
+        if response is None:
             return None
+        # Decoded with the charset the transport resolved, so the parser does no detection of its own
+        return parse_html(response.text, self.get_portal_config(url).get('parser'))
     
     def extract_headlines_and_links(self, soup, config, base_url):
         """Extract headlines and their corresponding links"""
         news_items = []
         
-        # Try different selectors to find headlines with links
-        for link_selector in config['link_selectors']:
-            links = soup.select(link_selector)
-            if links:
-                for link in links:  # Limit to first 20 items
-                    headline_text = link.get_text(strip=True)
-                    if headline_text and len(headline_text) > 10:  # Filter out short/empty text
-                        href = link.get('href')
-                        if href:
-                            full_url = urljoin(base_url, href)
-                            news_items.append({
-                                'headline': headline_text,
-                                'url': full_url
-                            })
-                break  
-        
-        # If no links found, try to find headlines without links
+        # One pass over the document finds the first matching link selector
+        # and the first matching headline selector
+        matched = self.compiled_selectors(config).match(soup)
+        
+        # Headlines with links, from the first link selector that matched
+        for link in matched['link_selectors']:
+            headline_text = link.get_text(strip=True)
+            if headline_text and len(headline_text) > 10:  # Filter out short/empty text
+                href = link.get('href')
+                if href:
+                    full_url = urljoin(base_url, href)
+                    news_items.append({
+                        'headline': headline_text,
+                        'url': full_url
+                    })
+        
+        # If no links found, fall back to headlines without links
         if not news_items:
-            for headline_selector in config['headline_selectors']:
-                headlines = soup.select(headline_selector)
-                if headlines:
-                    for headline in headlines:
-                        headline_text = headline.get_text(strip=True)
-                        if headline_text and len(headline_text) > 10:
-                            news_items.append({
-                                'headline': headline_text,
-                                'url': None
-                            })
-                    break
+            for headline in matched['headline_selectors']:
+                headline_text = headline.get_text(strip=True)
+                if headline_text and len(headline_text) > 10:
+                    news_items.append({
+                        'headline': headline_text,
+                        'url': None
+                    })
         
         return news_items
+
+    def compiled_selectors(self, config):
+        """Link and headline selector cascades of a portal config, compiled when it was loaded"""
+        return self.portals.compiled_selectors(config)
     
     def scrape_article_content(self, article_url, config):
         """Scrape the full article content from article URL"""
@@ -138,6 +78,14 @@ class NewsPortalScraper:
         if not soup:
             return "Could not fetch article content"
         
+        content = self.extract_article_text(soup, config)
+        if content:
+            return content
+        else:
+            return "Article content not found or not accessible"
+    
+    def extract_article_text(self, soup, config):
+        """Paragraphs of the first matching article_content_selector, joined; '' if none matched"""
         # Try different selectors to find article content
         content_paragraphs = []
         
@@ -150,10 +98,7 @@ class NewsPortalScraper:
                         content_paragraphs.append(text)
                 break
         
-        if content_paragraphs:
-            return '\n\n'.join(content_paragraphs)  
-        else:
-            return "Article content not found or not accessible"
+        return '\n\n'.join(content_paragraphs)
     
     def scrape_news_portal(self, portal_url, include_full_articles=True):
         """Main method to scrape news from a portal"""
@@ -186,7 +131,6 @@ class NewsPortalScraper:
             if include_full_articles and item['url']:
                 print("   Fetching full article...")
                 article_content = self.scrape_article_content(item['url'], config)
-                time.sleep(1)  
             
             news_data = {
                 'headline': item['headline'],
@@ -0,0 +1,54 @@
+"""
+Run from sandbox/ with: python -m unittest discover -s tests
+"""
+import os
+import sys
+import tempfile
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from extract_cache import ExtractionCache, strip_volatile
+
+
+PAGE = ('<html><head><script nonce="{nonce}">var t = {time};</script></head><body>'
+        '<article><h1>Budget passed</h1>'
+        '<p class="updated" data-timestamp={time}>Updated:&nbsp;{updated}</p>'
+        '<p>The bill passed by <ins>{votes}</ins> votes.</p>'
+        '<ins class="adsbygoogle" data-ad-slot="{time}"></ins>'
+        '</article></body></html>')
+
+
+def page(nonce='a1', time='1700000000', updated='10:30', votes='212'):
+    return PAGE.format(nonce=nonce, time=time, updated=updated, votes=votes)
+
+
+class ExtractionCacheKeyTest(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.cache = ExtractionCache(self.directory.name)
+
+    def tearDown(self):
+        self.cache.close()
+        self.directory.cleanup()
+
+    def test_volatile_markup_keeps_the_key(self):
+        self.assertEqual(self.cache.key(page()), self.cache.key(page(nonce='b2', time='1700000999')))
+
+    def test_changed_text_changes_the_key(self):
+        self.assertNotEqual(self.cache.key(page()), self.cache.key(page(updated='11:45')))
+        self.assertNotEqual(self.cache.key(page()), self.cache.key(page(votes='213')))
+
+    def test_unquoted_attribute_stops_at_tag_end(self):
+        stripped = strip_volatile('<p data-timestamp=17>Updated:&nbsp;10:30</p>')
+        self.assertEqual(stripped, '<p>Updated:&nbsp;10:30</p>')
+
+    def test_only_ad_slot_ins_is_stripped(self):
+        stripped = strip_volatile(page())
+        self.assertIn('<ins>212</ins>', stripped)
+        self.assertNotIn('adsbygoogle', stripped)
+
+
+if __name__ == '__main__':
+    unittest.main()
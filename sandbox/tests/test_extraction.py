@@ -0,0 +1,58 @@
+import os
+import sys
+import threading
+import time
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from extraction import ExtractionPipeline
+from fetch_engine import ConcurrentFetcher
+from metrics import Metrics
+
+ARTICLE = ('<html><body><article><h1>Story {n}</h1>'
+           '<p>{text}</p></article></body></html>')
+
+
+def fetch_page(url):
+    if url.endswith('/broken'):
+        raise ConnectionError('connection reset')
+    n = url.rsplit('/', 1)[-1]
+    return ARTICLE.format(n=n, text=f'Paragraph of story {n}, long enough to be kept as the body. ' * 5)
+
+
+def fetch_stage_running():
+    return any(thread.name == 'extraction-fetch' for thread in threading.enumerate())
+
+
+class ExtractionPipelineTest(unittest.TestCase):
+
+    def setUp(self):
+        self.pipeline = ExtractionPipeline(ConcurrentFetcher(max_workers=1), fetch_page, workers=1,
+                                           queue_size=2, metrics=Metrics())
+
+    def tearDown(self):
+        self.pipeline.close()
+
+    def test_fetch_error_is_raised_after_earlier_articles(self):
+        urls = ['https://example.com/1', 'https://example.com/2', 'https://example.com/broken',
+                'https://example.com/4']
+        results = []
+        with self.assertRaises(ConnectionError):
+            for result in self.pipeline.map(urls):
+                results.append(result)
+        self.assertEqual(len(results), 2)
+        self.assertTrue(all(result[0] for result in results))
+
+    def test_abandoned_map_stops_the_fetch_stage(self):
+        results = self.pipeline.map([f'https://example.com/{n}' for n in range(50)])
+        next(results)
+        results.close()
+        deadline = time.time() + 5
+        while fetch_stage_running() and time.time() < deadline:
+            time.sleep(0.05)
+        self.assertFalse(fetch_stage_running())
+
+
+if __name__ == '__main__':
+    unittest.main()
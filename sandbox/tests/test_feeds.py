@@ -0,0 +1,95 @@
+import os
+import sys
+import unittest
+from datetime import datetime, timezone
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from feeds import fresh_items, parse_feed, sitemaps_from_robots
+
+RSS = b'''<?xml version="1.0" encoding="UTF-8"?>
+<rss version="2.0"><channel>
+  <title>Example News</title>
+  <link>https://example.com/</link>
+  <item>
+    <title>Budget passed</title>
+    <link>https://example.com/news/1</link>
+    <pubDate>Mon, 06 Oct 2025 10:30:00 +0600</pubDate>
+  </item>
+  <item>
+    <title>Rain floods the city</title>
+    <link>/news/2</link>
+  </item>
+</channel></rss>'''
+
+ATOM = b'''<?xml version="1.0" encoding="utf-8"?>
+<feed xmlns="http://www.w3.org/2005/Atom">
+  <title>Example News</title>
+  <link href="https://example.com/"/>
+  <entry>
+    <title>Budget passed</title>
+    <link rel="enclosure" href="https://example.com/img/1.jpg"/>
+    <link href="https://example.com/news/1"/>
+    <updated>2025-10-06T04:30:00Z</updated>
+  </entry>
+</feed>'''
+
+SITEMAP_INDEX = b'''<?xml version="1.0" encoding="UTF-8"?>
+<sitemapindex xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">
+  <sitemap><loc>https://example.com/news-sitemap-1.xml</loc></sitemap>
+</sitemapindex>'''
+
+
+class ParseFeedTest(unittest.TestCase):
+
+    def test_rss(self):
+        items, nested = parse_feed(RSS, 'https://example.com/rss.xml')
+        self.assertEqual(nested, [])
+        self.assertEqual([(item['headline'], item['url']) for item in items],
+                         [('Budget passed', 'https://example.com/news/1'),
+                          ('Rain floods the city', 'https://example.com/news/2')])
+        self.assertEqual(items[0]['published'], datetime(2025, 10, 6, 4, 30, tzinfo=timezone.utc))
+        self.assertIsNone(items[1]['published'])
+
+    def test_atom(self):
+        items, _ = parse_feed(ATOM, 'https://example.com/atom.xml')
+        self.assertEqual(items, [{'headline': 'Budget passed', 'url': 'https://example.com/news/1',
+                                  'published': datetime(2025, 10, 6, 4, 30, tzinfo=timezone.utc)}])
+
+    def test_sitemap_index(self):
+        self.assertEqual(parse_feed(SITEMAP_INDEX, 'https://example.com/sitemap.xml'),
+                         ([], ['https://example.com/news-sitemap-1.xml']))
+
+    def test_truncated_feed_keeps_the_entries_read(self):
+        cut = RSS[:RSS.index(b'<title>Rain')]
+        items, _ = parse_feed(cut, 'https://example.com/rss.xml')
+        self.assertEqual([item['url'] for item in items], ['https://example.com/news/1'])
+
+    def test_not_xml(self):
+        self.assertEqual(parse_feed(b'<html><body><p>Not a feed', 'https://example.com/'), ([], []))
+
+
+class FreshItemsTest(unittest.TestCase):
+
+    def test_old_items_are_dropped(self):
+        now = datetime(2025, 10, 6, 12, 0, tzinfo=timezone.utc)
+        items = [{'url': 'new', 'published': datetime(2025, 10, 6, 9, 0, tzinfo=timezone.utc)},
+                 {'url': 'old', 'published': datetime(2025, 10, 4, 12, 0, tzinfo=timezone.utc)},
+                 {'url': 'undated', 'published': None}]
+        self.assertEqual([item['url'] for item in fresh_items(items, 24, now)], ['new', 'undated'])
+        self.assertEqual(fresh_items(items, None, now), items)
+
+
+class SitemapsFromRobotsTest(unittest.TestCase):
+
+    def test_only_news_sitemaps(self):
+        robots = ('User-agent: *\nDisallow: /search\n'
+                  'Sitemap: https://example.com/sitemap.xml\n'
+                  'sitemap:https://example.com/news-sitemap.xml\n'
+                  'SITEMAP : https://example.com/sitemaps/News/index.xml\n')
+        self.assertEqual(sitemaps_from_robots(robots), ['https://example.com/news-sitemap.xml',
+                                                        'https://example.com/sitemaps/News/index.xml'])
+
+
+if __name__ == '__main__':
+    unittest.main()
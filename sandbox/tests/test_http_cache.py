@@ -0,0 +1,54 @@
+import os
+import sys
+import tempfile
+import time
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import requests
+
+from http_cache import HttpCache
+
+
+def response(body, **headers):
+    result = requests.Response()
+    result.status_code = 200
+    result._content = body
+    result.headers.update(headers)
+    return result
+
+
+class HttpCacheEvictionTest(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.cache = HttpCache(self.directory.name, max_bytes=250)
+
+    def tearDown(self):
+        self.cache.close()
+        self.directory.cleanup()
+
+    def store(self, url, size):
+        self.cache.store(url, response(b'x' * size, **{'Cache-Control': 'max-age=60'}))
+        # Distinct last_access times, so the LRU order is unambiguous
+        time.sleep(0.01)
+
+    def test_least_recently_used_is_evicted(self):
+        self.store('https://example.com/a', 100)
+        self.store('https://example.com/b', 100)
+        self.assertIsNotNone(self.cache.response(self.cache.lookup('https://example.com/a')))
+        time.sleep(0.01)
+        self.store('https://example.com/c', 100)
+        self.assertIsNone(self.cache.lookup('https://example.com/b'))
+        self.assertIsNotNone(self.cache.lookup('https://example.com/a'))
+        self.assertIsNotNone(self.cache.lookup('https://example.com/c'))
+        self.assertEqual(len(os.listdir(self.directory.name)), 3)     # index.sqlite and two bodies
+
+    def test_no_store_is_not_cached(self):
+        self.cache.store('https://example.com/a', response(b'x', **{'Cache-Control': 'no-store'}))
+        self.assertIsNone(self.cache.lookup('https://example.com/a'))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,47 @@
+import json
+import os
+import sys
+import tempfile
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from jsonl_writer import JsonlWriter, jsonl_to_json
+from records import Article, TranscriptParagraph
+
+
+class JsonlToJsonTest(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.jsonl_path = os.path.join(self.directory.name, 'out.jsonl')
+        self.json_path = os.path.join(self.directory.name, 'out.json')
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def convert(self, records):
+        with JsonlWriter(self.jsonl_path) as writer:
+            for record in records:
+                writer.write(record)
+        count = jsonl_to_json(self.jsonl_path, self.json_path)
+        with open(self.json_path, encoding='utf-8') as f:
+            return count, f.read()
+
+    def test_same_layout_as_json_dump(self):
+        records = [
+            Article(headline='বাজেট পাস', url='https://example.com/1', body='Line one\nLine two\u2028"quoted"'),
+            {'video_id': 'abc', 'paragraphs': [TranscriptParagraph('[00:00]', 'Hello'), {'nested': {'a': []}}]},
+            {},
+        ]
+        count, text = self.convert(records)
+        expected = json.loads(json.dumps(records, default=lambda r: r.to_dict()))
+        self.assertEqual(count, 3)
+        self.assertEqual(text, json.dumps(expected, ensure_ascii=False, indent=4))
+
+    def test_empty(self):
+        self.assertEqual(self.convert([]), (0, '[]'))
+
+
+if __name__ == '__main__':
+    unittest.main()
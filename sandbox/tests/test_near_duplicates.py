@@ -0,0 +1,55 @@
+import os
+import sys
+import tempfile
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from near_duplicates import NearDuplicateIndex, hamming, simhash
+
+STORY = ('The finance minister presented the national budget in parliament on Thursday, proposing higher '
+         'spending on schools, hospitals and rural roads while promising to keep the deficit below five '
+         'percent of output. Opposition members walked out during the speech, saying the plan relied on '
+         'optimistic revenue forecasts. Economists welcomed the focus on infrastructure but warned that '
+         'rising interest payments would limit room for new programmes over the coming years.')
+# The same wire story as another portal runs it, with a word added to the dateline
+COPY = STORY.replace('Thursday,', 'Thursday evening,')
+OTHER = ('Heavy rain flooded low-lying parts of the city overnight, stranding commuters and closing several '
+         'schools. The weather office expects more showers through the weekend and has asked fishing boats '
+         'to stay close to the shore until the depression over the bay weakens. Officials said pumps were '
+         'working around the clock to clear water from the main roads before the morning rush hour began.')
+
+
+class NearDuplicateIndexTest(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.index = NearDuplicateIndex(os.path.join(self.directory.name, 'near.sqlite'), max_distance=3,
+                                        min_words=30)
+
+    def tearDown(self):
+        self.index.close()
+        self.directory.cleanup()
+
+    def test_copy_is_found_within_max_distance(self):
+        self.assertIsNone(self.index.check('https://a.example/budget', STORY))
+        url, distance = self.index.check('https://b.example/budget', COPY)
+        self.assertEqual(url, 'https://a.example/budget')
+        self.assertEqual(distance, hamming(simhash(STORY), simhash(COPY)))
+        self.assertLessEqual(distance, 3)
+
+    def test_different_story_is_new(self):
+        self.assertIsNone(self.index.check('https://a.example/budget', STORY))
+        self.assertIsNone(self.index.check('https://a.example/floods', OTHER))
+        # The same URL extracted again is not its own duplicate
+        self.assertIsNone(self.index.check('https://a.example/budget', STORY))
+
+    def test_short_texts_are_ignored(self):
+        short = ' '.join(STORY.split()[:20])
+        self.assertIsNone(self.index.check('https://a.example/brief', short))
+        self.assertIsNone(self.index.check('https://b.example/brief', short))
+        self.assertIsNone(self.index.fingerprint(short))
+
+
+if __name__ == '__main__':
+    unittest.main()
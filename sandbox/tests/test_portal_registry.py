@@ -0,0 +1,79 @@
+import json
+import os
+import shutil
+import sys
+import tempfile
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from portal_registry import PORTALS_DIR, PortalRegistry
+
+
+class PortalRegistryReloadTest(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        for name in ('default.json', 'bbc.com.json'):
+            shutil.copy(os.path.join(PORTALS_DIR, name), self.directory)
+        self.registry = PortalRegistry(self.directory, reload_interval=0)
+        self.default = self.registry.lookup('https://example.com/')
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def test_half_saved_default_keeps_the_previous_one(self):
+        with open(os.path.join(self.directory, 'default.json'), 'w', encoding='utf-8') as f:
+            f.write('{"headline_selectors": [')
+        self.assertIs(self.registry.lookup('https://example.com/'), self.default)
+        self.assertIn('bbc.com', self.registry.configs)
+
+    def test_missing_default_keeps_the_previous_one(self):
+        os.remove(os.path.join(self.directory, 'default.json'))
+        self.assertIs(self.registry.lookup('https://example.com/'), self.default)
+
+    def test_other_portals_still_reload(self):
+        config = dict(self.default, domains=['example.com'])
+        with open(os.path.join(self.directory, 'example.json'), 'w', encoding='utf-8') as f:
+            json.dump(config, f)
+        os.remove(os.path.join(self.directory, 'default.json'))
+        self.assertEqual(self.registry.lookup('https://www.example.com/')['domains'], ['example.com'])
+        self.assertIs(self.registry.lookup('https://other.org/'), self.default)
+
+    def test_first_load_needs_a_default(self):
+        os.remove(os.path.join(self.directory, 'default.json'))
+        with self.assertRaises(ValueError):
+            PortalRegistry(self.directory)
+
+
+
+class PortalRegistryLookupTest(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        for name in ('default.json', 'bbc.com.json'):
+            shutil.copy(os.path.join(PORTALS_DIR, name), self.directory)
+        self.registry = PortalRegistry(self.directory)
+        self.default = self.registry.lookup('https://example.com/')
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def test_every_domain_and_subdomain_matches(self):
+        for url in ('https://bbc.co.uk/', 'https://www.bbc.co.uk/news', 'https://news.bbc.co.uk/1',
+                    'https://www.bbc.com/', 'https://BBC.com:443/'):
+            self.assertEqual(self.registry.lookup(url)['domains'], ['bbc.com', 'bbc.co.uk'], url)
+
+    def test_label_boundaries_are_respected(self):
+        for url in ('https://notbbc.com/', 'https://bbc.com.evil.org/', 'https://co.uk/'):
+            self.assertIs(self.registry.lookup(url), self.default, url)
+
+    def test_most_specific_domain_wins(self):
+        with open(os.path.join(self.directory, 'bbc-sport.json'), 'w', encoding='utf-8') as f:
+            json.dump(dict(self.default, domains=['sport.bbc.co.uk']), f)
+        registry = PortalRegistry(self.directory)
+        self.assertEqual(registry.lookup('https://www.sport.bbc.co.uk/')['domains'], ['sport.bbc.co.uk'])
+        self.assertEqual(registry.lookup('https://news.bbc.co.uk/')['domains'], ['bbc.com', 'bbc.co.uk'])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,129 @@
+"""
+CompiledSelectors must return exactly what calling soup.select() on each
+selector of a cascade until one matches returns: the same elements, in the
+same order. Checked for every cascade in portals/*.json on random trees
+built from the tags, classes and attributes those selectors use, and on
+the benchmark fixtures.
+"""
+import glob
+import json
+import os
+import random
+import sys
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from bs4 import BeautifulSoup
+
+from portal_selectors import CompiledSelector, CompiledSelectors, UnsupportedSelector
+
+SANDBOX = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+CASCADES = ('link_selectors', 'headline_selectors', 'article_content_selectors')
+NOISE_TAGS = ['div', 'section', 'span', 'li', 'ul', 'header', 'main', 'figure']
+
+
+def portal_configs():
+    configs = {}
+    for path in sorted(glob.glob(os.path.join(SANDBOX, 'portals', '*.json'))):
+        with open(path, encoding='utf-8') as f:
+            configs[os.path.basename(path)] = json.load(f)
+    return configs
+
+
+def first_match(soup, selectors):
+    for selector in selectors:
+        found = soup.select(selector)
+        if found:
+            return found
+    return []
+
+
+def vocabulary(configs):
+    """Tags, classes and (name, value) attributes the configured selectors test for"""
+    tags, classes, attributes = set(NOISE_TAGS), set(), set()
+    for config in configs.values():
+        for cascade in CASCADES:
+            for selector in config[cascade]:
+                compiled = CompiledSelector(selector)
+                for compound in compiled.ancestors + [compiled.target]:
+                    if compound.tag:
+                        tags.add(compound.tag)
+                    classes.update(compound.classes)
+                    for name, op, value in compound.attributes:
+                        attributes.add((name, value or ''))
+                        if op in ('*=', '^=', '$='):
+                            attributes.add((name, f'x{value}x'))
+                            attributes.add((name, f'{value}x'))
+                            attributes.add((name, f'x{value}'))
+    return sorted(tags), sorted(classes), sorted(attributes)
+
+
+def random_tree(rng, tags, classes, attributes, size=60):
+    """Random nested HTML using the vocabulary, plus plain noise elements"""
+    html = []
+    depth = 0
+    for n in range(size):
+        if depth and rng.random() < 0.35:
+            html.append('</div>' if rng.random() < 0.5 else '</section>')
+            depth -= 1
+            continue
+        tag = rng.choice(tags)
+        attrs = []
+        if rng.random() < 0.5:
+            attrs.append('class="{}"'.format(' '.join(rng.sample(classes, rng.randint(1, 2)))))
+        if rng.random() < 0.4:
+            name, value = rng.choice(attributes)
+            attrs.append(f'{name}="{value}"')
+        if tag == 'a' and rng.random() < 0.8:
+            attrs.append(f'href="/item/{n}"')
+        opening = ' '.join([tag] + attrs)
+        if tag in ('div', 'section') and rng.random() < 0.6:
+            # Kept open so later elements nest inside it; closed as div or section, whichever it was
+            html.append(f'<{opening}>')
+            depth += 1
+            continue
+        html.append(f'<{opening}>Text of element {n} long enough to count</{tag}>')
+    html.extend('</div>' for _ in range(depth))
+    return '<html><body>' + ''.join(html) + '</body></html>'
+
+
+class CompiledSelectorsEquivalenceTest(unittest.TestCase):
+
+    def assertSameAsSelect(self, soup, config, label):
+        compiled = CompiledSelectors(**{cascade: config[cascade] for cascade in CASCADES})
+        matched = compiled.match(soup)
+        for cascade in CASCADES:
+            expected = first_match(soup, config[cascade])
+            self.assertEqual([id(node) for node in matched[cascade]], [id(node) for node in expected],
+                             f"{label}: {cascade} differs from soup.select()")
+
+    def test_random_trees(self):
+        configs = portal_configs()
+        tags, classes, attributes = vocabulary(configs)
+        rng = random.Random(8)
+        for tree in range(150):
+            html = random_tree(rng, tags, classes, attributes)
+            for parser in ('html.parser', 'lxml'):
+                soup = BeautifulSoup(html, parser)
+                for name, config in configs.items():
+                    self.assertSameAsSelect(soup, config, f"tree {tree} ({parser}), {name}")
+
+    def test_fixtures(self):
+        configs = portal_configs()
+        pages = glob.glob(os.path.join(SANDBOX, 'benchmarks', 'fixtures', '*', '*.html'))
+        self.assertTrue(pages)
+        for path in pages:
+            with open(path, 'rb') as f:
+                soup = BeautifulSoup(f.read(), 'lxml')
+            for name, config in configs.items():
+                self.assertSameAsSelect(soup, config, f"{path}, {name}")
+
+    def test_unsupported_syntax_raises(self):
+        for selector in ('div > p', 'h2 + a', 'a:not(.x)', 'h2, h3', 'a[href*=/news/]', '.2col', ''):
+            with self.assertRaises(UnsupportedSelector, msg=selector):
+                CompiledSelectors(link_selectors=['h2 a', selector])
+
+
+if __name__ == '__main__':
+    unittest.main()
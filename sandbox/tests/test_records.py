@@ -0,0 +1,67 @@
+import json
+import os
+import sys
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from records import Article, NewsItem, RecordBatch, to_plain
+
+
+class RecordTest(unittest.TestCase):
+
+    def test_reads_like_a_dict(self):
+        item = NewsItem(headline='Budget passed', url='https://example.com/1')
+        self.assertEqual(item['url'], 'https://example.com/1')
+        self.assertIn('url', item)
+        self.assertNotIn('body', item)
+        self.assertNotIn('to_dict', item)
+        self.assertEqual(item.keys(), ['headline', 'url', 'other_headlines'])
+        self.assertIsNone(item.get('body'))
+        with self.assertRaises(KeyError):
+            item['to_dict']
+
+    def test_to_dict_omits_defaults(self):
+        article = Article(headline='A', url='https://example.com/a', body='Text')
+        self.assertEqual(article.to_dict(), {'headline': 'A', 'url': 'https://example.com/a', 'body': 'Text'})
+
+
+class RecordBatchTest(unittest.TestCase):
+
+    def setUp(self):
+        self.items = [NewsItem(headline=f'Headline {n}', url=f'https://example.com/{n}' if n % 3 else None,
+                               other_headlines=('Other',) if n == 4 else ())
+                      for n in range(10)]
+        self.batch = RecordBatch(NewsItem, self.items)
+
+    def test_round_trip(self):
+        self.assertEqual(list(self.batch), self.items)
+        self.assertEqual(self.batch[-1], self.items[-1])
+        self.assertEqual(list(self.batch.column('url')), [item.url for item in self.items])
+
+    def test_tuple_fields_round_trip(self):
+        items = [NewsItem(headline='A', url=None, other_headlines=value)
+                 for value in ((), ('',), ('', ''), ('Other', ''), ('', 'Other'), ('One', 'Two'))]
+        batch = RecordBatch(NewsItem, items)
+        self.assertEqual(list(batch), items)
+        self.assertEqual(list(batch.column('other_headlines')), [item.other_headlines for item in items])
+
+    def test_records_are_slotted_and_frozen(self):
+        item = NewsItem(headline='A', url=None)
+        self.assertFalse(hasattr(item, '__dict__'))
+        with self.assertRaises(AttributeError):
+            item.url = 'https://example.com/'
+
+    def test_slices_are_batches(self):
+        for part in (slice(2, 5), slice(None, None, -2), slice(8, 100), slice(5, 2)):
+            sliced = self.batch[part]
+            self.assertIsInstance(sliced, RecordBatch)
+            self.assertEqual(list(sliced), self.items[part])
+
+    def test_json(self):
+        self.assertEqual(json.loads(json.dumps(self.batch, default=to_plain)),
+                         [item.to_dict() for item in self.items])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,131 @@
+import os
+import random
+import sys
+import tempfile
+import unittest
+from unittest import mock
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from youtube_transcript_api import FetchedTranscriptSnippet, NoTranscriptFound
+
+from metrics import Metrics
+from transcript_cache import TranscriptCache
+from transcripts import TranscriptClient, segment_transcript, segment_transcript_vectorized
+
+
+class FakeTranscript:
+    def __init__(self, language_code, is_generated):
+        self.language_code = language_code
+        self.language = language_code
+        self.is_generated = is_generated
+
+    def fetch(self):
+        return [FetchedTranscriptSnippet(text=f'{self.language_code} line {n}.', start=n * 5.0, duration=5.0)
+                for n in range(4)]
+
+
+class FakeTranscriptList(list):
+    def __init__(self, video_id, transcripts):
+        super().__init__(transcripts)
+        self.video_id = video_id
+
+    def _find(self, language_codes, is_generated):
+        for transcript in self:
+            if transcript.language_code in language_codes and transcript.is_generated == is_generated:
+                return transcript
+        raise NoTranscriptFound(self.video_id, language_codes, self)
+
+    def find_generated_transcript(self, language_codes):
+        return self._find(language_codes, True)
+
+    def find_manually_created_transcript(self, language_codes):
+        return self._find(language_codes, False)
+
+
+class FakeApi:
+    """Serves whatever tracks the test currently gives the video; counts list() calls"""
+
+    def __init__(self, tracks):
+        self.tracks = tracks
+        self.lists = 0
+
+    def list(self, video_id):
+        self.lists += 1
+        return FakeTranscriptList(video_id, [FakeTranscript(*track) for track in self.tracks])
+
+
+class TranscriptClientCacheTest(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.cache = TranscriptCache(self.directory.name)
+        self.client = TranscriptClient(languages=['bn', 'en'], metrics=Metrics(), cache=self.cache)
+        self.client.api = FakeApi([('bn', False), ('en', True)])
+
+    def tearDown(self):
+        self.cache.close()
+        self.directory.cleanup()
+
+    def test_cached_transcript_needs_no_list(self):
+        self.assertEqual(self.client.fetch('vid00000001')['language'], 'bn')
+        result = self.client.fetch('vid00000001')
+        self.assertEqual(result['status'], 'ok')
+        self.assertEqual(self.client.api.lists, 1)
+
+    def test_stale_track_list_is_replaced(self):
+        self.cache.store_tracks('vid00000002', [
+            {'language_code': 'bn', 'language': 'bn', 'is_generated': False},
+            {'language_code': 'en', 'language': 'en', 'is_generated': True}])
+        # The manual Bangla track was removed after the list was cached
+        self.client.api.tracks = [('en', True)]
+        result = self.client.fetch('vid00000002')
+        self.assertEqual((result['status'], result['language'], result['is_generated']), ('ok', 'en', True))
+        self.assertEqual(self.client.api.lists, 1)
+        self.assertEqual(self.cache.tracks('vid00000002'),
+                         [{'language_code': 'en', 'language': 'en', 'is_generated': True}])
+
+    def test_stale_track_list_without_any_track(self):
+        self.cache.store_tracks('vid00000003', [{'language_code': 'bn', 'language': 'bn', 'is_generated': False}])
+        self.client.api.tracks = []
+        result = self.client.fetch('vid00000003')
+        self.assertEqual(result['status'], 'no_transcript')
+        self.assertEqual(self.cache.tracks('vid00000003'), [])
+
+
+def random_snippets(rng, count):
+    start = 0.0
+    snippets = []
+    for n in range(count):
+        # Mostly short steps, sometimes long silences, sometimes several snippets at the same time
+        start += rng.choice([0.0, 1.5, 2.0, 4.0, 7.5, 30.0, 119.0, 120.0, 121.0, 300.0])
+        snippets.append(FetchedTranscriptSnippet(text=f' line {n}{rng.choice(["", ".", "?"])} ', start=start,
+                                                 duration=2.0))
+    return snippets
+
+
+class SegmentTranscriptTest(unittest.TestCase):
+
+    def test_vectorized_matches_the_generator(self):
+        rng = random.Random(23)
+        for count in list(range(0, 25)) + [200, 1000]:
+            snippets = random_snippets(rng, count)
+            for max_seconds, max_snippets in ((120, 10), (30, 3), (0, 1), (600, 50)):
+                expected = list(segment_transcript(snippets, max_seconds, max_snippets))
+                self.assertEqual(list(segment_transcript_vectorized(snippets, max_seconds, max_snippets)), expected,
+                                 f"{count} snippets, max_seconds={max_seconds}, max_snippets={max_snippets}")
+
+    def test_fallbacks_match_the_generator(self):
+        snippets = random_snippets(random.Random(5), 100)
+        # Start times going backwards, and sentence breaks, are left to the generator
+        shuffled = snippets[50:] + snippets[:50]
+        self.assertEqual(list(segment_transcript_vectorized(shuffled)), list(segment_transcript(shuffled)))
+        self.assertEqual(list(segment_transcript_vectorized(snippets, sentence_breaks=True)),
+                         list(segment_transcript(snippets, sentence_breaks=True)))
+        # Without NumPy
+        with mock.patch.dict(sys.modules, {'numpy': None}):
+            self.assertEqual(list(segment_transcript_vectorized(iter(snippets))), list(segment_transcript(snippets)))
+
+
+if __name__ == '__main__':
+    unittest.main()
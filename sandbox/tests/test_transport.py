@@ -0,0 +1,194 @@
+import io
+import os
+import sys
+import tempfile
+import time
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from requests.adapters import BaseAdapter
+from requests.models import Response
+from requests.structures import CaseInsensitiveDict
+
+from http_cache import HttpCache
+from metrics import Metrics
+from politeness import HostScheduler
+from resilience import CLOSED, HALF_OPEN, OPEN, CircuitBreaker, HostUnavailable, RetryBudget
+from transport import ContentTooLarge, HttpTransport, UnwantedContent
+
+
+class StubAdapter(BaseAdapter):
+    """Answers from `routes` (url -> list of (status, headers, body), the last one repeats); records requests"""
+
+    def __init__(self, routes):
+        super().__init__()
+        self.routes = routes
+        self.requests = []
+
+    def send(self, request, **kwargs):
+        self.requests.append(request)
+        answers = self.routes.get(request.url, [(404, {}, b'')])
+        status, headers, body = answers.pop(0) if len(answers) > 1 else answers[0]
+        response = Response()
+        response.status_code = status
+        response.headers = CaseInsensitiveDict(headers)
+        response.raw = io.BytesIO(body)
+        response.url = request.url
+        response.request = request
+        return response
+
+    def close(self):
+        pass
+
+    def urls(self):
+        return [request.url for request in self.requests]
+
+
+def stub_transport(routes, **kwargs):
+    transport = HttpTransport(metrics=Metrics(), backoff=0, **kwargs)
+    adapter = StubAdapter(routes)
+    transport.session.mount('https://', adapter)
+    return transport, adapter
+
+
+HTML = {'Content-Type': 'text/html; charset=utf-8'}
+TEXT = {'Content-Type': 'text/plain'}
+
+
+class PolitenessTest(unittest.TestCase):
+
+    def test_long_retry_after_makes_the_host_unavailable(self):
+        transport, adapter = stub_transport({
+            'https://example.com/robots.txt': [(404, {}, b'')],
+            'https://example.com/a': [(429, {'Retry-After': '86400'}, b'')],
+        }, scheduler=HostScheduler(), max_retry_after=60)
+        self.assertIsNone(transport.fetch('https://example.com/a'))
+        with self.assertRaises(HostUnavailable):
+            transport.get('https://example.com/b')
+        self.assertNotIn('https://example.com/b', adapter.urls())
+
+    def test_robots_txt_is_fetched_once(self):
+        robots = b'User-agent: *\nCrawl-delay: 1\nSitemap: https://example.com/news-sitemap.xml\n'
+        transport, adapter = stub_transport({
+            'https://example.com/robots.txt': [(200, TEXT, robots)],
+            'https://example.com/a': [(200, HTML, b'<html></html>')],
+        }, scheduler=HostScheduler())
+        transport.get('https://example.com/a')
+        self.assertEqual(transport.robots_txt('https://example.com/'), robots.decode())
+        self.assertEqual(adapter.urls().count('https://example.com/robots.txt'), 1)
+        self.assertEqual(transport.scheduler._buckets['example.com'][2], 1.0)
+
+
+
+class RevalidationTest(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.cache = HttpCache(self.directory.name)
+
+    def tearDown(self):
+        self.cache.close()
+        self.directory.cleanup()
+
+    def test_not_modified_refreshes_the_cached_copy(self):
+        url = 'https://example.com/a'
+        transport, adapter = stub_transport({url: [
+            (200, {**HTML, 'ETag': '"v1"', 'Cache-Control': 'max-age=0'}, b'<html>v1</html>'),
+            (304, {'ETag': '"v1"', 'Cache-Control': 'max-age=300'}, b''),
+        ]}, cache=self.cache)
+        transport.get(url)
+        stored_at = self.cache.lookup(url)['stored_at']
+
+        revalidated = transport.get(url)
+        self.assertEqual(adapter.requests[-1].headers['If-None-Match'], '"v1"')
+        self.assertEqual(revalidated.status_code, 200)
+        self.assertEqual(revalidated.text, '<html>v1</html>')
+        entry = self.cache.lookup(url)
+        self.assertEqual(entry['cache_control'], 'max-age=300')
+        self.assertGreaterEqual(entry['stored_at'], stored_at)
+
+        # Fresh again for 300 seconds: served without a request
+        self.assertEqual(transport.get(url).text, '<html>v1</html>')
+        self.assertEqual(len(adapter.requests), 2)
+
+
+class ResilienceTest(unittest.TestCase):
+
+    def test_breaker_opens_probes_and_closes(self):
+        url = 'https://example.com/a'
+        breaker = CircuitBreaker(failure_threshold=2, reset_timeout=0.05)
+        transport, adapter = stub_transport({url: [(503, {}, b''), (503, {}, b''), (200, HTML, b'<html></html>')]},
+                                            breaker=breaker, retries=0)
+        for _ in range(2):
+            self.assertIsNone(transport.fetch(url))
+        self.assertEqual(breaker.state('example.com'), OPEN)
+        with self.assertRaises(HostUnavailable):
+            transport.get(url)
+        self.assertEqual(len(adapter.requests), 2)
+
+        time.sleep(0.06)
+        self.assertTrue(breaker.allow('example.com'))
+        self.assertEqual(breaker.state('example.com'), HALF_OPEN)
+        # Only one probe while half-open
+        self.assertFalse(breaker.allow('example.com'))
+        breaker.record_success('example.com')
+        self.assertEqual(breaker.state('example.com'), CLOSED)
+        self.assertEqual(transport.get(url).status_code, 200)
+
+    def test_failed_probe_opens_the_circuit_again(self):
+        breaker = CircuitBreaker(failure_threshold=1, reset_timeout=0.05)
+        breaker.record_failure('example.com')
+        time.sleep(0.06)
+        self.assertTrue(breaker.allow('example.com'))
+        self.assertTrue(breaker.record_failure('example.com'))
+        self.assertFalse(breaker.allow('example.com'))
+
+    def test_retries_stop_when_the_budget_is_spent(self):
+        url = 'https://example.com/a'
+        transport, adapter = stub_transport({url: [(503, {}, b'')]}, retries=3,
+                                            retry_budget=RetryBudget(ratio=0, initial=1),
+                                            breaker=CircuitBreaker(failure_threshold=100))
+        self.assertIsNone(transport.fetch(url))
+        # One retry, paid from the budget
+        self.assertEqual(len(adapter.requests), 2)
+        self.assertIsNone(transport.fetch(url))
+        # Budget spent: no retry at all
+        self.assertEqual(len(adapter.requests), 3)
+
+
+class StreamingTest(unittest.TestCase):
+
+    def test_body_over_the_cap_is_cut_off(self):
+        url = 'https://example.com/a'
+        transport, _ = stub_transport({url: [(200, HTML, b'<html>' + b'x' * 200_000)]}, max_bytes={'html': 100_000})
+        with self.assertRaises(ContentTooLarge):
+            transport.get(url, expect='html')
+
+    def test_content_length_over_the_cap_fails_before_the_body(self):
+        url = 'https://example.com/a'
+        # The body itself is small: only the header can have given it away
+        transport, _ = stub_transport({url: [(200, {**HTML, 'Content-Length': '200000'}, b'<html></html>')]},
+                                      max_bytes={'html': 100_000})
+        with self.assertRaises(ContentTooLarge):
+            transport.get(url, expect='html')
+
+    def test_body_under_the_cap_is_kept(self):
+        url = 'https://example.com/a'
+        transport, _ = stub_transport({url: [(200, HTML, b'<html>' + b'x' * 99_000)]}, max_bytes={'html': 100_000})
+        self.assertEqual(len(transport.get(url, expect='html').content), 99_006)
+
+    def test_other_content_types_are_dropped(self):
+        transport, _ = stub_transport({
+            'https://example.com/a.pdf': [(200, {'Content-Type': 'application/pdf'}, b'%PDF-1.7')],
+            'https://example.com/b': [(200, {}, b'%PDF-1.7')],
+        })
+        with self.assertRaises(UnwantedContent):
+            transport.get('https://example.com/a.pdf', expect='html')
+        # Unlabelled bodies are sniffed
+        with self.assertRaises(UnwantedContent):
+            transport.get('https://example.com/b', expect='html')
+        self.assertIsNone(transport.fetch_text('https://example.com/a.pdf', expect='html'))
+
+if __name__ == '__main__':
+    unittest.main()
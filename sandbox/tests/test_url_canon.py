@@ -0,0 +1,34 @@
+import os
+import sys
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from url_canon import canonicalize_url, dedupe_news_items
+
+
+class CanonicalizeUrlTest(unittest.TestCase):
+
+    def test_copies_compare_equal(self):
+        self.assertEqual(canonicalize_url('HTTPS://Example.com:443/news/1?utm_source=x&b=2&a=1#top'),
+                         'https://example.com/news/1?a=1&b=2')
+
+    def test_unparseable_urls_are_kept(self):
+        for url in ('https://example.com:80a/news/1', 'https://example.com:99999/', 'http://[::1/news'):
+            self.assertEqual(canonicalize_url(url), url)
+
+    def test_dedupe_survives_a_bad_port(self):
+        items = [{'headline': 'One', 'url': 'https://example.com:bad/1'},
+                 {'headline': 'Two', 'url': 'https://example.com/2'}]
+        self.assertEqual(len(dedupe_news_items(items)), 2)
+
+    def test_dedupe_keeps_the_url_as_found(self):
+        items = [{'headline': 'One', 'url': 'https://user@Example.com/1?ref=home&flag'},
+                 {'headline': 'One again', 'url': 'https://example.com/1?flag='}]
+        self.assertEqual(dedupe_news_items(items),
+                         [{'headline': 'One', 'url': 'https://user@Example.com/1?ref=home&flag',
+                           'other_headlines': ['One again']}])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,34 @@
+import os
+import sys
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from watch import AdaptivePoller
+
+
+class AdaptivePollerTest(unittest.TestCase):
+
+    def test_no_portals(self):
+        self.assertEqual(AdaptivePoller([]).next_portal(), (None, None))
+
+    def test_record_reschedules_the_polled_portal(self):
+        poller = AdaptivePoller(['a', 'b', 'c'], initial_interval=300, min_interval=60, max_interval=3600)
+        # 'c' is not at the head of the queue: its own slot moves, the others stay
+        poller.record('c', 0)
+        self.assertEqual(sorted(portal for _, portal in poller._queue), ['a', 'b', 'c'])
+        self.assertEqual(poller.next_portal()[0], 'a')
+        self.assertEqual(poller.intervals['c'], 600)
+        poller.record('a', 6)
+        self.assertEqual(poller.intervals['a'], 150)
+        self.assertEqual(poller.next_portal()[0], 'b')
+
+    def test_unknown_portal(self):
+        poller = AdaptivePoller(['a'])
+        with self.assertRaises(KeyError):
+            poller.record('z', 1)
+        self.assertEqual(poller.next_portal()[0], 'a')
+
+
+if __name__ == '__main__':
+    unittest.main()
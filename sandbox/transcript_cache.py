@@ -0,0 +1,121 @@
+import json
+import os
+import sqlite3
+import threading
+import time
+import zlib
+
+from youtube_transcript_api import FetchedTranscriptSnippet
+
+
+class TranscriptCache:
+    """
+    Persistent cache of YouTube transcripts in one SQLite file.
+    Transcripts are keyed by video ID, language code and the
+    auto-generated flag, and stored as compressed JSON. Manual transcripts
+    of a published video practically never change and are kept until
+    evicted. Auto-generated ones expire after `generated_ttl` seconds,
+    since YouTube regenerates them.
+    The list of tracks a video has is cached too, for `list_ttl` seconds,
+    so a cached transcript is served without asking YouTube anything.
+    The least recently used transcripts are evicted once the stored data
+    exceeds max_bytes.
+    """
+
+    def __init__(self, directory='.transcript_cache', max_bytes=128 * 1024 * 1024,
+                 generated_ttl=24 * 3600, list_ttl=24 * 3600):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.generated_ttl = generated_ttl
+        self.list_ttl = list_ttl
+        os.makedirs(directory, exist_ok=True)
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(os.path.join(directory, 'transcripts.sqlite'), check_same_thread=False)
+        self._db.execute("""
+            CREATE TABLE IF NOT EXISTS track_lists (
+                video_id TEXT PRIMARY KEY,
+                tracks TEXT NOT NULL,
+                stored_at REAL NOT NULL
+            )
+        """)
+        self._db.execute("""
+            CREATE TABLE IF NOT EXISTS transcripts (
+                video_id TEXT NOT NULL,
+                language_code TEXT NOT NULL,
+                is_generated INTEGER NOT NULL,
+                snippets BLOB NOT NULL,
+                size INTEGER NOT NULL,
+                stored_at REAL NOT NULL,
+                last_access REAL NOT NULL,
+                PRIMARY KEY (video_id, language_code, is_generated)
+            )
+        """)
+        self._db.execute("CREATE INDEX IF NOT EXISTS transcripts_last_access ON transcripts (last_access)")
+        self._db.commit()
+        self._total = self._db.execute("SELECT COALESCE(SUM(size), 0) FROM transcripts").fetchone()[0]
+
+    def tracks(self, video_id):
+        """Cached track list of a video ([{language_code, language, is_generated}, ...]), or None"""
+        with self._lock:
+            row = self._db.execute("SELECT tracks, stored_at FROM track_lists WHERE video_id = ?",
+                                   (video_id,)).fetchone()
+        if row is None or time.time() - row[1] > self.list_ttl:
+            return None
+        return json.loads(row[0])
+
+    def store_tracks(self, video_id, tracks):
+        now = time.time()
+        with self._lock:
+            self._db.execute("INSERT OR REPLACE INTO track_lists VALUES (?, ?, ?)",
+                             (video_id, json.dumps(tracks, ensure_ascii=False), now))
+            # Expired lists are refetched anyway, so they are dropped as new ones come in
+            self._db.execute("DELETE FROM track_lists WHERE stored_at < ?", (now - self.list_ttl,))
+            self._db.commit()
+
+    def snippets(self, video_id, language_code, is_generated):
+        """Cached transcript as a list of FetchedTranscriptSnippet, or None if missing or expired"""
+        key = (video_id, language_code, int(is_generated))
+        with self._lock:
+            row = self._db.execute(
+                "SELECT snippets, stored_at FROM transcripts"
+                " WHERE video_id = ? AND language_code = ? AND is_generated = ?", key).fetchone()
+            if row is None:
+                return None
+            if is_generated and time.time() - row[1] > self.generated_ttl:
+                return None
+            self._db.execute(
+                "UPDATE transcripts SET last_access = ?"
+                " WHERE video_id = ? AND language_code = ? AND is_generated = ?", (time.time(), *key))
+            self._db.commit()
+        return [FetchedTranscriptSnippet(text=text, start=start, duration=duration)
+                for text, start, duration in json.loads(zlib.decompress(row[0]))]
+
+    def store_snippets(self, video_id, language_code, is_generated, snippets):
+        data = zlib.compress(json.dumps([[item.text, item.start, item.duration] for item in snippets],
+                                        ensure_ascii=False).encode('utf-8'))
+        key = (video_id, language_code, int(is_generated))
+        now = time.time()
+        with self._lock:
+            row = self._db.execute(
+                "SELECT size FROM transcripts WHERE video_id = ? AND language_code = ? AND is_generated = ?",
+                key).fetchone()
+            self._db.execute("INSERT OR REPLACE INTO transcripts VALUES (?, ?, ?, ?, ?, ?, ?)",
+                             (*key, data, len(data), now, now))
+            self._total += len(data) - (row[0] if row else 0)
+            self._evict_locked()
+            self._db.commit()
+
+    def _evict_locked(self):
+        if self._total <= self.max_bytes:
+            return
+        rows = self._db.execute(
+            "SELECT video_id, language_code, is_generated, size FROM transcripts ORDER BY last_access").fetchall()
+        for video_id, language_code, is_generated, size in rows:
+            if self._total <= self.max_bytes:
+                break
+            self._db.execute("DELETE FROM transcripts WHERE video_id = ? AND language_code = ? AND is_generated = ?",
+                             (video_id, language_code, is_generated))
+            self._total -= size
+
+    def close(self):
+        self._db.close()
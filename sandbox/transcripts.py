@@ -0,0 +1,243 @@
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+from requests.adapters import HTTPAdapter
+from youtube_transcript_api import NoTranscriptFound, TranscriptsDisabled, YouTubeTranscriptApi
+
+from metrics import default_metrics
+from records import RecordBatch, TranscriptParagraph
+
+# Bangla first, then English, then whatever the video has
+PREFERRED_LANGUAGES = ['bn', 'bn-BD', 'en', 'en-US', 'en-GB']
+# Snippet endings that close a sentence, Bangla dari (।) included
+SENTENCE_ENDINGS = ('.', '!', '?', '\u0964', '\u2026')
+
+
+def format_timestamp(seconds):
+    return f"[{int(seconds // 60):02d}:{int(seconds % 60):02d}]"
+
+
+def segment_transcript(snippets, max_seconds=120, max_snippets=10, sentence_breaks=False):
+    """
+    Yield paragraphs, TranscriptParagraph('[mm:ss]', text), as snippets
+    come in. A paragraph closes when a snippet starts more than max_seconds
+    after the previous paragraph closed, or once it holds max_snippets
+    snippets, and is stamped with the start of the snippet that closed it;
+    the last paragraph is stamped with the last snippet.
+    With sentence_breaks, a paragraph that reached a limit stays open until
+    a snippet ends a sentence (for at most max_snippets more snippets).
+    """
+    current = []
+    last_timestamp = 0
+    overdue = 0     # snippets added after a limit was reached, waiting for a sentence end
+    item = None
+    for item in snippets:
+        text = item.text.strip()
+        current.append(text)
+        if overdue or item.start - last_timestamp > max_seconds or len(current) >= max_snippets:
+            if sentence_breaks and not text.endswith(SENTENCE_ENDINGS) and overdue < max_snippets:
+                overdue += 1
+                continue
+            yield TranscriptParagraph(format_timestamp(item.start), ' '.join(current))
+            current = []
+            last_timestamp = item.start
+            overdue = 0
+    if current:
+        yield TranscriptParagraph(format_timestamp(item.start), ' '.join(current))
+
+
+def paragraph_ends(starts, max_seconds=120, max_snippets=10):
+    """
+    Indexes of the snippets that close each paragraph under
+    segment_transcript's time and count rules, from the start times alone
+    (a NumPy array that must not decrease). One searchsorted pass finds, for
+    every snippet, the first one more than max_seconds later; walking from
+    one paragraph end to the next is then one step per paragraph, not per
+    snippet.
+    """
+    import numpy as np
+    count = len(starts)
+    if not count:
+        return []
+    time_limits = np.searchsorted(starts, starts + max_seconds, side='right').tolist()
+    ends = []
+    end = min(max_snippets - 1, int(np.searchsorted(starts, max_seconds, side='right')))
+    while end < count:
+        ends.append(end)
+        end = min(end + max_snippets, time_limits[end])
+    if not ends or ends[-1] != count - 1:
+        # The remainder is the last paragraph, stamped with the last snippet
+        ends.append(count - 1)
+    return ends
+
+
+def segment_transcript_vectorized(snippets, max_seconds=120, max_snippets=10, sentence_breaks=False):
+    """
+    segment_transcript's paragraphs, with the boundaries computed by
+    paragraph_ends in NumPy. Falls back to segment_transcript without NumPy,
+    with sentence_breaks (boundaries then depend on the text) and when start
+    times go backwards (searchsorted needs them sorted).
+    """
+    snippets = list(snippets)
+    try:
+        import numpy as np
+    except ImportError:
+        np = None
+    if np is None or sentence_breaks:
+        yield from segment_transcript(snippets, max_seconds, max_snippets, sentence_breaks)
+        return
+    starts = np.fromiter((item.start for item in snippets), dtype=float, count=len(snippets))
+    if (np.diff(starts) < 0).any():
+        yield from segment_transcript(snippets, max_seconds, max_snippets)
+        return
+    texts = [item.text.strip() for item in snippets]
+    begin = 0
+    for end in paragraph_ends(starts, max_seconds, max_snippets):
+        yield TranscriptParagraph(format_timestamp(starts[end]), ' '.join(texts[begin:end + 1]))
+        begin = end + 1
+
+
+def track_list(transcript_list):
+    """Plain description of a video's tracks, manual ones first (the order YouTube lists them in)"""
+    return [{'language_code': transcript.language_code, 'language': transcript.language,
+             'is_generated': transcript.is_generated} for transcript in transcript_list]
+
+
+def select_track(tracks, languages=PREFERRED_LANGUAGES):
+    """
+    The track in the first preferred language the video has (manual before
+    auto-generated), else the first one listed, else None.
+    Each language is a dict lookup, not a scan of every track.
+    """
+    by_key = {(track['language_code'], track['is_generated']): track for track in tracks}
+    for language_code in languages:
+        for is_generated in (False, True):
+            track = by_key.get((language_code, is_generated))
+            if track is not None:
+                return track
+    return tracks[0] if tracks else None
+
+
+def find_track(transcript_list, track):
+    """The Transcript of a TranscriptList matching a track from track_list"""
+    if track['is_generated']:
+        return transcript_list.find_generated_transcript([track['language_code']])
+    return transcript_list.find_manually_created_transcript([track['language_code']])
+
+
+class TranscriptClient:
+    """
+    Fetches YouTube transcripts through one YouTubeTranscriptApi and one
+    pooled requests session, so a batch of videos reuses connections and
+    YouTube's consent cookie. fetch_many runs up to `max_workers` videos at
+    once. Every video gets a result dict:
+
+        video_id, status ('ok', 'no_transcript' or 'failed'), language,
+        is_generated, paragraphs (RecordBatch of TranscriptParagraph), error, seconds
+
+    max_seconds, max_snippets and sentence_breaks are the paragraph rules.
+    With a TranscriptCache, track lists and transcripts already downloaded
+    are served from disk.
+    """
+
+    def __init__(self, languages=PREFERRED_LANGUAGES, max_workers=4, headers=None, metrics=None,
+                 max_seconds=120, max_snippets=10, sentence_breaks=False, cache=None):
+        self.languages = list(languages)
+        self.cache = cache
+        self.segment_options = {'max_seconds': max_seconds, 'max_snippets': max_snippets,
+                                'sentence_breaks': sentence_breaks}
+        self.max_workers = max(1, max_workers)
+        self.metrics = metrics if metrics is not None else default_metrics
+        self.session = requests.Session()
+        if headers:
+            self.session.headers.update(headers)
+        adapter = HTTPAdapter(pool_connections=4, pool_maxsize=self.max_workers)
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+        self.api = YouTubeTranscriptApi(http_client=self.session)
+
+    def segment(self, snippets):
+        """Paragraph generator with this client's rules (NumPy boundaries when available)"""
+        return segment_transcript_vectorized(snippets, **self.segment_options)
+
+    def fetch(self, video_id, paragraphs=True):
+        """
+        Result dict for one video; errors are reported in it, not raised.
+        With paragraphs=False the raw snippets are returned under 'snippets'
+        instead, for the caller to stream through self.segment().
+        """
+        result = {'video_id': video_id, 'status': 'failed', 'language': None, 'is_generated': None,
+                  'paragraphs': RecordBatch(TranscriptParagraph), 'error': None}
+        started = time.perf_counter()
+        try:
+            transcript_list = None
+            tracks = self.cache.tracks(video_id) if self.cache else None
+            if tracks is None:
+                transcript_list = self._list(video_id)
+                tracks = track_list(transcript_list)
+                if self.cache:
+                    self.cache.store_tracks(video_id, tracks)
+            else:
+                self.metrics.inc('transcript_cache_hits_total', kind='list')
+            track = select_track(tracks, self.languages)
+            snippets = None
+            if track is not None and self.cache:
+                snippets = self.cache.snippets(video_id, track['language_code'], track['is_generated'])
+                if snippets is not None:
+                    self.metrics.inc('transcript_cache_hits_total', kind='transcript')
+            if track is not None and snippets is None:
+                list_was_cached = transcript_list is None
+                if transcript_list is None:
+                    transcript_list = self._list(video_id)
+                try:
+                    transcript = find_track(transcript_list, track)
+                except NoTranscriptFound:
+                    if not list_was_cached:
+                        raise
+                    # The cached track list went stale (track removed or replaced): replace it with
+                    # the list just fetched and choose again, once
+                    tracks = track_list(transcript_list)
+                    self.cache.store_tracks(video_id, tracks)
+                    track = select_track(tracks, self.languages)
+                    transcript = find_track(transcript_list, track) if track is not None else None
+                if transcript is not None:
+                    with self.metrics.time('stage_seconds', stage='transcript_fetch', host='youtube.com'):
+                        snippets = transcript.fetch()
+                    if self.cache:
+                        self.cache.store_snippets(video_id, track['language_code'], track['is_generated'], snippets)
+            if track is None:
+                result['status'] = 'no_transcript'
+                result['error'] = "No transcripts available for this video"
+            else:
+                result['status'] = 'ok'
+                result['language'] = track['language_code']
+                result['is_generated'] = track['is_generated']
+                if paragraphs:
+                    result['paragraphs'] = RecordBatch(TranscriptParagraph, self.segment(snippets))
+                else:
+                    result['snippets'] = snippets
+        except TranscriptsDisabled:
+            result['status'] = 'no_transcript'
+            result['error'] = "Transcripts are disabled for this video"
+        except Exception as e:
+            result['error'] = f"Could not extract transcript: {str(e)}"
+        result['seconds'] = round(time.perf_counter() - started, 3)
+        self.metrics.observe('stage_seconds', result['seconds'], stage='transcript', host='youtube.com')
+        if result['status'] != 'ok':
+            self.metrics.inc('transcript_failures_total')
+        return result
+
+    def _list(self, video_id):
+        with self.metrics.time('stage_seconds', stage='transcript_list', host='youtube.com'):
+            return self.api.list(video_id)
+
+    def fetch_many(self, video_ids):
+        """Result dicts for many videos, in input order; a repeated ID is fetched once"""
+        video_ids = list(video_ids)
+        unique = list(dict.fromkeys(video_ids))
+        if not unique:
+            return []
+        with ThreadPoolExecutor(max_workers=min(self.max_workers, len(unique))) as pool:
+            results = dict(zip(unique, pool.map(self.fetch, unique)))
+        return [results[video_id] for video_id in video_ids]
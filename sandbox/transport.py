@@ -0,0 +1,322 @@
+import threading
+import time
+from urllib.parse import urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.request import ACCEPT_ENCODING
+
+from charset import CharsetResolver
+from metrics import default_metrics
+from politeness import parse_retry_after
+from resilience import CLOSED, CircuitBreaker, HostUnavailable, RetryBudget, backoff_delay
+
+# Responses worth another attempt: rate limited or a transient server error
+RETRY_STATUSES = (429, 500, 502, 503, 504)
+
+# Content-Type families a caller can ask for (the `expect` argument of get/fetch)
+CONTENT_CLASSES = {
+    'html': ('text/html', 'application/xhtml+xml'),
+    'feed': ('application/rss+xml', 'application/atom+xml', 'application/xml', 'text/xml'),
+    'text': ('text/plain',),
+}
+# Largest decoded body kept per content class, in bytes; anything bigger is cut off
+MAX_BYTES = {
+    'html': 5 * 1024 * 1024,
+    'feed': 20 * 1024 * 1024,
+    'text': 1024 * 1024,
+    'other': 20 * 1024 * 1024,
+}
+CHUNK_SIZE = 64 * 1024
+
+DEFAULT_USER_AGENT = 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
+
+
+class HttpTransport:
+    """
+    Single HTTP layer shared by every fetch path (portal pages, article bodies,
+    standalone scripts). One requests.Session keeps a keep-alive connection pool
+    per host, so article fetches reuse the connection opened for the homepage
+    instead of paying a fresh TCP/TLS handshake each time. With an HttpCache,
+    responses are served from disk while fresh and revalidated when stale.
+    With a HostScheduler, every network request waits for its host's budget;
+    a host that asks for a pause longer than `max_retry_after` is skipped with
+    HostUnavailable until the pause is over. robots.txt is fetched once per
+    host through this transport (robots_txt) for both the scheduler and feed
+    discovery.
+    Failing hosts are retried with backoff under a global retry budget, and
+    a per-host circuit breaker stops sending to a host that keeps failing.
+    Connecting is bounded by `connect_timeout`, reading by `timeout`.
+    Bodies are streamed: a page of the wrong Content-Type is dropped after the
+    headers, and one over its class's `max_bytes` cap is cut off. gzip and
+    deflate are always negotiated, br and zstd when urllib3 can decode them
+    (brotli / backports.zstd installed).
+    response.encoding is resolved here (header, BOM, <meta>, then a bounded
+    guess, remembered per host), so .text never runs requests' detection
+    over the whole body.
+    Every request is recorded in `metrics` per host: latency (total, time to
+    first byte, download), bytes, status codes, retries, failures, cache hits.
+    """
+
+    def __init__(self, user_agent=DEFAULT_USER_AGENT, timeout=15, pool_hosts=32, pool_per_host=8, cache=None,
+                 scheduler=None, max_retry_after=60, metrics=None, connect_timeout=5, retries=2, backoff=0.5,
+                 max_backoff=8, breaker=None, retry_budget=None, max_bytes=None, charsets=None):
+        self.charsets = charsets if charsets is not None else CharsetResolver()
+        self.max_bytes = {**MAX_BYTES, **(max_bytes or {})}
+        self.timeout = timeout
+        self.connect_timeout = connect_timeout
+        self.retries = retries
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.breaker = breaker if breaker is not None else CircuitBreaker()
+        self.retry_budget = retry_budget if retry_budget is not None else RetryBudget()
+        self.metrics = metrics if metrics is not None else default_metrics
+        self.cache = cache
+        self.scheduler = scheduler
+        self.max_retry_after = max_retry_after
+        self._robots = {}   # host -> robots.txt text, or None when there is none
+        self._robots_lock = threading.Lock()
+        self.session = requests.Session()
+        self.session.headers.update({
+            'User-Agent': user_agent,
+            'Accept-Encoding': ACCEPT_ENCODING
+        })
+
+        # pool_hosts: how many per-host pools are kept open at once
+        # pool_per_host: connections kept alive to one host (>= per-host concurrency)
+        adapter = HTTPAdapter(pool_connections=pool_hosts, pool_maxsize=pool_per_host)
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+        if scheduler is not None and scheduler.fetch_robots is None:
+            # robots.txt goes through the same session, cache, breaker and size cap
+            scheduler.fetch_robots = self.robots_txt
+            scheduler.user_agent = user_agent
+
+    def get(self, url, max_age=None, headers=None, expect=None, paced=True, **kwargs):
+        """
+        GET a URL through the shared session, raising on HTTP errors.
+        max_age (seconds) overrides the server's Cache-Control for cached copies.
+        expect: content class(es) the caller can use ('html', 'feed', 'text'),
+        anything else raises UnwantedContent before the body is downloaded.
+        paced=False skips the scheduler (used for robots.txt itself).
+        """
+        if isinstance(expect, str):
+            expect = (expect,)
+        kwargs['expect'] = expect
+        kwargs['paced'] = paced
+        kwargs.setdefault('timeout', (min(self.connect_timeout, self.timeout), self.timeout))
+        headers = headers or {}
+        entry = self.cache.lookup(url) if self.cache else None
+        validators = {}
+        if entry:
+            if self.cache.is_fresh(entry, max_age):
+                cached = self.cache.response(entry)
+                if cached is not None:
+                    self.metrics.inc('http_cache_hits_total', host=host_of(url), kind='fresh')
+                    return self._set_encoding(url, cached)
+            validators = self.cache.conditional_headers(entry)
+
+        response = self._send(url, headers={**validators, **headers}, **kwargs)
+        if response.status_code == 304 and entry:
+            self.cache.refresh(url, response)
+            cached = self.cache.response(entry)
+            if cached is not None:
+                self.metrics.inc('http_cache_hits_total', host=host_of(url), kind='revalidated')
+                return self._set_encoding(url, cached)
+            # Body vanished from disk: fetch it again without validators
+            response = self._send(url, headers=headers, **kwargs)
+
+        response.raise_for_status()
+        if self.cache and response.status_code == 200:
+            self.cache.store(url, response, max_age)
+        return self._set_encoding(url, response)
+
+    def _set_encoding(self, url, response):
+        if response.content:
+            host = host_of(url)
+            response.encoding, source = self.charsets.resolve(host, response.headers.get('Content-Type'),
+                                                              response.content)
+            self.metrics.inc('charset_resolved_total', host=host, source=source)
+        return response
+
+    def _send(self, url, paced=True, **kwargs):
+        """
+        One network request, paced per host. Connection errors, timeouts, 429
+        and 5xx are retried with jittered exponential backoff while the global
+        retry budget allows; a Retry-After header pauses the whole host for that
+        long instead. Hosts whose circuit is open, or that asked for a pause
+        longer than max_retry_after, fail fast with HostUnavailable.
+        """
+        host = host_of(url)
+        if self.breaker is not None and not self.breaker.allow(host):
+            raise HostUnavailable(f"{host} is failing, skipped until its circuit closes")
+        if self.retry_budget is not None:
+            self.retry_budget.deposit()
+        attempt = 0
+        while True:
+            if self.scheduler is not None and paced:
+                self.scheduler.wait(url, max_wait=self.max_retry_after)
+            try:
+                response = self._request(url, **kwargs)
+            except (requests.exceptions.ConnectionError, requests.exceptions.Timeout) as e:
+                self._record_outcome(host, failed=True)
+                if not self._may_retry(host, attempt):
+                    raise
+                reason = type(e).__name__
+                delay = backoff_delay(attempt, self.backoff, self.max_backoff)
+            else:
+                status = response.status_code
+                self._record_outcome(host, failed=status >= 500)
+                if status not in RETRY_STATUSES or not self._may_retry(host, attempt):
+                    return response
+                reason = status
+                delay = parse_retry_after(response.headers.get('Retry-After'))
+                if delay is None:
+                    delay = backoff_delay(attempt, self.backoff, self.max_backoff)
+                elif delay > self.max_retry_after:
+                    # Too long to wait for: later requests to the host raise HostUnavailable until then
+                    if self.scheduler is not None:
+                        self.scheduler.penalize(url, delay)
+                    return response
+                elif self.scheduler is not None and paced:
+                    # The scheduler holds back every request to the host, this retry included
+                    self.scheduler.penalize(url, delay)
+                    delay = 0
+            self.metrics.inc('http_retries_total', host=host, reason=reason)
+            if delay:
+                time.sleep(delay)
+            attempt += 1
+
+    def _may_retry(self, host, attempt):
+        if attempt >= self.retries:
+            return False
+        if self.breaker is not None and self.breaker.state(host) != CLOSED:
+            return False
+        return self.retry_budget is None or self.retry_budget.withdraw()
+
+    def _record_outcome(self, host, failed):
+        if self.breaker is None:
+            return
+        if not failed:
+            self.breaker.record_success(host)
+        elif self.breaker.record_failure(host):
+            self.metrics.inc('circuit_opened_total', host=host)
+            print(f"{host} keeps failing, pausing requests to it for {self.breaker.reset_timeout}s")
+
+    def _request(self, url, expect=None, **kwargs):
+        """
+        session.get with the body streamed in: a 200 whose Content-Type is not
+        one of the `expect`ed content classes is dropped after the headers, and
+        a body larger than its class's cap is cut off once it gets there.
+        Timed per host; requests exposes no DNS/connect split, so those are part
+        of the time to first byte.
+        """
+        host = host_of(url)
+        start = time.perf_counter()
+        response = self.session.get(url, stream=True, **kwargs)
+        ttfb = time.perf_counter() - start
+        size = 0
+        try:
+            limit = self.max_bytes['other']
+            sniff = False
+            if response.status_code == 200:
+                content_class = content_class_of(response.headers.get('Content-Type'))
+                if expect and content_class not in expect and content_class != 'unknown':
+                    self.metrics.inc('http_aborted_total', host=host, reason='content_type')
+                    raise UnwantedContent(f"{response.headers.get('Content-Type')} is not {'/'.join(expect)}: {url}")
+                limit = self.max_bytes.get(content_class, limit)
+                # Unlabelled bodies must at least start like markup when HTML or a feed is wanted
+                sniff = bool(expect) and content_class == 'unknown' and 'text' not in expect
+            length = response.headers.get('Content-Length', '')
+            # Content-Length is the compressed size, so it can only prove a body too large
+            if length.isdigit() and int(length) > limit:
+                self.metrics.inc('http_aborted_total', host=host, reason='too_large')
+                raise ContentTooLarge(f"{url} is {int(length) // 1024} KB, over the {limit // 1024} KB limit")
+            chunks = []
+            for chunk in response.iter_content(CHUNK_SIZE):
+                size += len(chunk)
+                if size > limit:
+                    self.metrics.inc('http_aborted_total', host=host, reason='too_large')
+                    raise ContentTooLarge(f"{url} is over the {limit // 1024} KB limit")
+                if sniff and chunk:
+                    if not chunk.lstrip(b'\xef\xbb\xbf \t\r\n').startswith(b'<'):
+                        self.metrics.inc('http_aborted_total', host=host, reason='content_type')
+                        raise UnwantedContent(f"{url} does not look like {'/'.join(expect)}")
+                    sniff = False
+                chunks.append(chunk)
+            response._content = b''.join(chunks)
+        finally:
+            response.close()
+            total = time.perf_counter() - start
+            self.metrics.observe('http_request_seconds', total, host=host)
+            self.metrics.observe('http_ttfb_seconds', ttfb, host=host)
+            self.metrics.observe('http_download_seconds', total - ttfb, host=host)
+            self.metrics.inc('http_responses_total', host=host, status=response.status_code)
+            self.metrics.inc('http_response_bytes_total', size, host=host)
+        return response
+
+    def robots_txt(self, url):
+        """Text of the robots.txt of url's host, fetched once per run, or None if it has none"""
+        parts = urlsplit(url)
+        host = parts.netloc.lower()
+        with self._robots_lock:
+            if host in self._robots:
+                return self._robots[host]
+        try:
+            # Not paced: the scheduler calls this before the host's first request
+            text = self.get(f"{parts.scheme}://{parts.netloc}/robots.txt", max_age=86400, expect='text',
+                            paced=False).text
+        except requests.exceptions.RequestException:
+            text = None
+        with self._robots_lock:
+            return self._robots.setdefault(host, text)
+
+    def fetch(self, url, **kwargs):
+        """GET a URL, returning the response or None (and printing why) on failure"""
+        try:
+            return self.get(url, **kwargs)
+        except requests.exceptions.RequestException as e:
+            self.metrics.inc('http_failures_total', host=host_of(url), reason=type(e).__name__)
+            print(f"Error fetching {url}: {e}")
+            return None
+
+    def fetch_bytes(self, url, **kwargs):
+        """Raw body of a URL, ready to hand to trafilatura.extract, or None"""
+        response = self.fetch(url, **kwargs)
+        if response is None:
+            return None
+        return response.content
+
+    def fetch_text(self, url, **kwargs):
+        """Body of a URL decoded with its resolved charset, or None"""
+        response = self.fetch(url, **kwargs)
+        if response is None:
+            return None
+        return response.text
+
+
+class UnwantedContent(requests.exceptions.RequestException):
+    """The response is not of a content type the caller asked for"""
+
+
+class ContentTooLarge(requests.exceptions.RequestException):
+    """The response body is over the size cap of its content class"""
+
+
+def content_class_of(content_type):
+    """'html', 'feed', 'text', 'other', or 'unknown' for a missing or generic binary Content-Type"""
+    mime = (content_type or '').split(';', 1)[0].strip().lower()
+    if mime in ('', 'application/octet-stream', 'binary/octet-stream'):
+        return 'unknown'
+    for name, mimes in CONTENT_CLASSES.items():
+        if mime in mimes or (name == 'feed' and mime.endswith('+xml') and mime != 'application/xhtml+xml'):
+            return name
+    return 'other'
+
+
+def host_of(url):
+    return urlsplit(url).netloc.lower()
+
+
+# Shared instance for the standalone scripts
+default_transport = HttpTransport()
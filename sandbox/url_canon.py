@@ -0,0 +1,93 @@
+import re
+from urllib.parse import parse_qsl, urlencode, urljoin, urlsplit, urlunsplit
+
+from records import updated
+
+# Query parameters that only track where a click came from
+TRACKING_PARAMS = {
+    'fbclid', 'gclid', 'dclid', 'msclkid', 'yclid', 'igshid', 'mc_cid', 'mc_eid',
+    'ref', 'ref_src', 'ref_url', 'referrer', 'cmpid', 'ocid', 'ito',
+    'xtor', 'ns_mchannel', 'ns_source', 'ns_campaign', 'ns_linkname', 'ns_fee',
+    '_ga', '_gl',
+}
+TRACKING_PREFIXES = ('utm_', 'pk_', 'mtm_', 'at_')
+
+DEFAULT_PORTS = {'http': '80', 'https': '443'}
+
+_LINK_TAG = re.compile(rb'<link\b[^>]*>', re.I)
+_ATTR = re.compile(rb'''([\w-]+)\s*=\s*(?:"([^"]*)"|'([^']*)'|([^\s>]+))''')
+
+
+def canonicalize_url(url):
+    """
+    Normalize an article URL so copies of the same link compare equal:
+    lowercase scheme and host, no default port or fragment, tracking
+    parameters removed and the remaining query sorted.
+    A URL that cannot be parsed (bad port, broken IPv6 host) is returned
+    unchanged.
+    """
+    try:
+        parts = urlsplit(url.strip())
+        port = parts.port
+    except ValueError:
+        return url
+    scheme = parts.scheme.lower()
+    host = (parts.hostname or '').rstrip('.')
+    if port and str(port) != DEFAULT_PORTS.get(scheme):
+        host = f"{host}:{port}"
+    query = [
+        (key, value) for key, value in parse_qsl(parts.query, keep_blank_values=True)
+        if key not in TRACKING_PARAMS and not key.lower().startswith(TRACKING_PREFIXES)
+    ]
+    query.sort()
+    return urlunsplit((scheme, host, parts.path or '/', urlencode(query), ''))
+
+
+def dedupe_news_items(news_items):
+    """
+    Collapse items (NewsItem records or dicts) that point to the same
+    canonical URL, keeping the first one's position, headline and URL as
+    found (the canonical form is only the comparison key, it is not always
+    fetchable). Headlines of the merged copies are kept in 'other_headlines'.
+    Items without a URL are kept as they are.
+    """
+    merged = []
+    by_url = {}     # canonical URL -> (position in merged, other headlines)
+    for item in news_items:
+        if not item['url']:
+            merged.append(item)
+            continue
+        url = canonicalize_url(item['url'])
+        existing = by_url.get(url)
+        if existing is None:
+            by_url[url] = (len(merged), [])
+            merged.append(item)
+        elif item['headline'] != merged[existing[0]]['headline'] and item['headline'] not in existing[1]:
+            existing[1].append(item['headline'])
+    for position, other_headlines in by_url.values():
+        merged[position] = updated(merged[position], other_headlines=other_headlines)
+    return merged
+
+
+def link_tags(html, limit=65536):
+    """Attribute dicts (bytes keys and values) of the <link> tags in the first `limit` bytes"""
+    if isinstance(html, str):
+        html = html.encode('utf-8', 'ignore')
+    for tag in _LINK_TAG.finditer(html, 0, limit):
+        attrs = {}
+        for match in _ATTR.finditer(tag.group(0)):
+            value = next(v for v in match.group(2, 3, 4) if v is not None)
+            attrs[match.group(1).lower()] = value
+        yield attrs
+
+
+def find_canonical_link(html, base_url, limit=65536):
+    """
+    The canonicalized <link rel="canonical"> target of a page, or None.
+    Only the first `limit` bytes (the <head>) are scanned; no parse needed.
+    """
+    for attrs in link_tags(html, limit):
+        if b'canonical' in attrs.get(b'rel', b'').lower().split() and attrs.get(b'href'):
+            href = attrs[b'href'].decode('utf-8', 'ignore').strip()
+            return canonicalize_url(urljoin(base_url, href))
+    return None
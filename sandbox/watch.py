@@ -0,0 +1,47 @@
+import heapq
+import time
+
+
+class AdaptivePoller:
+    """
+    Polling schedule for a set of portals, each on its own interval.
+    After every poll the interval moves toward the value that would have
+    found about `target_new` new articles: busy portals are polled sooner,
+    quiet ones back off, within [min_interval, max_interval].
+    """
+
+    def __init__(self, portals, initial_interval=300, min_interval=60, max_interval=3600, target_new=3):
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.target_new = target_new
+        self.intervals = {portal: initial_interval for portal in portals}
+        now = time.time()
+        # Stagger the first round slightly so portals do not all fire at once
+        self._queue = [(now + i, portal) for i, portal in enumerate(portals)]
+        heapq.heapify(self._queue)
+
+    def next_portal(self):
+        """(portal, seconds until it is due), or (None, None) with no portals to poll"""
+        if not self._queue:
+            return None, None
+        due, portal = self._queue[0]
+        return portal, max(0.0, due - time.time())
+
+    def record(self, portal, new_count):
+        """Adjust the portal's interval from its latest poll and schedule the next one"""
+        interval = self.intervals[portal]   # KeyError for a portal this poller does not schedule
+        if self._queue and self._queue[0][1] == portal:
+            heapq.heappop(self._queue)
+        else:
+            # Polled out of turn: drop its pending slot wherever it is in the heap
+            self._queue = [entry for entry in self._queue if entry[1] != portal]
+            heapq.heapify(self._queue)
+        if new_count:
+            factor = self.target_new / new_count
+        else:
+            factor = 2.0
+        factor = min(2.0, max(0.5, factor))
+        interval = min(self.max_interval, max(self.min_interval, interval * factor))
+        self.intervals[portal] = interval
+        heapq.heappush(self._queue, (time.time() + interval, portal))
+        return interval